@@ -14,23 +14,882 @@ Utilizes a linux Github runner to build a JMP Addin with functionality to includ
 ############################
 
 import os
+import sys
+import argparse
+import base64
 import requests
 import shutil
 from datetime import datetime, timezone
 import zipfile
 import configparser
+import contextvars
+import fnmatch
+import functools
+import re
+import cProfile
+import io
+import pstats
+import tracemalloc
+import hashlib
+import json
+import tempfile
+import threading
+import time
+import struct
+import subprocess
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, fields, replace
+from concurrent.futures import ThreadPoolExecutor, Future, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+############################
+#       HTTP CLIENT        #
+############################
+
+# the Github API root. Github runners set GITHUB_API_URL (this also covers Github Enterprise Server).
+GITHUB_API = os.environ.get('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+# where the ETag cache (and any other cross-build caches) are kept. Persist this with actions/cache to reuse across builds.
+CACHE_DIR = os.environ.get('CacheDir') or os.path.join(os.path.expanduser('~'), '.cache', 'project-jaab')
+# where raw file contents are downloaded from, next to the API root.
+GITHUB_RAW = 'https://raw.githubusercontent.com' if GITHUB_API == 'https://api.github.com' else GITHUB_API.removesuffix('/api/v3') + '/raw'
+# the server git (and the Git LFS batch API) is reached on, next to the API root.
+GITHUB_SERVER = 'https://github.com' if GITHUB_API == 'https://api.github.com' else GITHUB_API.removesuffix('/api/v3')
+# the most external file listings or downloads run at once.
+EXTERNAL_WORKERS = int(os.environ.get('ExternalWorkers') or 8)
+# the most bytes the memory build_mode holds in memory before spilling to a temp file.
+MEMORY_LIMIT_BYTES = int(os.environ.get('MemoryLimitMB') or 256) * 1024 * 1024
+# the most addins built at once in the batch mode.
+BATCH_WORKERS = int(os.environ.get('BatchWorkers') or 4)
+# the most disk the external file cache uses before the least recently used files are removed.
+CACHE_MAX_BYTES = int(os.environ.get('CacheMaxMB') or 2048) * 1024 * 1024
+# the longest a request waits for the rate limit to reset before the build fails instead.
+RATE_LIMIT_WAIT = int(os.environ.get('RateLimitWait') or 900)
+# where external files come from unless their .ini entry says otherwise (see external_source).
+EXTERNAL_SOURCE = os.environ.get('ExternalSource') or 'github'
+
+class RateLimitError(Exception):
+    '''
+    Github's rate limit ran out and waiting for it to reset would take longer than allowed.
+    '''
+
+class NotFoundError(Exception):
+    '''
+    Github answered an API request with 404: what was asked for doesn't exist (or the token can't see it).
+    '''
+
+class ExternalsError(Exception):
+    '''
+    One or more entries of the .ini could not be included. errors has the .ini number and exception of each.
+    '''
+    def __init__(self, message, errors):
+        super().__init__(message)
+        self.errors = errors
+
+    def missing(self):
+        '''
+        Returns whether every entry failed because its repo, version or file isn't there, rather than (ex.) a network error.
+        '''
+        return all(isinstance(e, (KeyError, FileNotFoundError, NotFoundError)) for e in self.errors.values())
+
+class RequestScheduler:
+    '''
+    Sits in front of every Github API request of a GithubClient and keeps the builds sharing a token inside its rate limit.
+    It reads X-RateLimit-Remaining/Reset from every response and Retry-After from a rate limited one, and:
+        - lets fewer requests run at once as the remaining budget drops below low_water of the limit (down to one),
+        - lets conditional (If-None-Match) requests go ahead of the others, as a 304 doesn't use up the budget,
+        - holds requests until the reset (or the Retry-After) when the budget is spent, if that is no longer than
+          max_wait, and otherwise fails them straight away with a RateLimitError.
+    Its decisions are added to the running build's report and kept in metrics().
+
+    Args:
+        max_concurrency (integer): the most requests at once with plenty of budget left.
+        max_wait (integer): the longest a request waits for a reset, in seconds.
+        low_water (float): the fraction of the limit below which fewer requests run at once.
+
+    Example Usage:
+        >>> scheduler = RequestScheduler(max_concurrency=16, max_wait=600)
+        >>> with scheduler.slot():
+        ...     response = session.get(url)
+        >>> scheduler.update(response)
+        False
+    '''
+    def __init__(self, max_concurrency=16, max_wait=RATE_LIMIT_WAIT, low_water=0.2):
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.low_water = low_water
+        self._condition = threading.Condition()
+        self.in_flight = 0
+        self.limit = None
+        self.remaining = None
+        self.reset = None
+        self.blocked_until = 0
+        self._cheap_waiting = 0
+        self._metrics = {"requests": 0, "throttled": 0, "waits": 0, "wait_seconds": 0.0, "rate_limited": 0, "lowest_capacity": max_concurrency}
+
+    def capacity(self):
+        '''
+        Returns how many requests can run at once for the budget that is left.
+        '''
+        if self.limit is None or self.remaining is None or self.remaining >= self.limit * self.low_water:
+            return self.max_concurrency
+        return max(1, int(self.max_concurrency * self.remaining / (self.limit * self.low_water)))
+
+    def _wait_needed(self, now):
+        # seconds until a request may be sent: a Retry-After, or the reset once the budget is spent.
+        if self.reset is not None and now >= self.reset:
+            # the window has rolled over, so the old figures no longer apply.
+            self.remaining = None
+            self.reset = None
+        wait = self.blocked_until - now
+        if self.remaining is not None and self.remaining - self.in_flight <= 0 and self.reset is not None:
+            wait = max(wait, self.reset - now + 1)
+        return wait
+
+    @contextmanager
+    def slot(self, cheap=False):
+        '''
+        Waits until a request can be sent and holds its place while it runs.
+
+        Args:
+            cheap (boolean): the request is conditional, so it goes ahead of the others.
+
+        Raises:
+            RateLimitError: the budget is spent and the reset is further off than max_wait.
+        '''
+        with self._condition:
+            if cheap:
+                self._cheap_waiting += 1
+            throttled = False
+            waiting = False
+            try:
+                while True:
+                    now = time.time()
+                    wait = self._wait_needed(now)
+                    if wait > 0:
+                        if wait > self.max_wait:
+                            raise RateLimitError(f"Github's rate limit is spent until {datetime.fromtimestamp(now + wait, timezone.utc):%H:%M:%S} UTC, "
+                                                 f"{int(wait)} seconds away, which is longer than the {self.max_wait} second rate_limit_wait.")
+                        if not waiting:
+                            waiting = True
+                            print(f"Github's rate limit is spent. Waiting {int(wait)} seconds for it to reset.")
+                            self._metrics["waits"] += 1
+                            count('rate_limit_waits')
+                        self._condition.wait(wait)
+                        waited = time.time() - now
+                        self._metrics["wait_seconds"] += waited
+                        count('rate_limit_wait_seconds', round(waited, 3))
+                        continue
+                    capacity = self.capacity()
+                    self._metrics["lowest_capacity"] = min(self._metrics["lowest_capacity"], capacity)
+                    if self.in_flight < capacity and (cheap or not self._cheap_waiting):
+                        break
+                    if not throttled:
+                        throttled = True
+                        self._metrics["throttled"] += 1
+                        count('throttled_requests')
+                    # a timeout so a reset is noticed even if no request finishes.
+                    self._condition.wait(1)
+            finally:
+                if cheap:
+                    self._cheap_waiting -= 1
+            self.in_flight += 1
+            self._metrics["requests"] += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def update(self, response):
+        '''
+        Takes in the rate limit headers of a response. Returns True if the response is a rate limit refusal (429, or 403
+        with Retry-After or nothing remaining), in which case later requests wait for the Retry-After or the reset.
+        '''
+        headers = response.headers
+        with self._condition:
+            if headers.get('X-RateLimit-Remaining', '').isdigit():
+                self.remaining = int(headers['X-RateLimit-Remaining'])
+                self.limit = int(headers.get('X-RateLimit-Limit') or 0) or self.limit
+                self.reset = int(headers.get('X-RateLimit-Reset') or 0) or self.reset
+            limited = self.refused(response)
+            if limited:
+                self._metrics["rate_limited"] += 1
+                retry_after = headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    self.blocked_until = max(self.blocked_until, time.time() + int(retry_after))
+                elif self.reset is not None:
+                    self.remaining = 0
+                else:
+                    # a secondary rate limit without a Retry-After: github asks for at least a minute.
+                    self.blocked_until = max(self.blocked_until, time.time() + 60)
+            self._condition.notify_all()
+        return limited
+
+    @staticmethod
+    def refused(response):
+        '''
+        Returns whether the response is a rate limit refusal rather than, say, a bad token.
+        '''
+        return response.status_code == 429 or (response.status_code == 403 and ('Retry-After' in response.headers or response.headers.get('X-RateLimit-Remaining') == '0'))
+
+    def metrics(self):
+        '''
+        Returns the scheduler's decisions so far and the budget it last saw.
+        '''
+        with self._condition:
+            return {**self._metrics, "wait_seconds": round(self._metrics["wait_seconds"], 3), "in_flight": self.in_flight,
+                    "capacity": self.capacity(), "limit": self.limit, "remaining": self.remaining, "reset": self.reset}
+
+class GithubClient:
+    '''
+    One shared connection layer to the Github API. Keeps TCP+TLS connections alive in a pool, retries transient
+    failures with a backoff and sends If-None-Match for anything it has an ETag for so a 304 reuses the cached JSON.
+
+    Args:
+        cache_dir (string): the location of the on-disk ETag cache. None turns the ETag cache off.
+        retries (integer): the number of retries for connection errors and 5xx responses.
+        backoff (float): the backoff factor in seconds between retries (0.5, 1, 2, 4...).
+        pool_size (integer): the number of keep-alive connections kept per host.
+        timeout (integer): seconds to wait on a connection or a read before giving up.
+        rate_limit_wait (integer): the longest a request waits for the rate limit to reset (see RequestScheduler).
+
+    Example Usage:
+        >>> client = GithubClient(cache_dir="/tmp/jaab")
+        >>> client.get_json("https://api.github.com/repos/octocat/Hello-World/releases", token)
+    '''
+    def __init__(self, cache_dir=CACHE_DIR, retries=3, backoff=0.5, pool_size=16, timeout=60, rate_limit_wait=RATE_LIMIT_WAIT):
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            raise_on_status=False,
+            )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.timeout = timeout
+        self.etag_dir = os.path.join(cache_dir, 'etags') if cache_dir else None
+        self.scheduler = RequestScheduler(pool_size, rate_limit_wait)
+        self.rate_limit_retries = 3
+
+    def headers(self, token, extra=None):
+        headers = {'Authorization': f'token {token}'} if token else {}
+        if extra:
+            headers.update(extra)
+        return headers
+
+    def request(self, method, url, token, headers=None, **kwargs):
+        # raw file downloads don't count against the API rate limit, so only API requests go through the scheduler.
+        if url.startswith(GITHUB_RAW + '/'):
+            return self._send(method, url, token, headers, **kwargs)
+        cheap = 'If-None-Match' in (headers or {})
+        body = kwargs.get('data')
+        position = body.tell() if hasattr(body, 'seek') else None
+        for attempt in range(self.rate_limit_retries + 1):
+            with self.scheduler.slot(cheap):
+                r = self._send(method, url, token, headers, **kwargs)
+            if not self.scheduler.update(r) or attempt == self.rate_limit_retries:
+                return r
+            # refused for the rate limit: the next slot waits for the reset (or fails if that's too far off), then resend.
+            count('rate_limit_retries')
+            r.close()
+            if position is not None:
+                body.seek(position)
+        return r
+
+    def _send(self, method, url, token, headers=None, **kwargs):
+        # every call is timed and added to the report of the running build, if there is one.
+        started = time.perf_counter()
+        try:
+            r = self.session.request(method, url, headers=self.headers(token, headers), timeout=self.timeout, **kwargs)
+        except Exception:
+            record_http(method, url, None, time.perf_counter() - started)
+            raise
+        record_http(method, url, r, time.perf_counter() - started, kwargs.get('stream', False))
+        return r
+
+    def get(self, url, token, headers=None, **kwargs):
+        return self.request('GET', url, token, headers, **kwargs)
+
+    def post(self, url, token, headers=None, **kwargs):
+        return self.request('POST', url, token, headers, **kwargs)
+
+    def patch(self, url, token, headers=None, **kwargs):
+        return self.request('PATCH', url, token, headers, **kwargs)
+
+    def delete(self, url, token, headers=None, **kwargs):
+        return self.request('DELETE', url, token, headers, **kwargs)
+
+    def _etag_path(self, url, token, params):
+        # the token is part of the key so a cached private response is never served to a different token.
+        key = json.dumps([url, sorted((params or {}).items()), hashlib.sha256(str(token).encode()).hexdigest()])
+        return os.path.join(self.etag_dir, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def get_json(self, url, token, params=None):
+        cached = None
+        extra = {}
+        if self.etag_dir:
+            cache_file = self._etag_path(url, token, params)
+            try:
+                with open(cache_file, 'r') as file:
+                    cached = json.load(file)
+                extra['If-None-Match'] = cached['etag']
+            except (OSError, ValueError, KeyError):
+                cached = None
+
+        r = self.get(url, token, headers=extra, params=params)
+        if r.status_code == 304 and cached is not None:
+            count('etag_hits')
+            return cached['body']
+        if RequestScheduler.refused(r):
+            raise RateLimitError(f"{url} was refused for Github's rate limit after {self.rate_limit_retries} retries.")
+        if r.status_code == 404:
+            raise NotFoundError(f"{url} was not found (status code 404). Verify your token and try again.")
+        if r.status_code != 200:
+            raise Exception(f"The data was not retrieved with status code {r.status_code}. Verify your token and try again.")
+        daters = r.json()
+
+        if self.etag_dir and r.headers.get('ETag'):
+            # written to a temp file then renamed so a concurrent reader never sees half a file.
+            os.makedirs(self.etag_dir, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=self.etag_dir)
+            with os.fdopen(fd, 'w') as file:
+                json.dump({'etag': r.headers['ETag'], 'body': daters}, file)
+            os.replace(temp_name, cache_file)
+        return daters
+
+_client = None
+_client_lock = threading.Lock()
+# the Builder running in this thread (and the pool workers it started with submit_in_context), if any.
+_current_builder = contextvars.ContextVar('current_builder', default=None)
+
+def github_client():
+    '''
+    Returns the GithubClient of the Builder running the current build, otherwise the one shared by every API call in the
+    module, creating it on first use.
+
+    Returns:
+        _client (GithubClient): the client.
+    '''
+    global _client
+    builder = _current_builder.get()
+    if builder is not None:
+        return builder.client
+    with _client_lock:
+        if _client is None:
+            _client = GithubClient()
+    return _client
+
+def submit_in_context(pool, fn, *args, **kwargs):
+    '''
+    pool.submit, but fn runs with the caller's Builder (and so its client and caches) rather than the module's.
+    '''
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+############################
+#       BUILD REPORT       #
+############################
+
+# the stage of the build the current thread is in, for attributing HTTP calls.
+_current_stage = contextvars.ContextVar('current_stage', default=None)
+
+class BuildReport:
+    '''
+    Collects where the time and the bytes of a build went: the wall time of each stage, every HTTP call (time to the
+    response headers, bytes in and out, retries), counters such as cache hits, and the last Github rate-limit headers seen.
+    Safe to add to from any thread. A stage run on several threads at once counts the time of each.
+
+    Example Usage:
+        >>> report = BuildReport()
+        >>> with report.stage("download"):
+        ...     download_file(url, TOKEN, file)
+        >>> report.as_dict()["stages"]
+        {'download': {'seconds': 1.52, 'runs': 1}}
+    '''
+    # the response headers with Github's rate limit.
+    RATE_LIMIT_HEADERS = ('X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Used', 'X-RateLimit-Reset', 'X-RateLimit-Resource')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.seconds = None
+        self.stages = {}
+        self.calls = []
+        self.counters = {}
+        self.rate_limit = {}
+        self.details = {}
+
+    @contextmanager
+    def stage(self, name):
+        '''
+        Times the block as a stage. HTTP calls made in it, from this thread or ones it starts with submit_in_context, count toward it.
+        '''
+        context = _current_stage.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_stage.reset(context)
+            with self._lock:
+                totals = self.stages.setdefault(name, {"seconds": 0.0, "runs": 0})
+                totals["seconds"] += elapsed
+                totals["runs"] += 1
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def http(self, method, url, response, seconds, stream=False):
+        '''
+        Records one HTTP call. response is None for a call that never got one. The bytes in of a streamed response are
+        its Content-Length, and its time is to the headers (the body is part of the stage's time).
+        '''
+        call = {"method": method, "url": url.split('?')[0], "stage": _current_stage.get(), "seconds": round(seconds, 4),
+                "status": None, "bytes_in": 0, "bytes_out": 0, "retries": 0}
+        if response is not None:
+            call["status"] = response.status_code
+            if stream:
+                call["bytes_in"] = int(response.headers.get('Content-Length') or 0)
+            else:
+                call["bytes_in"] = len(response.content)
+            call["bytes_out"] = int(response.request.headers.get('Content-Length') or 0)
+            retries = getattr(response.raw, 'retries', None)
+            call["retries"] = len(retries.history) if retries is not None else 0
+        with self._lock:
+            self.calls.append(call)
+            if response is not None and 'X-RateLimit-Remaining' in response.headers:
+                self.rate_limit = {name[len('X-RateLimit-'):].lower(): response.headers.get(name) for name in self.RATE_LIMIT_HEADERS}
+
+    def finish(self, **details):
+        '''
+        Stops the clock on the build and keeps details (ex. the addins built) for the report.
+        '''
+        self.seconds = time.time() - self.started
+        self.details.update(details)
+
+    def as_dict(self):
+        with self._lock:
+            calls = list(self.calls)
+            report = {
+                **self.details,
+                "started": datetime.fromtimestamp(self.started, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "seconds": round(self.seconds if self.seconds is not None else time.time() - self.started, 3),
+                "stages": {name: {"seconds": round(totals["seconds"], 3), "runs": totals["runs"]} for name, totals in self.stages.items()},
+                "counters": dict(self.counters),
+                "rate_limit": dict(self.rate_limit),
+                }
+        by_stage = {}
+        for call in calls:
+            totals = by_stage.setdefault(call["stage"] or "other", {"requests": 0, "seconds": 0.0, "bytes_in": 0, "bytes_out": 0, "retries": 0, "errors": 0})
+            totals["requests"] += 1
+            totals["seconds"] = round(totals["seconds"] + call["seconds"], 4)
+            totals["bytes_in"] += call["bytes_in"]
+            totals["bytes_out"] += call["bytes_out"]
+            totals["retries"] += call["retries"]
+            totals["errors"] += call["status"] is None or call["status"] >= 400
+        report["http"] = {
+            "requests": len(calls),
+            "bytes_in": sum(call["bytes_in"] for call in calls),
+            "bytes_out": sum(call["bytes_out"] for call in calls),
+            "retries": sum(call["retries"] for call in calls),
+            "by_stage": by_stage,
+            "calls": calls,
+            }
+        return report
+
+    def markdown(self):
+        '''
+        Returns the report as Markdown tables, for $GITHUB_STEP_SUMMARY.
+        '''
+        report = self.as_dict()
+        lines = [f"### Project JAAB build: {', '.join(report.get('addins', [])) or 'no addin'}", "",
+                 f"{report['seconds']} s in total, {report['http']['requests']} requests, "
+                 f"{report['http']['bytes_in']:,} bytes in, {report['http']['bytes_out']:,} bytes out, {report['http']['retries']} retries.", "",
+                 "| Stage | Seconds | Requests | Bytes in | Bytes out | Retries |", "| --- | --- | --- | --- | --- | --- |"]
+        for name in list(report["stages"]) + [name for name in report["http"]["by_stage"] if name not in report["stages"]]:
+            stage_time = report["stages"].get(name, {}).get("seconds", "")
+            http = report["http"]["by_stage"].get(name, {})
+            lines.append(f"| {name} | {stage_time} | {http.get('requests', 0)} | {http.get('bytes_in', 0):,} | {http.get('bytes_out', 0):,} | {http.get('retries', 0)} |")
+        if report["counters"]:
+            lines += ["", "| Counter | Count |", "| --- | --- |"]
+            lines += [f"| {name} | {value} |" for name, value in sorted(report["counters"].items())]
+        if report["rate_limit"]:
+            lines += ["", f"Rate limit ({report['rate_limit'].get('resource') or 'core'}): {report['rate_limit'].get('remaining')} of "
+                          f"{report['rate_limit'].get('limit')} left, resets at {report['rate_limit'].get('reset')}."]
+        if report.get("scheduler"):
+            scheduler = report["scheduler"]
+            lines += ["", f"Request scheduler: {scheduler['requests']} requests, {scheduler['throttled']} held back for the rate limit, "
+                          f"{scheduler['rate_limited']} refused, {scheduler['waits']} waits for a reset ({scheduler['wait_seconds']} s), "
+                          f"lowest concurrency {scheduler['lowest_capacity']}."]
+        if report.get("excluded"):
+            excluded = report["excluded"]
+            lines += ["", f"Left out of the addin by .jaabignore and the exclude input: {len(excluded['files'])} files, "
+                          f"{excluded['bytes']:,} bytes ({excluded['compressed_bytes']:,} compressed)."]
+        if report.get("manifests"):
+            lines += ["", "| Addin | Manifest digest |", "| --- | --- |"]
+            lines += [f"| {name} | {digest} |" for name, digest in sorted(report["manifests"].items())]
+        if report.get("preflight"):
+            preflight = report["preflight"]
+            lines += ["", f"Preflight: {preflight['files']} external files ({preflight['bytes']:,} bytes) checked, {preflight['problems']} problems."]
+        if report.get("backfill"):
+            backfill = report["backfill"]
+            lines += ["", f"Backfill: {backfill['built']} of {backfill['releases']} releases built, {backfill['checkpointed']} "
+                          f"already built by an earlier run, {len(backfill['failed'])} failed."]
+            lines += [f"- {tag}: {error}" for tag, error in sorted(backfill["failed"].items())]
+        if report.get("plan"):
+            plan = report["plan"]
+            lines += ["", f"Plan only, nothing was built: {len(plan['addins'])} addins, about "
+                          f"{plan['release_bytes'] + plan['externals_bytes']:,} bytes to transfer."]
+        if "profile" in report:
+            lines += ["", f"Peak traced memory: {report['profile']['tracemalloc_peak_bytes']:,} bytes.", "", "```", report["profile"]["top"], "```"]
+        return "\n".join(lines) + "\n"
+
+def current_report():
+    '''
+    Returns the BuildReport of the Builder running the current build, or None.
+    '''
+    builder = _current_builder.get()
+    return builder.report if builder is not None else None
+
+@contextmanager
+def stage(name):
+    '''
+    report.stage for the running build. Does nothing outside of a Builder.
+    '''
+    report = current_report()
+    if report is None:
+        yield
+        return
+    with report.stage(name):
+        yield
+
+def count(name, amount=1):
+    '''
+    report.count for the running build. Does nothing outside of a Builder.
+    '''
+    report = current_report()
+    if report is not None:
+        report.count(name, amount)
+
+def record_http(method, url, response, seconds, stream=False):
+    '''
+    report.http for the running build. Does nothing outside of a Builder.
+    '''
+    report = current_report()
+    if report is not None:
+        report.http(method, url, response, seconds, stream)
+
+_profile_lock = threading.Lock()
+
+@contextmanager
+def profiled(report, top=25):
+    '''
+    profiles the block with cProfile (the calling thread) and tracemalloc (the whole process) and adds the slowest
+    functions and the peak traced memory to the report. Profiles from Builders running at the same time take turns.
+    '''
+    with _profile_lock:
+        profile = cProfile.Profile()
+        tracemalloc.start()
+        profile.enable()
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            text = io.StringIO()
+            pstats.Stats(profile, stream=text).sort_stats('cumulative').print_stats(top)
+            report.details["profile"] = {"tracemalloc_peak_bytes": peak, "top": text.getvalue().strip()}
+
+############################
+#      EXTERNALS CACHE     #
+############################
+
+def file_sha256(location):
+    '''
+    Works out the SHA-256 of a file on disk without reading all of it into memory.
+
+    Args:
+        location (string): the file to hash.
+
+    Returns:
+        (string): the hex SHA-256 of the file.
+    '''
+    digest = hashlib.sha256()
+    with open(location, "rb") as file:
+        for chunk in iter(lambda: file.read(1024*1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def git_blob_sha(location):
+    '''
+    Works out the git blob SHA of a file on disk, which is the SHA Github lists for it in a git tree.
+
+    Args:
+        location (string): the file to hash.
+
+    Returns:
+        (string): the 40 character hex SHA-1 of "blob <size>\\0" followed by the file contents.
+    '''
+    digest = hashlib.sha1(b"blob %d\0" % os.path.getsize(location))
+    with open(location, "rb") as file:
+        for chunk in iter(lambda: file.read(1024*1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ExternalsCache:
+    '''
+    A local content-addressed store for external files that lasts across builds. Files are kept by their git blob SHA,
+    so the same file pulled by any addin, repo or version is stored once, and an index maps (owner/repo, version, file)
+    to the SHA so a pinned version doesn't need its repo listed again. The least recently used files are removed once
+    the store is bigger than max_bytes.
+
+    Only versions that can't move on to other commits (tags and full commit SHAs, see pinned_version) are indexed, so a
+    branch is listed again every build. The index also keeps the commit of each tag found, so a tag is only looked up
+    once. Tags are treated as fixed: if a tag is moved, clear the cache_dir.
+
+    Args:
+        root (string): the folder the store is kept in. Persist it with actions/cache to reuse it across builds.
+        max_bytes (integer): the most disk the stored files can use.
+
+    Example Usage:
+        >>> cache = ExternalsCache("/home/runner/.cache/project-jaab/externals")
+        >>> cache.copy_to("95d09f2b10159347eece71399a7e2e907ea3df4f", "/home/runner/work/addin/libs/util.jsl")
+        True
+    '''
+    def __init__(self, root, max_bytes=CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        # index.json of older builds could hold branches, so the index of pinned versions is kept apart from it.
+        self.index_file = os.path.join(root, "pinned-index.json")
+        self._lock = threading.Lock()
+        try:
+            with open(self.index_file, "r") as file:
+                self.index = json.load(file)
+        except (OSError, ValueError):
+            self.index = {}
+        self._new_entries = {}
+
+    def blob_path(self, sha):
+        '''
+        Returns where the blob with the SHA is kept, whether or not it is stored yet.
+        '''
+        return os.path.join(self.root, "objects", sha[:2], sha[2:])
+
+    def lookup(self, owner_repo, version, needed_file):
+        '''
+        Returns a one entry dictionary shaped like externals_data for a file of a pinned version that is already stored, else None.
+        '''
+        if version.lower() == "latest":
+            return None
+        with self._lock:
+            entry = self.index.get(f"{owner_repo}@{version}:{needed_file}")
+        if entry is None or not os.path.exists(self.blob_path(entry[2])):
+            return None
+        count('externals_index_hits')
+        return {needed_file: entry}
+
+    def remember(self, owner_repo, version, needed_file, entry):
+        '''
+        Records which blob a file of a pinned version (see pinned_version) is, so later builds can skip listing the repo.
+        Saved by save().
+        '''
+        if version.lower() == "latest" or entry[0] != "file":
+            return
+        with self._lock:
+            self.index[f"{owner_repo}@{version}:{needed_file}"] = entry
+            self._new_entries[f"{owner_repo}@{version}:{needed_file}"] = entry
+
+    def tag_commit(self, owner_repo, tag):
+        '''
+        Returns the commit a tag of owner/repo was found at by pinned_version in this or an earlier build, else None.
+        '''
+        with self._lock:
+            return self.index.get(f"{owner_repo}@{tag}")
+
+    def remember_tag(self, owner_repo, tag, commit):
+        '''
+        Records the commit of a tag of owner/repo, so later builds know the tag is pinned without looking it up. Saved by save().
+        '''
+        with self._lock:
+            self.index[f"{owner_repo}@{tag}"] = commit
+            self._new_entries[f"{owner_repo}@{tag}"] = commit
+
+    def copy_to(self, sha, destination):
+        '''
+        Writes the stored blob to destination. Returns False (and writes nothing) if the blob isn't stored.
+        '''
+        if not sha:
+            return False
+        blob = self.blob_path(sha)
+        try:
+            shutil.copyfile(blob, destination)
+        except FileNotFoundError:
+            count('externals_cache_misses')
+            return False
+        # the modified time is the last time the blob was used, for the least recently used removal.
+        os.utime(blob)
+        count('externals_cache_hits')
+        return True
+
+    def contains(self, sha):
+        '''
+        Returns whether the blob is stored.
+        '''
+        return bool(sha) and os.path.exists(self.blob_path(sha))
+
+    def open_blob(self, sha):
+        '''
+        Opens the stored blob for reading, or returns None if it isn't stored.
+        '''
+        if not sha:
+            return None
+        blob = self.blob_path(sha)
+        try:
+            file = open(blob, "rb")
+        except FileNotFoundError:
+            count('externals_cache_misses')
+            return None
+        os.utime(blob)
+        count('externals_cache_hits')
+        return file
+
+    def add_file(self, sha, file):
+        '''
+        Stores the rest of an open file (already checked to have the SHA) under the SHA.
+        '''
+        if not sha:
+            return
+        blob = self.blob_path(sha)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(blob))
+        with os.fdopen(fd, "wb") as stored:
+            shutil.copyfileobj(file, stored)
+        os.replace(temp_name, blob)
+
+    def add(self, sha, location, verified=False):
+        '''
+        Stores a copy of the file at location under its SHA if its contents really have that SHA (skip the check with
+        verified=True if the caller already checked it). Returns whether it was stored.
+        '''
+        if not sha or (not verified and git_blob_sha(location) != sha):
+            return False
+        blob = self.blob_path(sha)
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(blob))
+        os.close(fd)
+        shutil.copyfile(location, temp_name)
+        os.replace(temp_name, blob)
+        return True
+
+    def save(self):
+        '''
+        Writes the index back to disk, keeping anything another build added in the meantime, then removes the least
+        recently used blobs until the store fits in max_bytes.
+        '''
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            try:
+                with open(self.index_file, "r") as file:
+                    on_disk = json.load(file)
+            except (OSError, ValueError):
+                on_disk = {}
+            on_disk.update(self._new_entries)
+            self.index = on_disk
+            self._new_entries = {}
+            fd, temp_name = tempfile.mkstemp(dir=self.root)
+            with os.fdopen(fd, "w") as file:
+                json.dump(self.index, file)
+            os.replace(temp_name, self.index_file)
+
+            blobs = []
+            for folder, dirs, files in os.walk(os.path.join(self.root, "objects")):
+                for name in files:
+                    stats = os.stat(os.path.join(folder, name))
+                    blobs.append((stats.st_mtime, stats.st_size, os.path.join(folder, name)))
+            total = sum(size for mtime, size, blob in blobs)
+            for mtime, size, blob in sorted(blobs):
+                if total <= self.max_bytes:
+                    break
+                os.remove(blob)
+                total -= size
+
+_externals_cache = None
+
+def externals_cache():
+    '''
+    Returns the ExternalsCache of the Builder running the current build, otherwise the one shared by every build in the
+    process, kept in the externals folder of the cache_dir.
+
+    Returns:
+        _externals_cache (ExternalsCache): the cache.
+    '''
+    global _externals_cache
+    builder = _current_builder.get()
+    if builder is not None:
+        return builder.cache
+    with _client_lock:
+        if _externals_cache is None:
+            _externals_cache = ExternalsCache(os.path.join(CACHE_DIR, "externals"))
+    return _externals_cache
+
+_lfs_cache = None
+
+def lfs_cache():
+    '''
+    Returns the Git LFS object store of the Builder running the current build, otherwise the one shared by every build
+    in the process, kept in the lfs folder of the cache_dir. It is an ExternalsCache with the objects kept by their OID.
+
+    Returns:
+        _lfs_cache (ExternalsCache): the store.
+    '''
+    global _lfs_cache
+    builder = _current_builder.get()
+    if builder is not None:
+        return builder.lfs_cache
+    with _client_lock:
+        if _lfs_cache is None:
+            _lfs_cache = ExternalsCache(os.path.join(CACHE_DIR, "lfs"))
+    return _lfs_cache
+
+def cache_dir():
+    '''
+    Returns the cache_dir of the Builder running the current build, otherwise the CacheDir of the action.
+    '''
+    builder = _current_builder.get()
+    if builder is not None:
+        return builder.cache_dir
+    return CACHE_DIR
+
+def default_external_source():
+    '''
+    Returns the external_source of the Builder running the current build, otherwise the ExternalSource of the action.
+    '''
+    builder = _current_builder.get()
+    if builder is not None:
+        return builder.config.external_source or 'github'
+    return EXTERNAL_SOURCE
 
 ############################
 #    SUPPORT FUNCTIONS     #
 ############################
 
-def json_out(url, token):
+def json_out(url, token, params=None):
     '''
-    Gathers the json output based on an input url from github API.
+    Gathers the json output based on an input url from github API. Goes through the shared GithubClient so the connection
+    is reused, transient failures are retried and an unchanged response (304) is served from the ETag cache.
 
     Args:
         url (string): A URL (weblink) that comes from the Github API in order to gather the release content information.
         token (string): Required for a private repo. This is the Github Token for authentication to access the release content.
+        params (dictionary): optional extra query parameters (ex. page, per_page).
 
     Returns:
         daters (list): A list of releases and the contents related to each release.
@@ -117,14 +976,157 @@ def json_out(url, token):
             }
         ]
     '''
-    params = {"state":"open"}
-    headers = {'Authorization':f'token {token}'}
-    r = requests.get(url, headers=headers, params=params)
-    if r.status_code != 200:
-        raise Exception(f"The data was not retrieved with status code {r.status_code}. Verify your token and try again.")
-    daters = r.json()
+    daters = github_client().get_json(url, token, params or {})
     return(daters)
 
+def json_pages(url, token, per_page=100, params=None):
+    '''
+    Walks a paginated list from the github API one page at a time, yielding each item as it arrives.
+    Stops asking for pages once a short page comes back, so a caller that stops early never downloads the rest.
+
+    Args:
+        url (string): A URL (weblink) for a list endpoint of the Github API (ex. releases).
+        token (string): Required for a private repo. This is the Github Token for authentication to access the release content.
+        per_page (integer): the number of items asked for per page. Github allows at most 100.
+        params (dictionary): optional extra query parameters sent with every page.
+
+    Returns:
+        item (dictionary): each item in the list, in the order Github returns them.
+
+    Example Usage:
+        >>> next(r for r in json_pages(f'https://api.github.com/repos/{owner}/{repo}/releases', token) if r["id"] == 1)
+    '''
+    page = 1
+    while True:
+        items = json_out(url, token, {**(params or {}), "per_page": per_page, "page": page})
+        yield from items
+        if len(items) < per_page:
+            return
+        page += 1
+
+def download_file(url, token, destination, chunk_size=1024*1024, headers=None):
+    '''
+    Streams a download from github into an open file in chunks so the whole download is never held in memory.
+
+    Args:
+        url (string): the URL (weblink) to download (ex. a zipball_url).
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        destination (file): a file opened for binary writing.
+        chunk_size (integer): the number of bytes read from the connection at a time.
+        headers (dictionary): extra headers for the request (ex. Accept for a release asset).
+
+    Raises:
+        Exception: the download was refused by github.
+
+    Example Usage:
+        >>> with open("tool_temp", "wb") as folder:
+        ...     download_file(data_from_release['zipball_url'], token, folder)
+    '''
+    with github_client().get(url, token, headers=headers, stream=True) as r:
+        if r.status_code != 200:
+            raise Exception(f"{url} was not downloaded with status code {r.status_code}. Verify your token and try again.")
+        for chunk in r.iter_content(chunk_size):
+            destination.write(chunk)
+
+def download_verified(url, token, destination, size=None, sha=None, attempts=4, chunk_size=64*1024, fetch=None):
+    '''
+    Streams a download to disk in chunks through a temp file next to destination, checks it against the size and git blob
+    SHA from the tree, then renames it into place so a partial or corrupt file is never left at destination.
+    A download cut off mid-transfer is picked back up where it stopped with a Range request.
+
+    Args:
+        url (string): the URL (weblink) of the raw file.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        destination (string): the location to write the file to.
+        size (integer): the size in bytes the file should be. None skips the check.
+        sha (string): the git blob SHA the file should have. None skips the check.
+        attempts (integer): how many times the download is started or resumed before giving up.
+        chunk_size (integer): the number of bytes read from the connection at a time.
+        fetch (function): what fills the temp file, download_into unless given another with its arguments (ex. the
+            fetch_into of an external source).
+
+    Returns:
+        destination (string): the location the file was written to.
+
+    Raises:
+        Exception: the download was refused, kept getting cut off, or doesn't match the size or SHA it should have.
+
+    Example Usage:
+        >>> download_verified(download_url, TOKEN, "/home/runner/work/addin/libs/util.jsl", 4, "4621784899563caa46e867cc96ed33dc4eb73499")
+    '''
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(destination), prefix=".download-")
+    try:
+        with os.fdopen(fd, "wb+") as file:
+            (fetch or download_into)(url, token, file, size, sha, attempts, chunk_size)
+        os.replace(temp_name, destination)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.remove(temp_name)
+        raise
+    return destination
+
+def download_into(url, token, file, size=None, sha=None, attempts=4, chunk_size=64*1024, headers=None, lfs=False):
+    '''
+    The part of download_verified that streams into an already open file (ex. a SpooledTemporaryFile), resuming with a
+    Range request when cut off and checking the size and git blob SHA. The file must be empty, seekable and readable.
+
+    Args:
+        file (file): the file to write to, opened for binary read and write.
+        headers (dictionary): more headers to send with every request (ex. the ones a Git LFS download action gives).
+        lfs (boolean): sha is a Git LFS OID (the SHA-256 of the contents) instead of a git blob SHA.
+        See download_verified for the others.
+
+    Returns:
+        received (integer): the number of bytes written.
+
+    Raises:
+        Exception: the download was refused, kept getting cut off, or doesn't match the size or SHA it should have.
+    '''
+    def new_digest():
+        if lfs:
+            return hashlib.sha256()
+        return hashlib.sha1(b"blob %d\0" % size) if size is not None else None
+
+    received = 0
+    digest = new_digest()
+    for attempt in range(attempts):
+        request_headers = {**(headers or {}), **({'Range': f'bytes={received}-'} if received else {})} or None
+        try:
+            with github_client().get(url, token, headers=request_headers, stream=True) as r:
+                if r.status_code == 200 and received:
+                    # the server ignored the Range, so start over.
+                    file.seek(0)
+                    file.truncate()
+                    received = 0
+                    digest = new_digest()
+                elif r.status_code not in (200, 206):
+                    raise Exception(f"{url} was not downloaded with status code {r.status_code}. Verify your token and try again.")
+                for chunk in r.iter_content(chunk_size):
+                    file.write(chunk)
+                    received += len(chunk)
+                    if digest is not None:
+                        digest.update(chunk)
+            if size is None or received >= size:
+                break
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout):
+            pass
+        print(f"The download of {url} was cut off at {received} bytes. Resuming.")
+        count('download_resumes')
+    else:
+        raise Exception(f"{url} could not be downloaded in full after {attempts} attempts.")
+
+    if size is not None and received != size:
+        raise Exception(f"{url} downloaded as {received} bytes but should be {size} bytes.")
+    if sha is not None:
+        if digest is None:
+            digest = hashlib.sha1(b"blob %d\0" % received)
+            file.seek(0)
+            for chunk in iter(lambda: file.read(1024*1024), b""):
+                digest.update(chunk)
+        if digest.hexdigest() != sha:
+            raise Exception(f"{url} downloaded with SHA {digest.hexdigest()} but should have {sha}.")
+    return received
+
 def stateDetermination(tagname):
     '''
     Takes in the tag name from the github data and looks for whether the version tag has RC, Beta or Alpha. If it does, it is test. 
@@ -140,20 +1142,33 @@ def stateDetermination(tagname):
         >>> stateDetermination("v1.0.5-Beta1")
         "TEST"
     '''
-    # commented out release_data['prerelease'] because it's possible people might not select this check mark and it may create a prod release of a tool when it's a test release.
-    #if release_data['prerelease'] == False:
-    release_list = tagname.split("-")
-    # if tag name doesn't have a "-", the length of the list will only be 1 long and a 2nd slot won't exist.
-    if len(release_list) == 2:
+    if release_state(tagname) == "TEST":
         print('Release is a RC, Beta or Alpha release and will be deployed in testing.')
         return "TEST"
     else:
         print('Release is a production release and will be deployed in production.')
         return "PROD"
 
+def release_state(tagname):
+    '''
+    stateDetermination without the message, for checking many tags at once.
+    '''
+    # commented out release_data['prerelease'] because it's possible people might not select this check mark and it may create a prod release of a tool when it's a test release.
+    #if release_data['prerelease'] == False:
+    release_list = tagname.split("-")
+    # if tag name doesn't have a "-", the length of the list will only be 1 long and a 2nd slot won't exist.
+    return "TEST" if len(release_list) == 2 else "PROD"
+
+# a version tag: V or v, numbers separated by dots, then optionally a - and a pre-release such as RC1, Beta2 or rc.3.
+VERSION_PATTERN = re.compile(r'^V?(\d+(?:\.\d+)*)(?:-(ALPHA|BETA|RC)\.?(\d+))?$', re.IGNORECASE)
+# where each kind of pre-release starts in the 1000 numbers under its release. Each has room for numbers 0 to 299.
+PRE_RELEASE_BASE = {'ALPHA': 100, 'BETA': 400, 'RC': 700}
+
 def verCharToNum(textVersion):
     '''
     Takes in the textVersion of the version tag from the Github Release information and converts it to a numerical version.
+    The last number of the tag counts 1000 (plus 1 for a release) and each one before it 100 times the one after it.
+    Pre-releases (Alpha, Beta then RC) of a version are numbered below the release itself and above the version before it.
 
     Args:
         textVersion (string): A string that is the version information from the github release.
@@ -161,66 +1176,41 @@ def verCharToNum(textVersion):
     Returns:
         numberVersion (integer): A integer that equates to the text version.
 
+    Raises:
+        ValueError: the tag isn't a version number (a suffix other than Alpha, Beta or RC and its number included), or a
+            pre-release number is over 299.
+
     Example Usage:
         >>> verCharToNum("V1.0.9")
         10009001
+        >>> verCharToNum("V1.0.9-RC1")
+        10008701
+        >>> verCharToNum("v1.0.9-rc.2")
+        10008702
+    '''
+    return version_number(textVersion.strip())
+
+@functools.lru_cache(maxsize=4096)
+def version_number(tag):
+    '''
+    The memoized parser behind verCharToNum.
     '''
-    txtVer = textVersion.replace('V','')
-    #print(textVersion, txtVer)
+    match = VERSION_PATTERN.match(tag)
+    if match is None:
+        raise ValueError(f"The tag {tag} isn't a version number such as v1.0.9, v1.0.9-RC1 or v1.0.9-rc.1.")
+    numbers, kind, pre_number = match.groups()
 
-    parts = txtVer.split('.')
+    parts = [int(value) for value in numbers.split('.')]
     parts.reverse()
-    #print(parts)
-
-    newList = []
-    for index, value in enumerate(parts):
-        # print(index, value)
-        if index == 0:
-            base = 100000
-            firstNum = int(value.split('-')[0]) * 1000
-            # print('first num = ' + str(firstNum))
-            try:
-                preTemp = value.split('-')[1].upper()
-            except:
-                preTemp = value.split('-')[0].upper()
-            # print(preTemp)
-            preVerBase = 10
-            if 'ALPHA' in preTemp:
-                # print("in alpha")
-                verTemp = preTemp.replace('ALPHA','')
-                # print(verTemp)
-                preVer = int(verTemp) * preVerBase + 2
-                # print(preVer)
-            elif 'BETA' in preTemp:
-                #print("in beta")
-                verTemp = preTemp.replace('BETA','')
-                #print(verTemp)
-                preVer = int(verTemp) * preVerBase + 3
-                #print(preVer)
-            elif 'RC' in preTemp:
-                # print("in rc")
-                verTemp = preTemp.replace('RC','')
-                # print(verTemp)
-                preVer = int(verTemp) * preVerBase + 4
-                # print(preVer)
-            else:
-                preVer = 1
-                # print(preVer)
-            number = firstNum + preVer
-            # print('first number is ' + str(number))
-        else:
-            base = 100
-            # print(value,index)
-            number = int(value) * (base ** (index)) * 1000
-            # print(number)
-        newList.append(number)
-        # print(newList)
-    if sum(newList) == 0:
-        numberVersion = "fail"
-    else:
-        numberVersion = sum(newList)
-    
-    return(numberVersion)
+    numberVersion = parts[0] * 1000 + sum(value * (100 ** index) * 1000 for index, value in enumerate(parts) if index)
+    if kind is None:
+        return numberVersion + 1
+    pre_number = int(pre_number)
+    if pre_number > 299:
+        raise ValueError(f"The tag {tag} has a pre-release number over 299.")
+    if numberVersion == 0:
+        raise ValueError(f"The tag {tag} is a pre-release of version 0, which has no number under it.")
+    return numberVersion - 1000 + PRE_RELEASE_BASE[kind.upper()] + pre_number
 
 def buildDate(date):
     '''
@@ -247,6 +1237,16 @@ def buildDate(date):
     total_time = int(total_time_seconds)
     return total_time
 
+def release_time(date):
+    '''
+    Takes in the release date information from the Github Release information and converts it to a zip member timestamp.
+
+    Example Usage:
+        >>> release_time("2023-03-24T21:06:48Z")
+        (2023, 3, 24, 21, 6, 48)
+    '''
+    return datetime.strptime(date, "%Y-%m-%dT%H:%M:%SZ").timetuple()[:6]
+
 def needed_variables(json_data):
     '''
     Takes in the Github Release information and parses out necessary variables for downstream usage.
@@ -268,32 +1268,343 @@ def needed_variables(json_data):
     deployment_state = stateDetermination(json_data["tag_name"])
     return(ver_num, jmp_date, deployment_state)
 
-############################
-#  ADDIN BUILDER FUNCTIONS #
-############################
+def addin_filename(addin_name, tag_name, deployment_state, tag_suffix):
+    '''
+    works out the filename of the finished addin.
 
-def release_data(owner_repo, token, runid):
+    Args:
+        addin_name (string): the addin name.
+        tag_name (string): the release tag.
+        deployment_state (string): Test or Prod deployment type.
+        tag_suffix (string): "true" to always add the tag to the name. TEST builds get the tag either way.
+
+    Returns:
+        (string): the filename, with the .jmpaddin extension.
+
+    Example Usage:
+        >>> addin_filename("addin_name", "v1.0.0", "PROD", "false")
+        'addin_name.jmpaddin'
     '''
-    Gets the release data from the Github API related to the release that triggered the action. 
-    If no event triggered the action (i.e. the action was manually triggered), it defaults to the latest (which is the [0] slice).
+    if tag_suffix.lower() == "true":
+        addin_final = addin_name + "_" + tag_name
+    elif tag_suffix.lower() == "false" and deployment_state == "TEST":
+        addin_final = addin_name + "_" + tag_name
+    else:
+        addin_final = addin_name
+    return addin_final + '.jmpaddin'
+
+def generated_files(ver_num, jmp_date, deployment_state, make_meta_file, author, addinid, addinname, pubname, pubpath):
+    '''
+    builds the text of the generated files other than addin.jmpcust (which needs the template from the repo).
 
     Args:
-        owner_repo (string): the owner and repo to query for the Github Release information.
-        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
-        runid (string): a unique code related to the release to make sure the "latest" is the one that triggered the action. 
-            This is empty when the action is manually triggered and thus defaults to the latest in the list at slice 0.
+        make_meta_file (string): "true" to include customMetaData.jsl. See CustomMeta for the others.
 
     Returns:
-        release(list): The specific list information to the release targetted for packaging.
+        generated_text (dictionary): the member name and text of addin.def and, if asked for, customMetaData.jsl.
+    '''
+    generated_text = {"addin.def": addin_def_text(ver_num, addinid, addinname)}
+    if make_meta_file.lower() == "true":
+        generated_text["customMetaData.jsl"] = custom_meta_text(jmp_date, deployment_state, ver_num, author, addinid, addinname, pubname, pubpath)
+    return generated_text
+
+############################
+#       PLACEHOLDERS       #
+############################
+
+class Placeholders:
+    '''
+    The placeholders filled in to the text members of the addin (and addin.jmpcust) and the members they apply to.
+    Every placeholder is replaced in one pass over the bytes as they stream into the archive, so a file is never read
+    into memory in full or gone over once per placeholder. Where two placeholders start at the same place the longer wins.
+
+    Args:
+        values (dictionary): each placeholder and the text it is replaced with.
+        globs (list): the members (ex. *.jsl, scripts/*) to fill the placeholders in to, matched without regard to case.
 
     Example Usage:
-        >>> release_data("octocat/Hello-World", {token}, 1)
-        [
-            {
-                "url": "https://api.github.com/repos/octocat/Hello-World/releases/1",
-                "html_url": "https://github.com/octocat/Hello-World/releases/v1.0.0",
-                "assets_url": "https://api.github.com/repos/octocat/Hello-World/releases/1/assets",
-                "upload_url": "https://uploads.github.com/repos/octocat/Hello-World/releases/1/assets{?name,label}",
+        >>> placeholders = Placeholders({"TOOLTAG": "v1.0.0", "AdDinIDDoNotTouCHY": "com.company.addin"}, ["*.jsl"])
+        >>> placeholders.expand_text("$ADDIN_HOME(AdDinIDDoNotTouCHY) TOOLTAG")
+        '$ADDIN_HOME(com.company.addin) v1.0.0'
+    '''
+    def __init__(self, values, globs=()):
+        self.values = {key.encode("utf-8"): str(value).encode("utf-8") for key, value in values.items() if key}
+        self.globs = [glob.lower() for glob in globs]
+        self.longest = max(map(len, self.values), default=0)
+        # longest first, so a placeholder that starts with another one is matched whole.
+        self.pattern = re.compile(b"|".join(re.escape(key) for key in sorted(self.values, key=len, reverse=True))) if self.values else None
+
+    def applies(self, arcname):
+        '''
+        Returns whether the placeholders are filled in to the member of that name.
+        '''
+        return self.pattern is not None and any(fnmatch.fnmatchcase(arcname.lower(), glob) for glob in self.globs)
+
+    def expand(self, chunks):
+        '''
+        Yields the chunks (bytes) with every placeholder replaced. Only the last few bytes of a chunk, in case a
+        placeholder runs into the next one, are held back at a time.
+        '''
+        if self.pattern is None:
+            yield from chunks
+            return
+        pending = b""
+        replaced = 0
+        for chunk in chunks:
+            pending += chunk
+            # a placeholder starting before safe has all of its bytes in pending, so whether it matches is known.
+            safe = len(pending) - (self.longest - 1)
+            output = []
+            position = 0
+            for match in self.pattern.finditer(pending):
+                if match.start() >= safe:
+                    break
+                output += [pending[position:match.start()], self.values[match.group()]]
+                position = match.end()
+                replaced += 1
+            held = max(position, safe)
+            output.append(pending[position:held])
+            pending = pending[held:]
+            yield b"".join(output)
+        tail, tail_replaced = self.pattern.subn(lambda match: self.values[match.group()], pending)
+        replaced += tail_replaced
+        yield tail
+        if replaced:
+            count('placeholders_replaced', replaced)
+
+    def expand_text(self, text):
+        '''
+        expand for a string held in memory (ex. the jmpcust template).
+        '''
+        return b"".join(self.expand([text.encode("utf-8")])).decode("utf-8")
+
+def member_chunks(file, placeholders=None, chunk_size=1024*1024):
+    '''
+    reads an open file in chunks, with the placeholders filled in if there are any.
+
+    Args:
+        file (file): the file, opened for binary reading.
+        placeholders (Placeholders): the placeholders to fill in. None reads the file as it is.
+        chunk_size (integer): the number of bytes read at a time.
+
+    Returns:
+        (iterator): the chunks (bytes).
+    '''
+    chunks = iter(lambda: file.read(chunk_size), b"")
+    return placeholders.expand(chunks) if placeholders is not None else chunks
+
+def release_placeholders(tag_name, ver_num, jmp_date, deployment_state, addin_id, addin_name, author, extra="", files=""):
+    '''
+    builds the placeholders of a build: TOOLTAG and AdDinIDDoNotTouCHY (the ones the jmpcust template has always had),
+    the version number, build date and state from needed_variables, the addin name and author, then any from the
+    placeholders input, which can add more or change these.
+
+    Args:
+        tag_name (string): the release tag, for TOOLTAG.
+        ver_num (integer): the version number, for JAAB_VERSION.
+        jmp_date (integer): the build date in JMP format, for JAAB_BUILD_DATE.
+        deployment_state (string): Test or Prod deployment type, for JAAB_STATE.
+        addin_id (string): the addin id, for AdDinIDDoNotTouCHY.
+        addin_name (string): the addin name, for JAAB_ADDIN_NAME.
+        author (string): the author input, for JAAB_AUTHOR without the quotes around it.
+        extra (string): the placeholders input, a PLACEHOLDER=value per line.
+        files (string): the placeholder_files input, globs of the members to fill in separated by commas, spaces or new lines.
+
+    Returns:
+        (Placeholders): the placeholders.
+
+    Raises:
+        ValueError: a line of the placeholders input has no =.
+
+    Example Usage:
+        >>> release_placeholders("v1.0.0", 1000001, 3786246245, "PROD", "com.company.addin", "addin_name", '"Rando"', "", "*.jsl")
+    '''
+    values = {
+        "TOOLTAG": tag_name,
+        "AdDinIDDoNotTouCHY": addin_id,
+        "JAAB_ADDIN_NAME": addin_name,
+        "JAAB_VERSION": ver_num,
+        "JAAB_BUILD_DATE": jmp_date,
+        "JAAB_STATE": deployment_state,
+        "JAAB_AUTHOR": author.strip().strip('"'),
+        }
+    for line in extra.splitlines():
+        if not line.strip():
+            continue
+        if "=" not in line:
+            raise ValueError(f"{line.strip()} in the placeholders input isn't in the format PLACEHOLDER=value.")
+        key, value = line.split("=", 1)
+        values[key.strip()] = value.strip()
+    return Placeholders(values, [glob for glob in re.split(r'[\s,]+', files.strip()) if glob])
+
+############################
+#     IGNORE FUNCTIONS     #
+############################
+
+class IgnoreSpec:
+    '''
+    The files to leave out of the addin, written like a .gitignore: a pattern per line, # for comments, ! in front of a
+    pattern to put back what an earlier one left out, a / at the end to only match folders and a / at the start or in
+    the middle to match from the top of the repo only. * and ? don't match a / and ** matches any number of folders.
+    The last pattern that matches a path decides, and nothing inside a folder that is left out can be put back.
+
+    Args:
+        lines (list): the lines of the spec.
+
+    Example Usage:
+        >>> spec = IgnoreSpec(["docs/", "*.psd", "!logo.psd"])
+        >>> spec.excluded("docs/guide.md"), spec.excluded("art/logo.psd"), spec.excluded("main.jsl")
+        (True, False, False)
+    '''
+    def __init__(self, lines):
+        self.rules = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negated = line.startswith("!")
+            if negated or line.startswith("\\!") or line.startswith("\\#"):
+                line = line[1:]
+            folders_only = line.endswith("/")
+            line = line.rstrip("/")
+            if not line:
+                continue
+            anchored = "/" in line
+            body = self._glob_regex(line.lstrip("/"))
+            pattern = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+            self.rules.append((pattern, negated, folders_only))
+        self._folders = {}
+
+    @staticmethod
+    def _glob_regex(glob):
+        # the regular expression for one pattern, with / kept as the folder separator.
+        regex = ""
+        i = 0
+        while i < len(glob):
+            character = glob[i]
+            if glob.startswith("**/", i):
+                regex += "(?:.*/)?"
+                i += 3
+                continue
+            if glob.startswith("**", i):
+                regex += ".*"
+                i += 2
+                continue
+            if character == "*":
+                regex += "[^/]*"
+            elif character == "?":
+                regex += "[^/]"
+            elif character == "[" and "]" in glob[i + 2:]:
+                end = glob.index("]", i + 2)
+                members = glob[i + 1:end]
+                regex += "[" + ("^" + members[1:] if members.startswith("!") else members).replace("\\", "\\\\") + "]"
+                i = end
+            elif character == "\\" and i + 1 < len(glob):
+                i += 1
+                regex += re.escape(glob[i])
+            else:
+                regex += re.escape(character)
+            i += 1
+        return regex
+
+    def _matches(self, path, folder):
+        # whether the last rule that matches the path leaves it out.
+        excluded = False
+        for pattern, negated, folders_only in self.rules:
+            if (folder or not folders_only) and pattern.match(path):
+                excluded = not negated
+        return excluded
+
+    def excluded(self, path):
+        '''
+        Returns whether the file (or the folder, if path ends with /) at path in the repo is left out of the addin.
+        '''
+        folder = path.endswith("/")
+        parts = path.rstrip("/").split("/")
+        for end in range(1, len(parts)):
+            parent = "/".join(parts[:end])
+            if parent not in self._folders:
+                self._folders[parent] = self._matches(parent, True)
+            if self._folders[parent]:
+                return True
+        return self._matches(path.rstrip("/"), folder)
+
+def release_exclusions(source_zip, exclude=""):
+    '''
+    works out which members of the release zipball are left out of the addin by the .jaabignore at the top of the repo
+    (if there is one) followed by the exclude input, so they are never extracted, copied or compressed. .github/ is
+    always left out by the builders anyway, so it isn't checked, and the .jaabignore itself is always left out.
+    What is left out and the bytes that saves are printed and added to the build report (the same for every addin of a batch).
+
+    Args:
+        source_zip (ZipFile): the release zipball opened for reading.
+        exclude (string): the exclude input, more .jaabignore lines.
+
+    Returns:
+        excluded (dictionary): the path in the repo and size of each member left out.
+
+    Example Usage:
+        >>> release_exclusions(zipball, "tests/\\n*.md")
+        {'README.md': 5120, 'tests/': 0, 'tests/test_main.jsl': 2048}
+    '''
+    lines = [".jaabignore"]
+    try:
+        lines += read_release_member(source_zip, ".jaabignore").splitlines()
+    except KeyError:
+        pass
+    lines += exclude.splitlines()
+    spec = IgnoreSpec(lines)
+
+    excluded = {}
+    compressed = 0
+    for info in source_zip.infolist():
+        arcname = info.filename.split("/", 1)[1] if "/" in info.filename else ""
+        if arcname == "" or arcname == ".github/" or arcname.startswith(".github/"):
+            continue
+        if spec.excluded(arcname):
+            excluded[arcname] = info.file_size
+            compressed += info.compress_size
+
+    files = sorted(arcname for arcname in excluded if not arcname.endswith("/"))
+    if excluded:
+        print(f"{len(files)} files ({sum(excluded.values()):,} bytes) are left out of the addin by .jaabignore and the exclude input.")
+    report = current_report()
+    if report is not None and excluded:
+        report.details["excluded"] = {"files": files, "bytes": sum(excluded.values()), "compressed_bytes": compressed}
+    return excluded
+
+############################
+#  ADDIN BUILDER FUNCTIONS #
+############################
+
+def release_data(owner_repo, token, runid):
+    '''
+    Gets the release data from the Github API related to the release that triggered the action. 
+    If no event triggered the action (i.e. the action was manually triggered), it defaults to the latest (which is the [0] slice).
+    A known run id is fetched directly from /releases/{id}; only if that fails is the release list searched, page by page,
+    stopping at the first match.
+
+    Args:
+        owner_repo (string): the owner and repo to query for the Github Release information.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        runid (string): a unique code related to the release to make sure the "latest" is the one that triggered the action. 
+            This is empty when the action is manually triggered and thus defaults to the latest in the list at slice 0.
+
+    Returns:
+        release(list): The specific list information to the release targetted for packaging.
+
+    Raises:
+        ValueError: no release matches the run id.
+        RateLimitError: Github's rate limit ran out. Any other failure of the direct lookup but a 404 is raised too.
+
+    Example Usage:
+        >>> release_data("octocat/Hello-World", {token}, 1)
+        [
+            {
+                "url": "https://api.github.com/repos/octocat/Hello-World/releases/1",
+                "html_url": "https://github.com/octocat/Hello-World/releases/v1.0.0",
+                "assets_url": "https://api.github.com/repos/octocat/Hello-World/releases/1/assets",
+                "upload_url": "https://uploads.github.com/repos/octocat/Hello-World/releases/1/assets{?name,label}",
                 "tarball_url": "https://api.github.com/repos/octocat/Hello-World/tarball/v1.0.0",
                 "zipball_url": "https://api.github.com/repos/octocat/Hello-World/zipball/v1.0.0",
                 "id": 1,
@@ -365,62 +1676,171 @@ def release_data(owner_repo, token, runid):
             }
         ]
     '''
-    query_url = f"https://api.github.com/repos/{owner_repo}/releases"
-
-    release = json_out(query_url, token)
+    query_url = f"{GITHUB_API}/repos/{owner_repo}/releases"
 
-    index = 0
-    slice = 0
     if runid:
-        for key in release:
-            #print(key)
-            for keys in key:
-                #print(keys)
-                #print(key[keys])
-                if key[keys] == int(runid):
-                    slice = index
-                    return release[slice]
-            index += 1
+        # the run id is the release id, so the release can be asked for directly.
+        # only a 404 is searched for. A rate limit, auth or network failure would fail the search too, so it is raised.
+        try:
+            return json_out(f"{query_url}/{int(runid)}", token)
+        except NotFoundError:
+            print(f"Release {runid} was not found directly. Searching the release list for it.")
+        for release in json_pages(query_url, token, params={"state": "open"}):
+            if int(runid) in release.values():
+                return release
+        raise ValueError(f"No release in {owner_repo} matches the run id {runid}.")
     else:
+        # /releases/latest skips pre-releases, so the newest release (RC, Beta and Alpha included) is the first of a 1 item page.
+        release = json_out(query_url, token, {"state": "open", "per_page": 1})
         return release[0]
 
-def write_release_output(data_from_release, token, save_location):
+def write_release_output(data_from_release, token, save_location, exclude="", source_dir="", lfs=True):
     '''
     gathers the zipball_url from the Github release output and saves it to a location for addin packaging.
+    Files left out by the .jaabignore and the exclude input (see release_exclusions) are never extracted.
+    Git LFS pointer files are replaced with their objects (see fetch_lfs_objects).
     
     Args:
         data_from_release (list): The specific list information to the release targetted for packaging.
         token (string): Github authentication token produced and recognized by github for authentication to a private repo.
         save_location (string): the location where the files are being saved for packaging.
+        exclude (string): the exclude input, more .jaabignore lines.
+        source_dir (string): a checkout of the release to use instead of downloading the zipball (see release_zipball).
+        lfs (boolean): replace Git LFS pointer files with their objects. False leaves the pointers as they are.
 
     Returns:
         os.path.join(save_location, tool_name) (string): the location created specifically for the tool where things will be packaged.
     '''
     zip_url = data_from_release['zipball_url']
-    headers = {'Authorization': f'token {token}'}
 
     # eventually passed in through REPO name env variable so this won't matter.
     zip_url_split = zip_url.split('/')
     tool_name = zip_url_split[5]
 
-    # change directory to save location
-    os.chdir(save_location)
-    zip_data = requests.get(zip_url, headers=headers)
-    # open the zip name and write the contents to the folder. This is the main directory when this script is executed. Not sure how this will play out for an action.
-    with open(tool_name+"_temp", "wb") as folder:
-        folder.write(zip_data.content)
-        folder.close()
+    zip_temp = os.path.join(save_location, tool_name+"_temp")
+    # stream the zip to the folder in chunks rather than holding all of it in memory. This is the main directory when this script is executed.
+    with open(zip_temp, "wb") as folder:
+        # nothing is compressed, as it's only extracted again.
+        release_zipball(data_from_release, token, folder, source_dir, level=0)
     # extracts the zip contents and writes the contents to a directory of your choosing. 
-    with zipfile.ZipFile(tool_name+"_temp", 'r') as zipped:
-        zipped.extractall()
+    with zipfile.ZipFile(zip_temp, 'r') as zipped:
+        excluded = release_exclusions(zipped, exclude)
+        zipped.extractall(save_location, [info for info in zipped.infolist() if info.filename.split("/", 1)[-1] not in excluded])
         files = zipped.namelist()
+        pointers = release_lfs_pointers(zipped, excluded) if lfs else {}
     zip_name = files[0].strip("/")
-    os.rename(zip_name, tool_name)
+    # a folder left by an earlier build in the same place (ex. a backfill started over) is replaced.
+    shutil.rmtree(os.path.join(save_location, tool_name), ignore_errors=True)
+    os.rename(os.path.join(save_location, zip_name), os.path.join(save_location, tool_name))
+    if pointers:
+        with stage("lfs"):
+            cache = fetch_lfs_objects(release_repo(data_from_release), token, data_from_release['tag_name'], pointers.values())
+            for arcname, (oid, size) in pointers.items():
+                destination = os.path.join(save_location, tool_name, *arcname.split("/"))
+                if cache.copy_to(oid, destination):
+                    continue
+                with open_lfs_object(release_repo(data_from_release), token, data_from_release['tag_name'], oid, size) as contents, \
+                        open(destination, "wb") as file:
+                    shutil.copyfileobj(contents, file, 1024*1024)
     #print(files)
     # deletes the original zip file.
-    os.remove(tool_name+"_temp")
+    os.remove(zip_temp)
     return os.path.join(save_location, tool_name)
 
+def release_zipball(data_from_release, token, destination, source_dir="", level=6):
+    '''
+    writes the release's zipball to an open file. When source_dir is a git checkout of the release's tag commit with no
+    changes to its tracked files (as actions/checkout leaves it), the zipball is made locally with git archive, just as
+    Github makes it, instead of downloaded. Otherwise, or if that fails, it is downloaded.
+
+    Args:
+        data_from_release (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        destination (file): a file opened for binary writing, empty.
+        source_dir (string): the checkout to try first. "" always downloads.
+        level (integer): the deflate level for a zipball made locally, 0 (no compression) to 9.
+
+    Returns:
+        (boolean): True if the zipball was made from source_dir, False if it was downloaded.
+
+    Example Usage:
+        >>> with open("tool_temp", "wb") as folder:
+        ...     release_zipball(data_from_release, token, folder, os.environ["GITHUB_WORKSPACE"])
+        True
+    '''
+    if source_dir:
+        commit = local_release_commit(data_from_release, token, source_dir)
+        if commit is not None:
+            owner_repo = release_repo(data_from_release)
+            # github puts everything in an <owner>-<repo>-<short sha>/ folder.
+            prefix = owner_repo.replace('/', '-') + '-' + commit[:7] + '/'
+            start = destination.tell()
+            try:
+                # stderr goes to a file so a chatty git can't fill the pipe while stdout is being read.
+                with tempfile.TemporaryFile() as messages:
+                    with subprocess.Popen(['git', '-C', source_dir, 'archive', '--format=zip', f'-{level}', f'--prefix={prefix}', commit],
+                                          stdout=subprocess.PIPE, stderr=messages) as archive:
+                        shutil.copyfileobj(archive.stdout, destination, 1024*1024)
+                    messages.seek(0)
+                    errors = messages.read().decode(errors='replace').strip()
+                if archive.returncode == 0:
+                    print(f"The release is packaged from the checkout in {source_dir} at {commit[:7]} rather than downloaded.")
+                    count('local_source')
+                    return True
+                print(f"git archive of {source_dir} failed ({errors}). Downloading the release instead.")
+            except OSError as e:
+                print(f"git archive of {source_dir} failed ({e}). Downloading the release instead.")
+            destination.seek(start)
+            destination.truncate()
+    download_file(data_from_release['zipball_url'], token, destination)
+    return False
+
+def local_release_commit(data_from_release, token, source_dir):
+    '''
+    checks that a folder is a git checkout of the release's tag commit with no changes to its tracked files.
+
+    Args:
+        data_from_release (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        source_dir (string): the folder to check.
+
+    Returns:
+        commit (string): the commit SHA if the checkout can be used in place of the zipball, otherwise None (and why is printed).
+    '''
+    def git(*arguments):
+        result = subprocess.run(['git', '-C', source_dir, *arguments], capture_output=True, text=True)
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    try:
+        head = git('rev-parse', '--verify', 'HEAD^{commit}')
+    except OSError:
+        print("git isn't installed, so the release is downloaded.")
+        return None
+    if not head:
+        print(f"{source_dir} isn't a git checkout, so the release is downloaded.")
+        return None
+
+    owner_repo = release_repo(data_from_release)
+    tag = data_from_release['tag_name']
+    # the preflight and the build both check the checkout, so the running build looks the tag up once.
+    builder = _current_builder.get()
+    tag_commits = builder.tag_commits if builder is not None else {}
+    tagged = tag_commits.get((owner_repo, tag))
+    if tagged is None:
+        try:
+            tagged = json_out(f"{GITHUB_API}/repos/{owner_repo}/commits/{requests.utils.quote(tag, safe='')}", token)['sha']
+        except Exception as e:
+            print(f"The commit of {tag} could not be looked up ({e}), so the release is downloaded.")
+            return None
+        tag_commits[(owner_repo, tag)] = tagged
+    if head != tagged:
+        print(f"The checkout in {source_dir} is at {head[:7]} but {tag} is {tagged[:7]}, so the release is downloaded.")
+        return None
+    if git('status', '--porcelain', '--untracked-files=no') != "":
+        print(f"The checkout in {source_dir} has changes to its files, so the release is downloaded.")
+        return None
+    return head
+
 def config_parse(temp_location, config_name):
     '''
     takes in the temp location where the .ini file is being stored and creates a dictionary
@@ -442,8 +1862,23 @@ def config_parse(temp_location, config_name):
     #initialize the config parser and reading.
     config = configparser.ConfigParser()
     config.read(location)
-    config.sections()
-    
+    return(externals_from_config(config))
+
+def externals_from_config(config):
+    '''
+    takes in a read configparser of the .ini file and creates the dictionary of the external files from the [external_files] section.
+
+    Args:
+        config (ConfigParser): the .ini file after it has been read, from a file on disk or straight from the release zip.
+
+    Returns:
+        files_dict (dictionary): a dictionary of the needed files from the .ini file.
+
+    Example Usage:
+        >>> config = configparser.ConfigParser()
+        >>> config.read_string(ini_text)
+        >>> libs_info = externals_from_config(config)
+    '''
     #loading the variables into a dictionary to return for each variable location.
     #starting with the files needed for the libraries.
     files_dict = {}
@@ -472,17 +1907,24 @@ def CustomMeta(savePath, jmpBuildDate, addinState, ver_num, author, addinid, add
     Returns:
         N/A
     '''
+    customMetaDataText = custom_meta_text(jmpBuildDate, addinState, ver_num, author, addinid, addinname, pubname, pubpath)
 
-    customMetaDataText = '/* DO NOT EDIT THIS FILE YOURSELF AS IT IS CHANGED BY PROJECT JAAB(https://github.com/sage-darling/Project-JAAB) */\n\nAssociative Array(\n	List(\n		List( \"addinVersion\",' + str(ver_num) + '),\n		List( \"author\",' + author + '),\n		List( \"buildDate\",' + str(jmpBuildDate) + '),\n		List( \"deployedAddinsFilename\",\"' + pubname + '\"),\n		List( \"deployedAddinsLoc\", \"' + pubpath + '\"),\n		List( \"id\",\"' + addinid + '\"),\n		List( \"name\",\"' + addinname + '\"),\n		List( \"state\",\"' + addinState + '\")\n	)\n)'
-
-    os.chdir(savePath)
-
-    with open("customMetaData.jsl", "w") as file:
+    with open(os.path.join(savePath, "customMetaData.jsl"), "w") as file:
             file.write(customMetaDataText)
             file.close()
 
     print("Custom Meta Data has been written to the location.")
 
+def custom_meta_text(jmpBuildDate, addinState, ver_num, author, addinid, addinname, pubname, pubpath):
+    '''
+    builds the text of the custom meta data file for the addin. See CustomMeta for the arguments.
+
+    Returns:
+        customMetaDataText (string): the contents of customMetaData.jsl.
+    '''
+    customMetaDataText = '/* DO NOT EDIT THIS FILE YOURSELF AS IT IS CHANGED BY PROJECT JAAB(https://github.com/sage-darling/Project-JAAB) */\n\nAssociative Array(\n	List(\n		List( \"addinVersion\",' + str(ver_num) + '),\n		List( \"author\",' + author + '),\n		List( \"buildDate\",' + str(jmpBuildDate) + '),\n		List( \"deployedAddinsFilename\",\"' + pubname + '\"),\n		List( \"deployedAddinsLoc\", \"' + pubpath + '\"),\n		List( \"id\",\"' + addinid + '\"),\n		List( \"name\",\"' + addinname + '\"),\n		List( \"state\",\"' + addinState + '\")\n	)\n)'
+    return customMetaDataText
+
 def AddinDef(savePath, version_num, addinid, addinname):
     '''
     builds the addin.def for the addin.
@@ -496,15 +1938,20 @@ def AddinDef(savePath, version_num, addinid, addinname):
     Returns:
         N/A
     '''
-    addin_def_text = 'id=' + addinid + '\n' + 'name=' + addinname + '\n' + "addinVersion=" + str(version_num)
-    
-    os.chdir(savePath)
-
-    with open("addin.def", "w") as file:
-            file.write(addin_def_text)
+    with open(os.path.join(savePath, "addin.def"), "w") as file:
+            file.write(addin_def_text(version_num, addinid, addinname))
             file.close()
 
-def JMPCust(savePath, tag_version, addinID, jmpcustfilename):
+def addin_def_text(version_num, addinid, addinname):
+    '''
+    builds the text of the addin.def for the addin. See AddinDef for the arguments.
+
+    Returns:
+        (string): the contents of addin.def.
+    '''
+    return 'id=' + addinid + '\n' + 'name=' + addinname + '\n' + "addinVersion=" + str(version_num)
+
+def JMPCust(savePath, tag_version, addinID, jmpcustfilename, placeholders=None):
     '''
     builds the addin.jmpcust for the addin.
     
@@ -513,232 +1960,2806 @@ def JMPCust(savePath, tag_version, addinID, jmpcustfilename):
         tag_version (string): The string version of the tag version of the JMP Addin.
         addinID (string): The string input for the addin ID that will be used for the path. 
         jmpcustfilename (string): The filename that links to the JMP cust file to build the menu for the addin.
+        placeholders (Placeholders): every placeholder of the build (see release_placeholders). None fills in only TOOLTAG and AdDinIDDoNotTouCHY.
 
     Returns:
         N/A
     '''
     source = os.path.abspath(savePath)
     location = os.path.join(source, ".github", "workflows")
-    # variables for the text to search for and the one to replace.
 
-    os.chdir(location)
-
-    search_text_tooltag  = "TOOLTAG"
-    search_text_addin = "AdDinIDDoNotTouCHY"
-    replace_text_tooltag  = tag_version
-    replace_text_addin = addinID
-
-    with open(jmpcustfilename, 'r') as file:
+    with open(os.path.join(location, jmpcustfilename), 'r') as file:
             data = file.read()
-            data_new = data.replace(search_text_tooltag, replace_text_tooltag)
-            data_round_2 = data_new.replace(search_text_addin, replace_text_addin)
             file.close()
 
-    os.chdir(savePath)
-
-    with open('addin.jmpcust', 'w') as new_file:
-        new_file.write(data_round_2)
+    with open(os.path.join(savePath, 'addin.jmpcust'), 'w') as new_file:
+        new_file.write(jmpcust_text(data, tag_version, addinID, placeholders))
         new_file.close()
 
-def uploadAsset(addinFinalName, releaseDictionary, addinLocation, token):
+def jmpcust_text(template, tag_version, addinID, placeholders=None):
+    '''
+    fills in the jmpcust template text with the tag version and addin ID (and any other placeholders) in one pass.
+
+    Args:
+        template (string): the text of the jmpcust_txt_file from .github/workflows.
+        tag_version (string): The string version of the tag version of the JMP Addin.
+        addinID (string): The string input for the addin ID that will be used for the path.
+        placeholders (Placeholders): every placeholder of the build. None fills in only TOOLTAG and AdDinIDDoNotTouCHY.
+
+    Returns:
+        (string): the contents of addin.jmpcust.
+    '''
+    if placeholders is None:
+        placeholders = Placeholders({"TOOLTAG": tag_version, "AdDinIDDoNotTouCHY": addinID})
+    return placeholders.expand_text(template)
+
+def uploadAsset(addinFinalName, releaseDictionary, addinLocation, token, attempts=4, addin_file=None):
     '''
     uploads the completed JMP addin to the github release as an asset.
+    The addin is streamed with an explicit Content-Length and the upload is retried on 5xx replies and dropped connections.
+    If the release already has an asset of the same name with the same SHA-256 the upload is skipped. A stale asset of the
+    same name is only removed once the new one has uploaded in full (under a temporary name), and the new one then takes its name.
+    Between removing the stale asset and the rename the release only has the addin as uploading-<name>; the rename is retried
+    and if it still fails the error says where the new addin is.
+    If github refuses the name as taken (422) the asset holding it is removed and the upload tried once more.
     
     Args:
         addinFinalName (string): The name that the addin will be called as a filename.
         releaseDictionary (list): The list of the release information for the URL of where to upload assets.
         addinLocation (string): the location where the addin package is location.
         token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        attempts (integer): how many times the upload is tried before giving up.
+        addin_file (file): the addin as an open file (ex. from memory_build) instead of a file in addinLocation.
+
+    Returns:
+        asset (dictionary): the github information of the asset on the release.
+
+    Raises:
+        Exception: the upload was refused, an asset could not be removed or renamed, or the upload failed every attempt.
+    '''
+    if addin_file is None:
+        addin_path = os.path.join(addinLocation, addinFinalName)
+        size = os.path.getsize(addin_path)
+        sha256 = file_sha256(addin_path)
+    else:
+        addin_file.seek(0)
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: addin_file.read(1024*1024), b""):
+            digest.update(chunk)
+        size = addin_file.tell()
+        sha256 = digest.hexdigest()
+
+    assets = list(json_pages(releaseDictionary['assets_url'], token))
+    existing = next((asset for asset in assets if asset['name'] == addinFinalName), None)
+    if existing is not None and asset_matches(existing, sha256, size, token):
+        print(f"{addinFinalName} is already on the release with the same contents. Skipping the upload.")
+        count('uploads_skipped')
+        return existing
+
+    # a stale asset stays in place until the new one is up in full.
+    upload_name = addinFinalName if existing is None else "uploading-" + addinFinalName
+    uploadLink = releaseDictionary['upload_url'].split(u"{")[0]
+    headers = {'Content-Type': 'application/zip', 'Content-Length': str(size)}
+    name_taken = False
+    for attempt in range(attempts):
+        # a half finished asset from an earlier attempt or run would make github refuse the name.
+        for asset in assets:
+            if asset['name'] == upload_name:
+                delete_asset(asset, token)
+        try:
+            if addin_file is None:
+                with open(addin_path, 'rb') as file:
+                    response = github_client().post(uploadLink, token, headers=headers, params={"name": upload_name}, data=file)
+            else:
+                addin_file.seek(0)
+                response = github_client().post(uploadLink, token, headers=headers, params={"name": upload_name}, data=UploadBody(addin_file, size))
+            if response.status_code == 201:
+                uploaded = response.json()
+                break
+            if response.status_code == 422:
+                # the name was taken after the assets were listed; that asset is removed once before giving up.
+                if name_taken:
+                    raise Exception(f"{addinFinalName} was not uploaded with status code 422: {response.text}")
+                name_taken = True
+                print(f"The release already has an asset named {upload_name}. Removing it and uploading again.")
+                assets = list(json_pages(releaseDictionary['assets_url'], token))
+                continue
+            if response.status_code < 500:
+                raise Exception(f"{addinFinalName} was not uploaded with status code {response.status_code}: {response.text}")
+            print(f"The upload of {addinFinalName} failed with status code {response.status_code}. Retrying.")
+        except (requests.exceptions.ConnectionError, requests.exceptions.ChunkedEncodingError, requests.exceptions.Timeout) as e:
+            print(f"The upload of {addinFinalName} was cut off ({type(e).__name__}). Retrying.")
+        count('upload_retries')
+        time.sleep(2 ** attempt)
+        assets = list(json_pages(releaseDictionary['assets_url'], token))
+    else:
+        raise Exception(f"{addinFinalName} could not be uploaded after {attempts} attempts.")
+
+    if existing is not None:
+        # swap the new asset in for the stale one.
+        response = github_client().delete(existing['url'], token)
+        if response.status_code not in (204, 404):
+            raise Exception(f"The old {addinFinalName} could not be removed with status code {response.status_code}. The new one is on the release as {upload_name}.")
+        for attempt in range(attempts):
+            response = github_client().patch(uploaded['url'], token, json={"name": addinFinalName})
+            if response.status_code == 200:
+                uploaded = response.json()
+                break
+            print(f"{upload_name} could not be renamed to {addinFinalName} with status code {response.status_code}. Retrying.")
+            time.sleep(2 ** attempt)
+        else:
+            raise Exception(f"{upload_name} could not be renamed to {addinFinalName} with status code {response.status_code}. "
+                            f"The old {addinFinalName} has been removed and the new one is on the release as {upload_name}.")
+    return uploaded
+
+class UploadBody:
+    '''
+    An open file to upload, with its size given up front. requests finds the size of a file from its fileno, which moves
+    a SpooledTemporaryFile (the addin of a memory build) from memory to disk.
+
+    Args:
+        file (file): the file, positioned where the upload starts.
+        size (integer): the number of bytes to upload.
+    '''
+    def __init__(self, file, size):
+        self.file = file
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def read(self, amount=-1):
+        return self.file.read(amount)
+
+def delete_asset(asset, token):
+    '''
+    removes an asset from a release. An asset that is already gone counts as removed.
+
+    Args:
+        asset (dictionary): the github information of the asset.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+
+    Raises:
+        Exception: github refused to remove the asset.
+    '''
+    response = github_client().delete(asset['url'], token)
+    if response.status_code not in (204, 404):
+        raise Exception(f"{asset['name']} could not be removed from the release with status code {response.status_code}: {response.text}")
+
+def asset_matches(asset, sha256, size, token):
+    '''
+    checks whether an asset already on the release has the same contents as the built addin. Github's digest of the asset is
+    used when it gives one, otherwise an asset of the same size is downloaded and hashed.
+
+    Args:
+        asset (dictionary): the github information of the asset.
+        sha256 (string): the hex SHA-256 of the built addin.
+        size (integer): the size of the built addin in bytes.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+
+    Returns:
+        (boolean): True if the asset is the same as the built addin.
+    '''
+    if asset.get('digest'):
+        return asset['digest'] == "sha256:" + sha256
+    if asset.get('size') != size:
+        return False
+    digest = hashlib.sha256()
+    with github_client().get(asset['url'], token, headers={'Accept': 'application/octet-stream'}, stream=True) as r:
+        if r.status_code != 200:
+            return False
+        for chunk in r.iter_content(1024*1024):
+            digest.update(chunk)
+    return digest.hexdigest() == sha256
+
+def previous_addin(owner_repo, token, runid, addin_name):
+    '''
+    finds a previous build of the addin to reuse unchanged members from. A copy kept in the cache_dir by an earlier
+    build on this runner is used first, otherwise the .jmpaddin asset of this release (on a re-run) or the nearest
+    release before it is downloaded into the cache_dir.
+
+    Args:
+        owner_repo (string): the owner and repo to query for the Github Release information.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        runid (string): the release id being built. Empty looks from the newest release.
+        addin_name (string): the addin name. Only assets named exactly as addin_filename names them, addin_name.jmpaddin or
+            addin_name_<tag>.jmpaddin with the tag of their release, are matched, so addin_name_lite_<tag>.jmpaddin isn't.
+
+    Returns:
+        local (string): the location of the previous addin, or None if there isn't one.
+
+    Example Usage:
+        >>> previous_addin("octocat/Hello-World", TOKEN, "1", "addin_name")
+        '/home/runner/.cache/project-jaab/addins/octocat/Hello-World/addin_name.jmpaddin'
+    '''
+    local = os.path.join(cache_dir(), "addins", owner_repo, addin_name + ".jmpaddin")
+    if zipfile.is_zipfile(local):
+        return local
+
+    found_current = not runid
+    for checked, release in enumerate(json_pages(f"{GITHUB_API}/repos/{owner_repo}/releases", token)):
+        if checked >= 100:
+            break
+        if not found_current:
+            if release["id"] != int(runid):
+                continue
+            found_current = True
+        names = {addin_name + ".jmpaddin", f"{addin_name}_{release['tag_name']}.jmpaddin"}
+        for asset in release.get("assets", []):
+            if asset["name"] in names:
+                print(f"Reusing unchanged members from {asset['name']} in release {release['tag_name']}.")
+                os.makedirs(os.path.dirname(local), exist_ok=True)
+                fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(local))
+                with os.fdopen(fd, "wb") as file:
+                    download_file(asset["url"], token, file, headers={'Accept': 'application/octet-stream'})
+                os.replace(temp_name, local)
+                return local
+    return None
+
+def remember_addin(owner_repo, addin_name, addin_path):
+    '''
+    keeps a copy of the finished addin in the cache_dir for the next incremental build to start from.
+
+    Args:
+        owner_repo (string): the owner and repo the addin was built from.
+        addin_name (string): the addin name.
+        addin_path (string): the location of the finished addin.
 
     Returns:
         N/A
     '''
-    os.chdir(addinLocation)
-    uploadLink = releaseDictionary['upload_url'].split(u"{")[0] + "?name=" + addinFinalName
-    #print(uploadLink)
-    headers = {
-        'Content-Type': 'zip',
-        'Authorization': f'token {token}'
-        }
-    response = requests.post(uploadLink, headers=headers, data=open(addinFinalName, 'rb'))
+    local = os.path.join(cache_dir(), "addins", owner_repo, addin_name + ".jmpaddin")
+    os.makedirs(os.path.dirname(local), exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(local))
+    os.close(fd)
+    shutil.copyfile(addin_path, temp_name)
+    os.replace(temp_name, local)
 
-def pack_up_externals(externalsDict, runnerlocation, token):
+def pack_up_externals(externalsDict, runnerlocation, token, max_workers=EXTERNAL_WORKERS, listings=None):
     '''
     takes in a dictionary of external files with relevant information needed and pulls the files to compile.
+    Each distinct owner/repo and version is listed once no matter how many entries use it, and the files are
+    downloaded concurrently. Files already in the ExternalsCache are copied from it instead of downloaded, and a pinned
+    version whose files are all cached isn't listed at all. Each entry comes from its external source (see
+    external_source): the Github API unless the entry or the external_source input names a local mirror or folder.
+    Every entry is attempted, and any that fail are reported together by their .ini number.
 
     Args:
         externalDict (dictionary): a dictionary of external files produced from config_parser.
         runnerlocation (string): The file folder location where the final addin is being packaged.
         token(string): Github authentication token produced and recognized by github for authentication to a private repo.
+        max_workers (integer): the most listings or downloads to run at once. Set with the external_workers input.
+        listings (dictionary): optional (owner/repo, version, source) to listing results, shared between calls so a repo listed
+            by one call isn't listed again by the next. Listings made here are added to it.
 
     Returns:
-        NA
+        written (dictionary): the .ini number of each entry and the location its file was written to.
+
+    Raises:
+        ValueError: an entry in the .ini is short an input.
+        ExternalsError: one or more of the external files could not be written. Every failing entry is listed.
 
     Example Usage:
-        >>> pack_up_externals(external_files, Token)
+        >>> pack_up_externals(external_files, zip_location, Token)
+        {'1': '/home/runner/work/repo/libs/util.jsl'}
+    '''
+    resolved, errors = resolve_externals(externalsDict, token, max_workers, listings)
+    written = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        downloads = {}
+        for numbah, (files_from_repo, maps, source) in resolved.items():
+            downloads[numbah] = submit_in_context(pool, write_external, files_from_repo, maps[2], maps[3], maps[4], runnerlocation, token, source)
+        for numbah, download in downloads.items():
+            try:
+                written[numbah] = download.result()
+            except Exception as e:
+                errors[numbah] = e
+    externals_cache().save()
+
+    if errors:
+        raise externals_error(externalsDict, errors)
+    return(written)
+
+def resolve_externals(externalsDict, token, max_workers=EXTERNAL_WORKERS, listings=None):
+    '''
+    works out where every entry of the .ini comes from, without downloading any files. Each distinct owner/repo, version
+    and external source is listed once (concurrently), and a pinned Github version whose files are in the ExternalsCache
+    not at all. When two entries write the same destination only the later one in the .ini is kept, just like writing
+    them in order.
+
+    Args:
+        See pack_up_externals.
+
+    Returns:
+        resolved (dictionary): the .ini number of each entry and (its listing, the entry's inputs, its external source).
+        errors (dictionary): the .ini number and exception of each entry whose repo couldn't be listed.
+
+    Raises:
+        ValueError: an entry in the .ini is short an input or names an external source that doesn't exist.
     '''
+    sources = {}
     for numbah, maps in externalsDict.items():
-        if len(maps) != 6:
+        if len(maps) not in (6, 7):
             raise ValueError('One of the external files input into the .ini file in the repository is short an input. Please correct and try again.')
-        repo_owner = maps[0]
-        repo_name = maps[1]
-        needed_file = maps[2]
-        name_it_this = maps[3]
-        folder_name = maps[4]
-        version_we_want = maps[5]
-        files_from_repo = externals_data(repo_owner + r'/' + repo_name, token, version_we_want)
-        write_external(files_from_repo, needed_file, name_it_this, folder_name, runnerlocation, token)
-               
+        sources[numbah] = entry_source(maps)
+
+    entries = {}
+    for numbah, maps in externalsDict.items():
+        destination = (maps[4].lower() if maps[4].lower() == "main" else maps[4], maps[3])
+        entries.pop(destination, None)
+        entries[destination] = (numbah, maps)
+
+    cache = externals_cache()
+    resolved = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # one listing per owner/repo and version, skipped for files of a pinned version that are already in the cache.
+        pending_listings = {}
+        # whether each listed owner/repo and version is pinned, so its files can be remembered in the cache.
+        pending_pinned = {}
+        cached = {}
+        for numbah, maps in entries.values():
+            source = sources[numbah]
+            owner_repo_version = (maps[0] + r'/' + maps[1], maps[5], source.spec)
+            cached[numbah] = cache.lookup(owner_repo_version[0], owner_repo_version[1], maps[2]) if source.indexed else None
+            if cached[numbah] is None and owner_repo_version not in pending_listings:
+                if listings is not None and owner_repo_version in listings:
+                    pending_listings[owner_repo_version] = Future()
+                    pending_listings[owner_repo_version].set_result(listings[owner_repo_version])
+                else:
+                    pending_listings[owner_repo_version] = submit_in_context(pool, source.listing, owner_repo_version[0], token, owner_repo_version[1])
+                if source.indexed:
+                    pending_pinned[owner_repo_version] = submit_in_context(pool, pinned_version, owner_repo_version[0], token, owner_repo_version[1])
+
+        for numbah, maps in entries.values():
+            repo_owner = maps[0]
+            repo_name = maps[1]
+            needed_file = maps[2]
+            version_we_want = maps[5]
+            source = sources[numbah]
+            owner_repo_version = (repo_owner + r'/' + repo_name, version_we_want, source.spec)
+            try:
+                files_from_repo = cached[numbah] or pending_listings[owner_repo_version].result()
+                pinned = cached[numbah] is None and owner_repo_version in pending_pinned and pending_pinned[owner_repo_version].result()
+            except Exception as e:
+                errors[numbah] = e
+                continue
+            if needed_file in files_from_repo and pinned:
+                cache.remember(repo_owner + r'/' + repo_name, version_we_want, needed_file, files_from_repo[needed_file])
+            resolved[numbah] = (files_from_repo, maps, source)
+
+    if listings is not None:
+        for owner_repo_version, listing in pending_listings.items():
+            if listing.done() and listing.exception() is None:
+                listings[owner_repo_version] = listing.result()
+    return resolved, errors
+
+def externals_error(externalsDict, errors):
+    '''
+    builds the one exception that lists every external file that failed, by its .ini number.
+
+    Args:
+        externalsDict (dictionary): a dictionary of external files produced from config_parser.
+        errors (dictionary): the .ini number and exception of each entry that failed.
+
+    Returns:
+        (ExternalsError): the exception to raise.
+    '''
+    details = "\n".join(f"  {numbah} = {', '.join(externalsDict[numbah])}: {type(e).__name__}: {e}" for numbah, e in sorted(errors.items()))
+    return ExternalsError(f"{len(errors)} of the external files in the .ini file could not be included:\n{details}", errors)
+
+def pinned_version(owner_repo, token, version):
+    '''
+    Returns whether a version of a Github repo always means the same files: a full commit SHA or a tag. latest and
+    branches move on to new commits, so their files can't be remembered. A tag found is kept in the ExternalsCache
+    index with its commit, so it is only looked up once.
+
+    Raises:
+        Exception: the tag couldn't be looked up for a reason other than not being there.
+    '''
+    if re.fullmatch(r"[0-9a-fA-F]{40}", version):
+        return True
+    if version.lower() == "latest":
+        return False
+    cache = externals_cache()
+    if cache.tag_commit(owner_repo, version) is not None:
+        return True
+    try:
+        ref = json_out(f"{GITHUB_API}/repos/{owner_repo}/git/ref/tags/{requests.utils.quote(version, safe='')}", token)
+    except NotFoundError:
+        return False
+    cache.remember_tag(owner_repo, version, ref["object"]["sha"])
+    return True
+
 def externals_data(owner_repo, token, version="latest"):
     '''
     gathers the data in a dictionary related to the files needed to be packaged in the final Addin from another owner and repo.
-    
+    The whole repo is indexed from one recursive git trees request at the version asked for, so files at any depth are found
+    without a request per folder. Keys are the full path in the repo (ex. "sub/deep.jsl"). A bare filename (ex. "deep.jsl") also
+    works as a key for a file in a folder, as long as no file of that name sits higher up in the repo.
+
     Args:
         owner_repo (string): the owner and repo to query for the Github Release information.
         token (string): Github authentication token produced and recognized by github for authentication to a private repo.
         version (string): defaults to latest. Can be overruled to be whatever version of the file is needed.
 
     Returns:
-        a dictionary with the filename, download URL, and filetype for the library files.
+        repo_dict (dictionary): the path of every file and folder with [filetype, download URL, blob sha, size, path].
 
     Example Usage:
-        >>> libs_info = libs_data("octocat/libraries", TOKEN, main_vars['lib_tag'])
+        >>> libs_info = externals_data("octocat/libraries", TOKEN, "v2.0")
+        {'sub/deep.jsl': ['file', 'https://raw.githubusercontent.com/octocat/libraries/v2.0/sub/deep.jsl', '95d09f2b...', 4, 'sub/deep.jsl'], ...}
     '''
     # start with a blank dictionary
     repo_dict = {}
 
-    # gets the latest libraries or gets the libraries based on version tag if applicable.
-    if version.lower() == "latest":
-        query_url = f"https://api.github.com/repos/{owner_repo}/contents/"
-    else:
-        query_url = f"https://api.github.com/repos/{owner_repo}/contents?ref={version}"
-    libs_head = json_out(query_url, token)
-
-    #print(libs_head)
-    # add the files into the dictionary for searching later.
-    for file in libs_head:
-        filename = str(file["name"])
-        download_url = str(file["download_url"])
-        file_type = str(file["type"])
-        if(file_type == "dir" ):
-            query_url_folder = f"https://api.github.com/repos/{owner_repo}/contents/{filename}/"
-            libs_folder = json_out(query_url_folder, token)
-            # add the files into the dictionary for the folder if contents are necessary
-            for folders in libs_folder:
-                filename = str(folders["name"])
-                download_url = str(folders["download_url"])
-                file_type = str(folders["type"])
-                repo_dict[filename] = [file_type, download_url]
-        #add new value/keys to the dictionary, [0] slice is always filetype and [1] is download_url
-        repo_dict[filename] = [file_type, download_url]
-
-    # add folder info to the dictionary below if it is necessary.
-    # pprint(repo_dict)
-    return(repo_dict)
-
-def write_external(filename_dict, needed_file_from_repo, final_name_of_file, folder_to_place, starting_dest_folder, token):
+    # gets the latest libraries (the default branch) or gets the libraries based on version tag if applicable.
+    ref = "HEAD" if version.lower() == "latest" else version
+    query_url = f"{GITHUB_API}/repos/{owner_repo}/git/trees/{requests.utils.quote(ref, safe='')}"
+    libs_tree = json_out(query_url, token, {"recursive": 1})
+    if libs_tree.get("truncated"):
+        print(f"The file list for {owner_repo} at {version} is too large for Github to send in full. Some files may not be found.")
+
+    # add the files into the dictionary for searching later. [0] slice is always filetype and [1] is download_url
+    for item in libs_tree["tree"]:
+        if item["type"] == "blob":
+            download_url = f"{GITHUB_RAW}/{owner_repo}/{requests.utils.quote(ref, safe='')}/{requests.utils.quote(item['path'])}"
+            repo_dict[item["path"]] = ["file", download_url, item["sha"], item.get("size"), item["path"]]
+        elif item["type"] == "tree":
+            repo_dict[item["path"]] = ["dir", None, item["sha"], None, item["path"]]
+
+    return(add_bare_names(repo_dict))
+
+def add_bare_names(repo_dict):
+    '''
+    adds the bare name (ex. "deep.jsl") of anything in a folder of a listing as another key for it. The shallowest one
+    wins if the name is used more than once.
+    '''
+    for path in sorted(repo_dict, key=lambda path: (path.count("/"), path)):
+        repo_dict.setdefault(path.rsplit("/", 1)[-1], repo_dict[path])
+    return repo_dict
+
+def external_targets(filename_dict, needed_file_from_repo, final_name_of_file, folder_to_place):
+    '''
+    lists the files an entry of the .ini puts in the addin: one for a file, everything under it for a folder.
+
+    Args:
+        See write_external.
+
+    Returns:
+        (list): (download URL, blob sha, size, path in the addin) for each file.
+
+    Raises:
+        KeyError: the file isn't in the repository.
+
+    Example Usage:
+        >>> external_targets(libs_info, "sub/deep.jsl", "deep.jsl", "libs")
+        [('https://raw.githubusercontent.com/octocat/libraries/v2.0/sub/deep.jsl', 'd1f857b3...', 4, 'libs/deep.jsl')]
+    '''
+    if needed_file_from_repo not in filename_dict:
+        raise KeyError(f"{needed_file_from_repo} does not exist in the repository at the version asked for.")
+    file_type, target_location, sha, size, repo_path = filename_dict[needed_file_from_repo]
+    complete_file = final_name_of_file if folder_to_place.lower() == "main" else folder_to_place + "/" + final_name_of_file
+
+    if file_type == "dir":
+        return [(entry[1], entry[2], entry[3], complete_file + "/" + path[len(repo_path)+1:])
+                for path, entry in filename_dict.items() if entry[0] == "file" and path == entry[4] and path.startswith(repo_path + "/")]
+    return [(target_location, sha, size, complete_file)]
+
+def write_external(filename_dict, needed_file_from_repo, final_name_of_file, folder_to_place, starting_dest_folder, token, source=None):
     '''
     writes the necessary libraries or utilities in the necessary location inside the folder for addin.
+    If the needed file is a folder in the repo, everything under it is written into a folder named final_name_of_file.
+    Files already in the ExternalsCache are copied from it. Anything else is streamed to disk with download_verified
+    (from the external source of the entry), checked against the size and SHA in the tree and then added to the cache.
     
     Args:
         filename_dict (dictionary): the dictionary created from externals_data that contains the files from the repo to download.
-        needed_file_from_repo (string): the name of the file needed from the repository.
+        needed_file_from_repo (string): the name or path of the file (or folder) needed from the repository.
         final_name_of_file (string): the name to name the file in the addin.
         folder_to_place (string): the folder to place the file in the addin.
         starting_dest_folder (string): the place where the addin is being built.
         token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        source (GithubSource, GitMirrorSource or DirectorySource): where filename_dict was listed from. Defaults to Github.
 
     Returns:
-        N/A
+        complete_file (string): the location the file (or folder) was written to.
     '''
-    os.chdir(starting_dest_folder)
-    dictionary_url_num = 1
-
-    target_location = filename_dict[needed_file_from_repo][dictionary_url_num]
-    file = requests.get(str(target_location), token)
     if folder_to_place.lower() == "main":
         complete_file_folder = starting_dest_folder
     else: 
         complete_file_folder = os.path.join(starting_dest_folder, folder_to_place)
-    #create new folder if it does not exist
-    if os.path.exists(complete_file_folder) == False:
-        os.makedirs(complete_file_folder)
     complete_file = os.path.join(complete_file_folder, final_name_of_file)
-    with open(complete_file, "wb") as files:
-        files.write(file.content)
-        files.close()
+
+    cache = externals_cache()
+    for url, blob_sha, blob_size, arcname in external_targets(filename_dict, needed_file_from_repo, final_name_of_file, folder_to_place):
+        destination = os.path.join(starting_dest_folder, *arcname.split("/"))
+        #create new folder if it does not exist
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        if cache.copy_to(blob_sha, destination):
+            continue
+        download_verified(str(url), token, destination, blob_size, blob_sha, fetch=source.fetch_into if source else None)
+        cache.add(blob_sha, destination, verified=True)
+    return complete_file
 
 ############################
-#           MAIN           #
+#  EXTERNAL SOURCE CLASSES #
 ############################
 
-def main():
-
-    ############################
-    #  ENVIRONMENT VARIABLES   #
-    ############################
-    # passed in environmental variables from git.
-    TOKEN = os.environ['Token']
-    OWNER_REPO = os.environ['OwnerRepo']
-    RUN_ID = os.environ['RunID']
-    MAKE_META_FILE = os.environ['MakeMetaFile']
-    PUB_NAME = os.environ['PubName']
-    PUB_PATH = os.environ['PubPath']
-    ADDIN_ID = os.environ['AddinID']
-    ADDIN_NAME = os.environ['AddinName']
-    AUTHOR = os.environ['Author']
-    EXTERNAL_FILES = os.environ['ExternalFiles']
-    TAG_SUFFIX = os.environ['TagSuffix']
-    JMP_CUST_FILE = os.environ['JmpCust']
-
-    ############################
-    #        Full Flow         #
-    ############################
-    save_location = os.getcwd()
-    data = release_data(OWNER_REPO, TOKEN, RUN_ID)
-    ver_num, jmp_date, deployment_stage = needed_variables(data)
-    zip_location = write_release_output(data, TOKEN, save_location)
+class GithubSource:
+    '''
+    External files listed and downloaded through the Github API. The source of every entry unless told otherwise.
 
-    # write the Custom Meta Data (if applicable), Addin.def and JMP.cust files to the addin location.
-    if MAKE_META_FILE.lower() == "true":
-        CustomMeta(zip_location, jmp_date, deployment_stage, ver_num, AUTHOR, ADDIN_ID, ADDIN_NAME, PUB_NAME, PUB_PATH)
-    
-    AddinDef(zip_location, ver_num, ADDIN_ID, ADDIN_NAME)
-    JMPCust(zip_location, data["tag_name"], ADDIN_ID, JMP_CUST_FILE)
+    Example Usage:
+        >>> external_source("github").listing("octocat/libraries", TOKEN, "v2.0")
+    '''
+    spec = "github"
+    # pinned versions of a Github repo don't move, so the ExternalsCache index can stand in for listing them again.
+    indexed = True
 
-    if EXTERNAL_FILES != "":
-        print("a .ini file is referenced for include files")
-        external_files_dict = config_parse(zip_location, EXTERNAL_FILES)
-    else:
-        external_files_dict = {}
-    
-    # delete the .github files as they are no longer needed for the build.
-    shutil.rmtree('.github')
-
-    # write the library files
-    if len(external_files_dict) != 0:
-        print("Library files are detected in the config.ini and will be included")
-        pack_up_externals(external_files_dict, zip_location, TOKEN)
-
-    # zip up the addin files to create the addin
-    if TAG_SUFFIX.lower() == "true":
-        addin_final = ADDIN_NAME + "_" + data["tag_name"]
-    elif TAG_SUFFIX.lower() == "false" and deployment_stage == "TEST":
-        addin_final = ADDIN_NAME + "_" + data["tag_name"]
+    def listing(self, owner_repo, token, version="latest"):
+        '''
+        Returns the repo at the version in the shape of externals_data.
+        '''
+        return externals_data(owner_repo, token, version)
+
+    def fetch_into(self, url, token, file, size=None, sha=None, attempts=4, chunk_size=64*1024):
+        '''
+        Writes one file of the listing into an open file, see download_into.
+        '''
+        return download_into(url, token, file, size, sha, attempts, chunk_size)
+
+class GitMirrorSource:
+    '''
+    External files read from local git mirrors (ex. made with git clone --mirror) without checking anything out or using the
+    network. The mirror of owner/repo is root/owner/repo.git (or root/owner/repo). Versions are any ref the mirror knows,
+    and latest is its HEAD. Files are listed with git ls-tree and read with git cat-file, so they keep their blob SHAs and
+    share the ExternalsCache with files from Github.
+
+    Args:
+        root (string): the folder the mirrors are kept in.
+
+    Example Usage:
+        >>> external_source("mirror:/srv/mirrors").listing("octocat/libraries", None, "v2.0")
+        {'sub/deep.jsl': ['file', '/srv/mirrors/octocat/libraries.git', 'd1f857b3...', 4, 'sub/deep.jsl'], ...}
+    '''
+    indexed = False
+
+    def __init__(self, root):
+        self.root = root
+        self.spec = "mirror:" + root
+
+    def git_dir(self, owner_repo):
+        '''
+        Returns the mirror of owner/repo.
+        '''
+        location = os.path.join(self.root, *owner_repo.split("/"))
+        for candidate in (location + ".git", location):
+            if os.path.isdir(candidate):
+                return candidate
+        raise FileNotFoundError(f"There is no mirror of {owner_repo} in {self.root}.")
+
+    def listing(self, owner_repo, token, version="latest"):
+        '''
+        Returns the repo at the version in the shape of externals_data, with the mirror in place of the download URL.
+        '''
+        git_dir = self.git_dir(owner_repo)
+        ref = "HEAD" if version.lower() == "latest" else version
+        result = subprocess.run(["git", "--git-dir", git_dir, "ls-tree", "-r", "-t", "-l", "-z", ref],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise Exception(f"{version} of {owner_repo} could not be read from {git_dir}: {result.stderr.decode(errors='replace').strip()}")
+
+        repo_dict = {}
+        for record in result.stdout.split(b"\0"):
+            if not record:
+                continue
+            details, path = record.split(b"\t", 1)
+            mode, object_type, sha, size = details.split()
+            path = path.decode()
+            if object_type == b"blob":
+                repo_dict[path] = ["file", git_dir, sha.decode(), int(size), path]
+            elif object_type == b"tree":
+                repo_dict[path] = ["dir", None, sha.decode(), None, path]
+        return add_bare_names(repo_dict)
+
+    def fetch_into(self, git_dir, token, file, size=None, sha=None, attempts=4, chunk_size=64*1024):
+        '''
+        Writes one blob of the mirror into an open file. Returns the number of bytes written.
+        '''
+        received = 0
+        with tempfile.TemporaryFile() as errors:
+            with subprocess.Popen(["git", "--git-dir", git_dir, "cat-file", "blob", sha], stdout=subprocess.PIPE, stderr=errors) as process:
+                for chunk in iter(lambda: process.stdout.read(chunk_size), b""):
+                    file.write(chunk)
+                    received += len(chunk)
+            if process.returncode != 0:
+                errors.seek(0)
+                raise Exception(f"{sha} could not be read from {git_dir}: {errors.read().decode(errors='replace').strip()}")
+        if size is not None and received != size:
+            raise Exception(f"{sha} in {git_dir} is {received} bytes but should be {size} bytes.")
+        count('mirror_reads')
+        return received
+
+class DirectorySource:
+    '''
+    External files copied from plain folders, root/owner/repo for owner/repo. There is only what is on disk, so the
+    version of the entry is ignored, and the files have no blob SHA so they aren't kept in the ExternalsCache.
+
+    Args:
+        root (string): the folder the repos are kept in.
+
+    Example Usage:
+        >>> external_source("dir:/srv/libraries").listing("octocat/libraries", None)
+        {'sub/deep.jsl': ['file', '/srv/libraries/octocat/libraries/sub/deep.jsl', None, 4, 'sub/deep.jsl'], ...}
+    '''
+    indexed = False
+
+    def __init__(self, root):
+        self.root = root
+        self.spec = "dir:" + root
+
+    def listing(self, owner_repo, token, version="latest"):
+        '''
+        Returns the folder of owner/repo in the shape of externals_data, with the file location in place of the download URL.
+        '''
+        location = os.path.join(self.root, *owner_repo.split("/"))
+        if not os.path.isdir(location):
+            raise FileNotFoundError(f"There is no folder for {owner_repo} in {self.root}.")
+        repo_dict = {}
+        for folder, dirs, files in os.walk(location):
+            dirs[:] = sorted(name for name in dirs if name != ".git")
+            for name in dirs:
+                path = os.path.relpath(os.path.join(folder, name), location).replace(os.sep, "/")
+                repo_dict[path] = ["dir", None, None, None, path]
+            for name in sorted(files):
+                full_path = os.path.join(folder, name)
+                path = os.path.relpath(full_path, location).replace(os.sep, "/")
+                repo_dict[path] = ["file", full_path, None, os.path.getsize(full_path), path]
+        return add_bare_names(repo_dict)
+
+    def fetch_into(self, location, token, file, size=None, sha=None, attempts=4, chunk_size=64*1024):
+        '''
+        Writes one file of the folder into an open file. Returns the number of bytes written.
+        '''
+        received = 0
+        with open(location, "rb") as source:
+            for chunk in iter(lambda: source.read(chunk_size), b""):
+                file.write(chunk)
+                received += len(chunk)
+        return received
+
+@functools.lru_cache(maxsize=None)
+def external_source(spec):
+    '''
+    Returns the external source a spec names. Used for the optional seventh input of an entry in the .ini and for the
+    external_source input, which sets it for every entry that doesn't name one.
+
+    Args:
+        spec (string): "github", "mirror:<folder of git mirrors>" or "dir:<folder of plain repo folders>".
+
+    Returns:
+        (GithubSource, GitMirrorSource or DirectorySource): the source.
+
+    Raises:
+        ValueError: the spec isn't one of those.
+
+    Example Usage:
+        >>> external_source("mirror:/srv/mirrors")
+    '''
+    kind, _, root = spec.strip().partition(":")
+    if kind.lower() == "github" and not root:
+        return GithubSource()
+    if kind.lower() == "mirror" and root:
+        return GitMirrorSource(os.path.expanduser(root.strip()))
+    if kind.lower() == "dir" and root:
+        return DirectorySource(os.path.expanduser(root.strip()))
+    raise ValueError(f"{spec} is not an external source. Use github, mirror:<folder> or dir:<folder>.")
+
+def entry_source(maps):
+    '''
+    Returns the external source of an entry of the .ini: its seventh input if it has one, otherwise the default.
+    '''
+    if len(maps) > 6 and maps[6].strip():
+        return external_source(maps[6])
+    return external_source(default_external_source())
+
+############################
+#   PREFLIGHT FUNCTIONS    #
+############################
+
+def release_repo(data_from_release):
+    '''
+    Returns the owner/repo a release belongs to, from its API URL.
+    '''
+    return data_from_release['url'].split('/repos/', 1)[1].split('/releases', 1)[0]
+
+def release_entry(data_from_release, token, path, release_listing):
+    '''
+    finds a file of the release in its listing. A repo too large for Github to list in full (a truncated tree) can be
+    missing files that are there, so a file that isn't in the listing is looked up on its own from the contents API
+    and added to the listing if it's found.
+
+    Args:
+        See release_file_text.
+
+    Returns:
+        entry (list): the file's [filetype, download URL, blob sha, size, path], as externals_data lists it, or None
+            if the release doesn't have the file.
+    '''
+    entry = release_listing.get(path)
+    if entry is not None and entry[0] == "file" and entry[4] == path:
+        return entry
+    owner_repo = release_repo(data_from_release)
+    ref = requests.utils.quote(data_from_release["tag_name"], safe='')
+    try:
+        item = json_out(f"{GITHUB_API}/repos/{owner_repo}/contents/{requests.utils.quote(path)}", token, {"ref": data_from_release["tag_name"]})
+    except NotFoundError:
+        return None
+    if not isinstance(item, dict) or item.get("type") != "file":
+        return None
+    entry = ["file", f"{GITHUB_RAW}/{owner_repo}/{ref}/{requests.utils.quote(path)}", item["sha"], item.get("size"), path]
+    release_listing[path] = entry
+    return entry
+
+def release_file_text(data_from_release, token, path, release_listing):
+    '''
+    reads a small text file (ex. the .ini) of the release without downloading the zipball, from the raw file at the tag.
+
+    Args:
+        data_from_release (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        path (string): the path of the file in the repo (ex. ".github/workflows/config.ini").
+        release_listing (dictionary): the release's repo at its tag, from externals_data.
+
+    Returns:
+        (string): the text of the file.
+
+    Raises:
+        KeyError: the file isn't in the release.
+    '''
+    entry = release_entry(data_from_release, token, path, release_listing)
+    if entry is None:
+        raise KeyError(f"{path} is not in {data_from_release['tag_name']}.")
+    with tempfile.SpooledTemporaryFile() as file:
+        download_into(entry[1], token, file, entry[3], entry[2])
+        file.seek(0)
+        return file.read().decode("utf-8")
+
+def entry_problem(maps):
+    '''
+    checks an entry of the .ini without looking anything up: it has its inputs and names an external source that exists.
+
+    Returns:
+        (ValueError): what is wrong with the entry, or None.
+    '''
+    if len(maps) not in (6, 7):
+        return ValueError(f"has {len(maps)} inputs but needs 6 (or 7 with an external source).")
+    try:
+        entry_source(maps)
+    except ValueError as e:
+        return e
+    return None
+
+def workflow_text(data_from_release, token, name, commit=None, source_dir=""):
+    '''
+    reads a file of the release's .github/workflows without the Github API: from the checkout in source_dir when commit
+    says it is of the release's tag (see local_release_commit), otherwise from the raw file at the tag.
+
+    Args:
+        name (string): the filename in .github/workflows.
+        commit (string): the commit of the checkout in source_dir, or None if it can't be used.
+        See release_file_text for the others.
+
+    Returns:
+        (string): the text of the file, or None if the release doesn't have it.
+
+    Raises:
+        Exception: the raw file could not be downloaded.
+    '''
+    if commit is not None:
+        try:
+            with open(os.path.join(source_dir, ".github", "workflows", name), "r", encoding="utf-8") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+    ref = requests.utils.quote(data_from_release["tag_name"], safe='')
+    url = f"{GITHUB_RAW}/{release_repo(data_from_release)}/{ref}/.github/workflows/{requests.utils.quote(name)}"
+    response = github_client().get(url, token)
+    if response.status_code == 404:
+        return None
+    if response.status_code != 200:
+        raise Exception(f"{url} was not downloaded with status code {response.status_code}. Verify your token and try again.")
+    return response.content.decode("utf-8")
+
+def quick_preflight(data_from_release, token, workflow_files, ini_files, source_dir=""):
+    '''
+    the checks of preflight that need no listings, made by every build before anything large is downloaded: the files
+    the build reads from .github/workflows are in the release and every entry of the .ini has its inputs and an external
+    source that exists. The files are read with workflow_text, so only a checkout in source_dir that can't be used costs
+    an API call (the one the build makes anyway). Every problem found is reported at once.
+
+    Args:
+        source_dir (string): a checkout of the release to read the files from (see release_zipball). "" reads them from Github.
+        See preflight for the others.
+
+    Raises:
+        Exception: something the build needs is missing or wrong. Every problem is listed.
+
+    Example Usage:
+        >>> quick_preflight(data, TOKEN, ["myfile.txt"], ["config.ini"], os.environ["GITHUB_WORKSPACE"])
+    '''
+    commit = local_release_commit(data_from_release, token, source_dir) if source_dir else None
+    tag = data_from_release['tag_name']
+    problems = []
+    for name in workflow_files:
+        if workflow_text(data_from_release, token, name, commit, source_dir) is None:
+            problems.append(f"  .github/workflows/{name}: is not in {tag}.")
+    for name in ini_files:
+        try:
+            text = workflow_text(data_from_release, token, name, commit, source_dir)
+            if text is None:
+                raise KeyError(f".github/workflows/{name} is not in {tag}.")
+            config = configparser.ConfigParser()
+            config.read_string(text)
+            externals_dict = externals_from_config(config)
+        except Exception as e:
+            problems.append(f"  .github/workflows/{name}: {type(e).__name__}: {e}")
+            continue
+        for numbah, maps in externals_dict.items():
+            problem = entry_problem(maps)
+            if problem is not None:
+                problems.append(f"  {name} {numbah} = {', '.join(maps)}: {type(problem).__name__}: {problem}")
+    if problems:
+        raise Exception(f"The build was stopped before downloading anything because of {len(problems)} problems:\n" + "\n".join(problems))
+
+def preflight_externals(externals_dict, token, max_workers=EXTERNAL_WORKERS, listings=None):
+    '''
+    checks every entry of an .ini without downloading any files: each has its inputs, names an external source that
+    exists, and its repo, version and file (or folder) can be found. Repos are listed concurrently with resolve_externals
+    (metadata only), so the listings can be shared with the build that follows.
+
+    Args:
+        externals_dict (dictionary): the entries of the .ini, from externals_from_config.
+        See pack_up_externals for the others.
+
+    Returns:
+        files (list): a dictionary for each file the entries put in the addin, with the entry, repo, version, source,
+            file (its path in the addin), sha, size and whether it is already in the ExternalsCache.
+        errors (dictionary): the .ini number and exception of each entry that can't be included.
+    '''
+    errors = {}
+    valid = {}
+    for numbah, maps in externals_dict.items():
+        problem = entry_problem(maps)
+        if problem is not None:
+            errors[numbah] = problem
+            continue
+        valid[numbah] = maps
+
+    resolved, listing_errors = resolve_externals(valid, token, max_workers, listings)
+    errors.update(listing_errors)
+    cache = externals_cache()
+    files = []
+    for numbah, (files_from_repo, maps, source) in resolved.items():
+        try:
+            targets = external_targets(files_from_repo, maps[2], maps[3], maps[4])
+        except KeyError as e:
+            errors[numbah] = e
+            continue
+        for url, sha, size, arcname in targets:
+            files.append({"entry": numbah, "repo": maps[0] + "/" + maps[1], "version": maps[5], "source": source.spec,
+                          "file": arcname, "sha": sha, "size": size, "cached": cache.contains(sha)})
+    return files, errors
+
+def preflight(data_from_release, token, workflow_files, ini_files, max_workers=EXTERNAL_WORKERS, listings=None, release_listing=None):
+    '''
+    checks everything the build reads from .github/workflows, for a plan: the release's repo is listed once at the tag,
+    the .ini files are read from their raw files, every repo, version and file of the .ini is looked up, and every problem
+    found is reported at once. Each external file is printed with its size and SHA. A build only makes the checks of
+    quick_preflight, since it lists the same repos itself.
+
+    Args:
+        data_from_release (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        workflow_files (list): the filenames in .github/workflows the build needs (ex. the jmpcust template).
+        ini_files (list): the filenames in .github/workflows of the .ini files for external files.
+        max_workers (integer): the most repos listed at once.
+        listings (dictionary): shared with the build that follows, see pack_up_externals.
+        release_listing (dictionary): the release's repo at its tag, if it has already been listed.
+
+    Returns:
+        externals (dictionary): the files of each .ini, see preflight_externals.
+        release_listing (dictionary): the release's repo at its tag, from externals_data.
+
+    Raises:
+        Exception: something the build needs is missing or wrong. Every problem is listed.
+
+    Example Usage:
+        >>> externals, release_listing = preflight(data, TOKEN, ["myfile.txt"], ["config.ini"])
+    '''
+    if release_listing is None:
+        release_listing = externals_data(release_repo(data_from_release), token, data_from_release["tag_name"])
+    problems = []
+    for name in workflow_files:
+        if release_entry(data_from_release, token, ".github/workflows/" + name, release_listing) is None:
+            problems.append(f"  .github/workflows/{name}: is not in {data_from_release['tag_name']}.")
+
+    externals = {}
+    for name in ini_files:
+        try:
+            config = configparser.ConfigParser()
+            config.read_string(release_file_text(data_from_release, token, ".github/workflows/" + name, release_listing))
+            externals_dict = externals_from_config(config)
+        except Exception as e:
+            problems.append(f"  .github/workflows/{name}: {type(e).__name__}: {e}")
+            continue
+        externals[name], errors = preflight_externals(externals_dict, token, max_workers, listings)
+        for numbah, e in sorted(errors.items()):
+            problems.append(f"  {name} {numbah} = {', '.join(externals_dict[numbah])}: {type(e).__name__}: {e}")
+
+    files = {file["file"] + "@" + name: file for name, rows in externals.items() for file in rows}
+    for file in files.values():
+        print(f"  {file['file']}: {file['size'] or 0:,} bytes, {file['sha'] or 'no SHA'} from {file['repo']} {file['version']}"
+              f"{' (cached)' if file['cached'] else ''}")
+    report = current_report()
+    if report is not None:
+        report.details["preflight"] = {"files": len(files), "bytes": sum(file["size"] or 0 for file in files.values()),
+                                       "problems": len(problems)}
+    if problems:
+        raise Exception(f"The build was stopped before downloading anything because of {len(problems)} problems:\n" + "\n".join(problems))
+    return externals, release_listing
+
+def build_plan(data_from_release, token, addins, release_listing, exclude="", source_dir=""):
+    '''
+    prints what the build would do without building: every member of each addin with its size and where it comes from,
+    and an estimate of the bytes the build would transfer. Nothing but metadata and the .jaabignore is downloaded.
+
+    Args:
+        data_from_release (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        addins (dictionary): for each addin filename, {"generated": its generated member names, "externals": its files from preflight}.
+        release_listing (dictionary): the release's repo at its tag, from preflight.
+        exclude (string): the exclude input, more .jaabignore lines (see release_exclusions).
+        source_dir (string): a checkout of the release that would be used instead of downloading the zipball (see release_zipball).
+
+    Returns:
+        plan (dictionary): the members of each addin and the estimated transfer, also added to the build report.
+
+    Example Usage:
+        >>> build_plan(data, TOKEN, {"addin_v1.0.jmpaddin": {"generated": ["addin.def", "addin.jmpcust"], "externals": []}}, release_listing)
+    '''
+    lines = [".jaabignore"]
+    try:
+        lines += release_file_text(data_from_release, token, ".jaabignore", release_listing).splitlines()
+    except KeyError:
+        pass
+    lines += exclude.splitlines()
+    spec = IgnoreSpec(lines)
+    every_file = {path: entry[3] or 0 for path, entry in release_listing.items() if entry[0] == "file" and path == entry[4]}
+    release_files = {path: size for path, size in every_file.items() if not path.startswith(".github/") and not spec.excluded(path)}
+
+    # the zipball is compressed, so the release is at most the size of its files.
+    release_bytes = 0 if source_dir and local_release_commit(data_from_release, token, source_dir) else sum(every_file.values())
+    fetched = {}
+    for addin in addins.values():
+        for file in addin["externals"]:
+            if not file["cached"] and file["source"] == "github":
+                fetched[file["sha"] or file["file"]] = file["size"] or 0
+
+    print(f"Build plan for {data_from_release['tag_name']}:")
+    plan = {"release": data_from_release["tag_name"], "addins": {}, "release_bytes": release_bytes, "externals_bytes": sum(fetched.values())}
+    for name, addin in addins.items():
+        members = {path: {"size": size, "from": "release"} for path, size in release_files.items()}
+        members.update({path: {"size": None, "from": "generated"} for path in addin["generated"]})
+        members.update({file["file"]: {"size": file["size"], "sha": file["sha"], "cached": file["cached"],
+                                       "from": f"{file['repo']} {file['version']} ({file['source']})"} for file in addin["externals"]})
+        plan["addins"][name] = members
+        print(f"  {name}: {len(members)} members")
+        for path, member in sorted(members.items()):
+            size = "" if member["size"] is None else f"{member['size']:,} bytes, "
+            print(f"    {path}: {size}{member['from']}{' (cached)' if member.get('cached') else ''}")
+    print(f"Estimated transfer: {release_bytes:,} bytes for the release{' (the checkout in source_dir is used)' if not release_bytes else ''}"
+          f" and {plan['externals_bytes']:,} bytes of external files that aren't cached.")
+    report = current_report()
+    if report is not None:
+        report.details["plan"] = plan
+    return plan
+
+############################
+#      GIT LFS FUNCTIONS   #
+############################
+
+# the first line of every Git LFS pointer file. Pointer files are always smaller than 1024 bytes.
+LFS_POINTER_START = b"version https://git-lfs.github.com/spec/v1\n"
+
+def lfs_pointer(contents):
+    '''
+    reads a Git LFS pointer file, which is what the zipball (and git archive) holds in place of a file tracked with LFS.
+
+    Args:
+        contents (bytes): the contents of the file.
+
+    Returns:
+        (tuple): the OID (SHA-256) and size of the object the pointer stands for, or None if contents isn't a pointer.
+
+    Example Usage:
+        >>> lfs_pointer(b"version https://git-lfs.github.com/spec/v1\\noid sha256:4d7a2146...\\nsize 12345\\n")
+        ('4d7a2146...', 12345)
+    '''
+    if len(contents) >= 1024 or not contents.startswith(LFS_POINTER_START):
+        return None
+    keys = dict(line.split(" ", 1) for line in contents.decode("utf-8", "replace").splitlines()[1:] if " " in line)
+    oid = keys.get("oid", "")
+    if not re.fullmatch(r"sha256:[0-9a-f]{64}", oid) or not keys.get("size", "").isdigit():
+        return None
+    return oid[7:], int(keys["size"])
+
+def release_lfs_pointers(source_zip, skip=()):
+    '''
+    finds the Git LFS pointer files in the release zipball. Only members small enough to be pointers are read, and only
+    their first line unless it is the pointer one.
+
+    Args:
+        source_zip (ZipFile): the release zipball opened for reading.
+        skip (set): paths in the repo to leave alone (ex. the ones release_exclusions leaves out).
+
+    Returns:
+        pointers (dictionary): the path in the repo and (OID, size) of each pointer.
+    '''
+    pointers = {}
+    for info in source_zip.infolist():
+        arcname = info.filename.split("/", 1)[1] if "/" in info.filename else ""
+        if arcname == "" or info.is_dir() or arcname.startswith(".github/") or arcname in skip or info.file_size >= 1024:
+            continue
+        with source_zip.open(info) as member:
+            if member.read(len(LFS_POINTER_START)) != LFS_POINTER_START:
+                continue
+            pointer = lfs_pointer(LFS_POINTER_START + member.read())
+        if pointer is not None:
+            pointers[arcname] = pointer
+    if pointers:
+        print(f"{len(pointers)} files of the release are Git LFS pointers and are replaced with their objects.")
+    return pointers
+
+def lfs_actions(owner_repo, token, ref, objects):
+    '''
+    looks Git LFS objects up with the Git LFS batch API, 100 at a time.
+
+    Args:
+        See fetch_lfs_objects.
+
+    Returns:
+        actions (dictionary): the download action (href and header) of each OID the LFS server has.
+        errors (dictionary): the exception of each OID the LFS server refused.
+
+    Raises:
+        Exception: the batch API refused the request.
+    '''
+    objects = list(objects)
+    headers = {"Accept": "application/vnd.git-lfs+json", "Content-Type": "application/vnd.git-lfs+json"}
+    if token:
+        headers["Authorization"] = "Basic " + base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    actions = {}
+    errors = {}
+    for start in range(0, len(objects), 100):
+        body = {"operation": "download", "transfers": ["basic"], "ref": {"name": f"refs/tags/{ref}"},
+                "objects": [{"oid": oid, "size": size} for oid, size in objects[start:start + 100]]}
+        r = github_client().post(f"{GITHUB_SERVER}/{owner_repo}.git/info/lfs/objects/batch", None, headers=headers, data=json.dumps(body))
+        if r.status_code != 200:
+            raise Exception(f"The Git LFS objects of {owner_repo} were not looked up with status code {r.status_code}. Verify your token and try again.")
+        for item in r.json().get("objects", []):
+            if "error" in item:
+                errors[item["oid"]] = Exception(item["error"].get("message", "the LFS server refused it."))
+            elif "download" in item.get("actions", {}):
+                actions[item["oid"]] = item["actions"]["download"]
+    return actions, errors
+
+def open_lfs_object(owner_repo, token, ref, oid, size, spill_bytes=MEMORY_LIMIT_BYTES):
+    '''
+    opens a Git LFS object fetched by fetch_lfs_objects. One that has gone from the lfs_cache since (ex. another build
+    trimmed the cache to its size) is downloaded again, checked against its OID and size, into a temporary file.
+
+    Args:
+        oid (string): the OID of the object.
+        size (integer): the size of the object.
+        spill_bytes (integer): the most of a downloaded object held in memory before it spills to a temporary file.
+        See fetch_lfs_objects for the others.
+
+    Returns:
+        (file): the contents, positioned at the start. Close it when done.
+
+    Raises:
+        Exception: the object could not be downloaded.
+    '''
+    blob = lfs_cache().open_blob(oid)
+    if blob is not None:
+        return blob
+    actions, errors = lfs_actions(owner_repo, token, ref, [(oid, size)])
+    if oid not in actions:
+        raise Exception(f"The Git LFS object {oid} of {owner_repo} could not be fetched: {errors.get(oid, 'the LFS server has no download for it.')}")
+    spool = tempfile.SpooledTemporaryFile(max_size=spill_bytes)
+    try:
+        download_into(actions[oid]["href"], None, spool, size, oid, headers=actions[oid].get("header"), lfs=True)
+    except BaseException:
+        spool.close()
+        raise
+    count('lfs_downloads')
+    spool.seek(0)
+    return spool
+
+def fetch_lfs_objects(owner_repo, token, ref, objects, max_workers=EXTERNAL_WORKERS):
+    '''
+    makes sure every Git LFS object is in the lfs_cache. The ones that aren't are looked up with the Git LFS batch API
+    (100 at a time) and downloaded concurrently, each streamed to disk and checked against its OID and size.
+
+    Args:
+        owner_repo (string): the owner and repo the objects belong to.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        ref (string): the release tag, sent so the LFS server can check access to it.
+        objects (iterable): the (OID, size) of each object, ex. the values of release_lfs_pointers.
+        max_workers (integer): the most objects downloaded at once.
+
+    Returns:
+        cache (ExternalsCache): the lfs_cache, now holding every object.
+
+    Raises:
+        Exception: one or more of the objects could not be fetched. Every failing object is listed.
+
+    Example Usage:
+        >>> cache = fetch_lfs_objects("octocat/Hello-World", TOKEN, "v1.0", release_lfs_pointers(zipball).values())
+        >>> cache.copy_to(oid, "/home/runner/work/addin/data/big.jmp")
+    '''
+    cache = lfs_cache()
+    missing = sorted({(oid, size) for oid, size in objects if not cache.contains(oid)})
+    if not missing:
+        return cache
+
+    actions, errors = lfs_actions(owner_repo, token, ref, missing)
+
+    def download(oid, size):
+        destination = cache.blob_path(oid)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        download_verified(actions[oid]["href"], None, destination, size, oid,
+                          fetch=functools.partial(download_into, headers=actions[oid].get("header"), lfs=True))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        downloads = {oid: submit_in_context(pool, download, oid, size) for oid, size in missing if oid in actions}
+        for oid, future in downloads.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[oid] = e
+    for oid, size in missing:
+        if oid not in actions and oid not in errors:
+            errors[oid] = Exception("the LFS server has no download for it.")
+    count('lfs_downloads', len(downloads) - len(set(downloads) & set(errors)))
+    cache.save()
+    if errors:
+        details = "\n".join(f"  {oid}: {type(e).__name__}: {e}" for oid, e in sorted(errors.items()))
+        raise Exception(f"{len(errors)} of the Git LFS objects of {owner_repo} could not be fetched:\n{details}")
+    return cache
+
+############################
+#    ARCHIVE FUNCTIONS     #
+############################
+
+# file types that are already compressed, so deflating them again only costs time.
+STORED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.ico', '.zip', '.gz', '.7z', '.jmpaddin', '.xlsx', '.docx', '.pptx', '.pdf', '.mp4', '.mp3'}
+
+# the CPython versions whose ZipFile internals write_raw_member is known to work with. On any other Python members are
+# written through the public ZipFile.open instead, which decompresses and compresses them again.
+RAW_ZIP_VERSIONS = ((3, 8), (3, 13))
+# the ZipFile internals write_raw_member uses.
+RAW_ZIP_INTERNALS = ("_lock", "_writecheck", "_didModify", "fp", "start_dir", "filelist", "NameToInfo")
+
+# whether the warning that members are compressed again has been printed, so it is only printed once.
+_raw_zip_warned = False
+
+def raw_zip_writes(dest_zip):
+    '''
+    Returns whether write_raw_member can write already compressed bytes straight into dest_zip on this Python. When it
+    can't, a warning is printed (once) and every member written the slow way is counted as zip_recompressed.
+    '''
+    global _raw_zip_warned
+    if (sys.implementation.name == "cpython" and RAW_ZIP_VERSIONS[0] <= sys.version_info[:2] <= RAW_ZIP_VERSIONS[1]
+            and all(hasattr(dest_zip, name) for name in RAW_ZIP_INTERNALS)):
+        return True
+    if not _raw_zip_warned:
+        _raw_zip_warned = True
+        version = ".".join(str(part) for part in sys.version_info[:3])
+        print(f"Warning: zip members can't be copied as they are on {sys.implementation.name} {version} (only CPython "
+              f"{'.'.join(map(str, RAW_ZIP_VERSIONS[0]))} to {'.'.join(map(str, RAW_ZIP_VERSIONS[1]))}), so they are decompressed "
+              f"and compressed again. The addin is the same but the build is slower. Run the build on a supported Python to avoid it.")
+    count('zip_recompressed')
+    return False
+
+def recompress_member(dest_zip, zinfo, source, chunk_size=1024*1024):
+    '''
+    write_raw_member through the public ZipFile.open, for a Python whose ZipFile internals aren't known: the compressed
+    bytes are inflated and compressed again as they are written. The CRC is checked against the one zinfo had.
+    '''
+    if zinfo.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        raise NotImplementedError(f"{zinfo.filename} is compressed with method {zinfo.compress_type}, which can't be copied.")
+    crc = zinfo.CRC
+    inflater = zlib.decompressobj(-15) if zinfo.compress_type == zipfile.ZIP_DEFLATED else None
+    remaining = zinfo.compress_size
+    with dest_zip.open(zinfo, 'w', force_zip64=zinfo.file_size > zipfile.ZIP64_LIMIT) as dest:
+        while remaining > 0:
+            chunk = source.read(min(remaining, chunk_size))
+            if not chunk:
+                raise zipfile.BadZipFile(f"{zinfo.filename} is cut short in its source.")
+            remaining -= len(chunk)
+            if inflater is None:
+                dest.write(chunk)
+                continue
+            # inflated a chunk at a time, so a member that compressed very well isn't held in memory whole.
+            dest.write(inflater.decompress(chunk, chunk_size))
+            while inflater.unconsumed_tail:
+                dest.write(inflater.decompress(inflater.unconsumed_tail, chunk_size))
+        if inflater is not None:
+            dest.write(inflater.flush())
+    if zinfo.CRC != crc:
+        raise zipfile.BadZipFile(f"{zinfo.filename} doesn't match its CRC.")
+
+def write_raw_member(dest_zip, zinfo, source):
+    '''
+    writes a member whose bytes are already compressed (or stored) into a zip opened for writing. This is what
+    ZipFile.write does internally, minus the compressing. zinfo needs its CRC, sizes and compress_type filled in.
+    It uses ZipFile internals, so on a Python raw_zip_writes doesn't know the member is recompressed instead.
+
+    Args:
+        dest_zip (ZipFile): the zip opened for writing.
+        zinfo (ZipInfo): the member's information.
+        source (file): a file positioned at the start of the compressed bytes. zinfo.compress_size bytes are read from it.
+
+    Returns:
+        N/A
+    '''
+    if not raw_zip_writes(dest_zip):
+        recompress_member(dest_zip, zinfo, source)
+        return
+    with dest_zip._lock:
+        dest_zip._writecheck(zinfo)
+        dest_zip._didModify = True
+        dest_zip.fp.seek(dest_zip.start_dir)
+        zinfo.header_offset = dest_zip.fp.tell()
+        dest_zip.fp.write(zinfo.FileHeader())
+        remaining = zinfo.compress_size
+        while remaining > 0:
+            chunk = source.read(min(remaining, 1024*1024))
+            if not chunk:
+                raise zipfile.BadZipFile(f"{zinfo.filename} is cut short in its source.")
+            dest_zip.fp.write(chunk)
+            remaining -= len(chunk)
+        dest_zip.filelist.append(zinfo)
+        dest_zip.NameToInfo[zinfo.filename] = zinfo
+        dest_zip.start_dir = dest_zip.fp.tell()
+
+def copy_zip_member(source_zip, info, dest_zip, arcname, date_time=None, external_attr=None, create_system=None):
+    '''
+    copies one member of a zip into another zip under a new name without decompressing and recompressing it.
+    The compressed bytes, CRC and sizes are carried over as they are, only a new local header is written.
+
+    Args:
+        source_zip (ZipFile): the zip opened for reading that holds the member.
+        info (ZipInfo): the member to copy from source_zip.
+        dest_zip (ZipFile): the zip opened for writing to copy the member into.
+        arcname (string): the name of the member inside dest_zip.
+        date_time (tuple): a new timestamp for the member. None keeps the one it has.
+        external_attr (integer): new permissions for the member. None keeps the ones it has.
+        create_system (integer): the system the member is marked as made on. None keeps the one it has.
+
+    Returns:
+        N/A
+
+    Example Usage:
+        >>> copy_zip_member(zipball, zipball.getinfo("octocat-Hello-World-7fd1a60/README"), addin, "README")
+    '''
+    new_info = zipfile.ZipInfo(arcname, date_time or info.date_time)
+    new_info.compress_type = info.compress_type
+    new_info.CRC = info.CRC
+    new_info.compress_size = info.compress_size
+    new_info.file_size = info.file_size
+    new_info.external_attr = info.external_attr if external_attr is None else external_attr
+    new_info.create_system = info.create_system if create_system is None else create_system
+    # the sizes are known up front now, so the new entry doesn't need a data descriptor after it.
+    new_info.flag_bits = info.flag_bits & ~0x0808
+
+    if not raw_zip_writes(dest_zip) or not hasattr(source_zip, "fp"):
+        # ZipFile.open decompresses the member (checking its CRC) and ZipFile.open(..., 'w') compresses it again.
+        with source_zip.open(info) as source, dest_zip.open(new_info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dest:
+            shutil.copyfileobj(source, dest, 1024*1024)
+        return
+
+    # the local header is 30 bytes with the filename and extra field lengths as the last 2 shorts, the data follows those fields.
+    source_zip.fp.seek(info.header_offset)
+    name_length, extra_length = struct.unpack('<26xHH', source_zip.fp.read(30))
+    source_zip.fp.seek(info.header_offset + 30 + name_length + extra_length)
+    write_raw_member(dest_zip, new_info, source_zip.fp)
+
+def compress_member(location, level, chunk_size=1024*1024, placeholders=None):
+    '''
+    compresses one file for the addin into a spooled temp file (memory, then disk past 16MB). Files in STORED_EXTENSIONS,
+    and any file deflate doesn't make smaller, are stored as they are.
+
+    Args:
+        location (string): the file to compress.
+        level (integer): the deflate level, 0 (store everything) to 9.
+        chunk_size (integer): the number of bytes read at a time.
+        placeholders (Placeholders): the placeholders to fill in as the file is read. None compresses it as it is.
+
+    Returns:
+        compress_type (integer): zipfile.ZIP_DEFLATED or zipfile.ZIP_STORED.
+        crc (integer): the CRC-32 of the file.
+        file_size (integer): the size of the file.
+        spool (SpooledTemporaryFile): the bytes to write for the member, positioned at the end.
+    '''
+    with open(location, "rb") as file:
+        return compress_file(file, location, level, chunk_size, placeholders)
+
+def compress_file(file, name, level, chunk_size=1024*1024, placeholders=None):
+    '''
+    the part of compress_member that compresses an already open file (ex. a member of another zip).
+
+    Args:
+        file (file): the file to compress, opened for binary reading. It is read again from the start if it is stored.
+        name (string): the file's name, for picking out STORED_EXTENSIONS.
+        See compress_member for the others.
+
+    Returns:
+        See compress_member.
+    '''
+    spool = tempfile.SpooledTemporaryFile(max_size=16*1024*1024)
+    store = level == 0 or os.path.splitext(name)[1].lower() in STORED_EXTENSIONS
+    compressor = None if store else zlib.compressobj(level, zlib.DEFLATED, -15)
+    crc = 0
+    file_size = 0
+    for chunk in member_chunks(file, placeholders, chunk_size):
+        crc = zlib.crc32(chunk, crc)
+        file_size += len(chunk)
+        spool.write(chunk if store else compressor.compress(chunk))
+    if not store:
+        spool.write(compressor.flush())
+        if spool.tell() >= file_size:
+            # deflate didn't help, so store it instead.
+            store = True
+            spool.seek(0)
+            spool.truncate()
+            file.seek(0)
+            for chunk in member_chunks(file, placeholders, chunk_size):
+                spool.write(chunk)
+    return (zipfile.ZIP_STORED if store else zipfile.ZIP_DEFLATED), crc, file_size, spool
+
+def unchanged_member(location, previous_info, placeholders=None):
+    '''
+    checks a file against the member of the same name in a previous build of the addin by size and CRC-32.
+
+    Args:
+        location (string): the file in this build.
+        previous_info (ZipInfo): the member of the previous addin, or None if it had no member of that name.
+        placeholders (Placeholders): the placeholders filled in to the file, so the file as it goes in the addin is compared.
+
+    Returns:
+        (boolean): True if the file is the same as the previous member, so its compressed bytes can be reused.
+    '''
+    if previous_info is None or (placeholders is None and previous_info.file_size != os.path.getsize(location)):
+        return False
+    crc = 0
+    file_size = 0
+    with open(location, "rb") as file:
+        for chunk in member_chunks(file, placeholders):
+            crc = zlib.crc32(chunk, crc)
+            file_size += len(chunk)
+    return crc == previous_info.CRC and file_size == previous_info.file_size
+
+def compress_or_reuse(location, level, previous_info, placeholders=None):
+    '''
+    compress_member for a file that changed since the previous build, None for one that didn't.
+    '''
+    if unchanged_member(location, previous_info, placeholders):
+        return None
+    return compress_member(location, level, placeholders=placeholders)
+
+def write_compressed(dest_zip, arcname, compressed, date_time):
+    '''
+    writes a member compressed by compress_member into a zip opened for writing, with the timestamp given and the same
+    permissions and creating system every time.
+
+    Args:
+        dest_zip (ZipFile): the zip opened for writing.
+        arcname (string): the name of the member.
+        compressed (tuple): what compress_member returned. The spool is closed once it is written.
+        date_time (tuple): the timestamp of the member.
+
+    Returns:
+        N/A
+    '''
+    compress_type, crc, file_size, spool = compressed
+    with spool:
+        zinfo = zipfile.ZipInfo(arcname, date_time)
+        zinfo.compress_type = compress_type
+        zinfo.CRC = crc
+        zinfo.file_size = file_size
+        zinfo.compress_size = spool.tell()
+        zinfo.create_system = 3
+        zinfo.external_attr = 0o644 << 16
+        spool.seek(0)
+        write_raw_member(dest_zip, zinfo, spool)
+
+def compression_level(setting, deployment_state):
+    '''
+    works out the deflate level for the addin from the compression_level input.
+
+    Args:
+        setting (string): "auto", or a level from 0 (no compression) to 9 (smallest).
+        deployment_state (string): Test or Prod deployment type.
+
+    Returns:
+        (integer): the deflate level. auto is 1 (fastest) for TEST builds and 9 for PROD builds.
+
+    Example Usage:
+        >>> compression_level("auto", "TEST")
+        1
+    '''
+    if str(setting).strip().isdigit():
+        return min(int(setting), 9)
+    return 1 if deployment_state == "TEST" else 9
+
+def write_archive(source_folder, addin_path, level=9, workers=None, date_time=(1980, 1, 1, 0, 0, 0), previous=None, placeholders=None):
+    '''
+    zips up a folder into the addin, deflating the members on a thread pool (zlib works outside the GIL).
+    Members are written sorted by path with the same timestamp and permissions, so the same files always give
+    the same bytes. Given a previous build of the addin, members with the same size and CRC are copied from it
+    already compressed, so only what changed is compressed again. Placeholders are filled in to the members they
+    apply to as those are compressed.
+
+    Args:
+        source_folder (string): the folder to zip up. Paths in the addin are relative to it.
+        addin_path (string): the location of the addin to write.
+        level (integer): the deflate level, 0 (store everything) to 9.
+        workers (integer): the number of members compressed at once. Defaults to the number of CPUs.
+        date_time (tuple): the timestamp given to every member (year, month, day, hour, minute, second).
+        previous (string): the location of a previous build of the addin to reuse members from. None compresses everything.
+        placeholders (Placeholders): the placeholders of the build. None writes every file as it is.
+
+    Returns:
+        addin_path (string): the location of the addin.
+
+    Example Usage:
+        >>> write_archive("/home/runner/work/repo", "/home/runner/work/addin_v1.0.jmpaddin", 9, date_time=(2023, 3, 24, 21, 6, 48))
+    '''
+    workers = workers or os.cpu_count() or 1
+    members = []
+    for folder, dirs, files in os.walk(source_folder):
+        for name in files:
+            full_path = os.path.join(folder, name)
+            members.append((os.path.relpath(full_path, source_folder).replace(os.sep, "/"), full_path))
+    members.sort()
+
+    previous_zip = zipfile.ZipFile(previous, 'r') if previous else None
+    previous_infos = {info.filename: info for info in previous_zip.infolist()} if previous_zip else {}
+    reused = []
+
+    def write_member(arcname, compressed):
+        if compressed.result() is None:
+            copy_zip_member(previous_zip, previous_infos[arcname], dest_zip, arcname, date_time, 0o644 << 16, 3)
+            reused.append(arcname)
+            return
+        write_compressed(dest_zip, arcname, compressed.result(), date_time)
+
+    try:
+        with zipfile.ZipFile(addin_path, 'w') as dest_zip, ThreadPoolExecutor(max_workers=workers) as pool:
+            # only a couple of members per worker are compressed ahead of the writer, so memory stays bounded.
+            pending = deque()
+            for arcname, full_path in members:
+                expand = placeholders if placeholders is not None and placeholders.applies(arcname) else None
+                pending.append((arcname, submit_in_context(pool, compress_or_reuse, full_path, level, previous_infos.get(arcname), expand)))
+                if len(pending) >= workers * 2:
+                    write_member(*pending.popleft())
+            while pending:
+                write_member(*pending.popleft())
+    finally:
+        if previous_zip:
+            previous_zip.close()
+    if previous_zip:
+        print(f"{len(reused)} of {len(members)} members were reused from the previous build, {len(members) - len(reused)} were compressed.")
+        count('members_reused', len(reused))
+    return addin_path
+
+def reproducible_archive(source, destination, level=9, date_time=(1980, 1, 1, 0, 0, 0), workers=None):
+    '''
+    rewrites a finished addin so the same members always give the same bytes, whichever build_mode made it. Members
+    are sorted by path, folder entries are dropped, and every member is compressed again exactly as write_archive does
+    it (the same level, timestamp, permissions and stored extensions) on a thread pool. An addin from write_archive
+    is already in this form.
+
+    Args:
+        source (string or file): the finished addin.
+        destination (string or file): where to write the reproducible addin. Not the same as source.
+        level (integer): the deflate level, 0 (store everything) to 9.
+        date_time (tuple): the timestamp given to every member, the release's published_at.
+        workers (integer): the number of members compressed at once. Defaults to the number of CPUs.
+
+    Returns:
+        destination (string or file): the reproducible addin.
+
+    Example Usage:
+        >>> reproducible_archive("addin_v1.0.jmpaddin", "addin_v1.0.jmpaddin.tmp", 9, (2023, 3, 24, 21, 6, 48))
+    '''
+    workers = workers or os.cpu_count() or 1
+    with zipfile.ZipFile(source, 'r') as source_zip, zipfile.ZipFile(destination, 'w') as dest_zip, ThreadPoolExecutor(max_workers=workers) as pool:
+        def compress(info):
+            with source_zip.open(info) as file:
+                return compress_file(file, info.filename, level)
+
+        pending = deque()
+        for info in sorted((info for info in source_zip.infolist() if not info.is_dir()), key=lambda info: info.filename):
+            pending.append((info.filename, submit_in_context(pool, compress, info)))
+            if len(pending) >= workers * 2:
+                arcname, compressed = pending.popleft()
+                write_compressed(dest_zip, arcname, compressed.result(), date_time)
+        while pending:
+            arcname, compressed = pending.popleft()
+            write_compressed(dest_zip, arcname, compressed.result(), date_time)
+    return destination
+
+def addin_manifest(addin, addin_name, tag_name):
+    '''
+    lists the SHA-256 and size of every member of a finished addin, plus one digest over all of them, so two builds with
+    the same contents can be spotted without comparing the addins. The digest is the SHA-256 of a "<sha256>  <member>"
+    line per member, sorted by member, so it doesn't depend on how the zip itself was written.
+
+    Args:
+        addin (string or file): the finished addin.
+        addin_name (string): the filename of the addin.
+        tag_name (string): the release tag the addin was built from.
+
+    Returns:
+        manifest (dictionary): the addin, release, digest and each member's sha256 and size.
+
+    Example Usage:
+        >>> addin_manifest("addin_v1.0.jmpaddin", "addin_v1.0.jmpaddin", "v1.0")
+        {'addin': 'addin_v1.0.jmpaddin', 'release': 'v1.0', 'digest': '5e8f...', 'members': {'addin.def': {'sha256': '0b1c...', 'size': 88}, ...}}
+    '''
+    members = {}
+    with zipfile.ZipFile(addin, 'r') as addin_zip:
+        for info in sorted(addin_zip.infolist(), key=lambda info: info.filename):
+            if info.is_dir():
+                continue
+            digest = hashlib.sha256()
+            with addin_zip.open(info) as file:
+                for chunk in iter(lambda: file.read(1024*1024), b""):
+                    digest.update(chunk)
+            members[info.filename] = {"sha256": digest.hexdigest(), "size": info.file_size}
+    lines = "".join(f"{member['sha256']}  {name}\n" for name, member in members.items())
+    return {"addin": addin_name, "release": tag_name, "digest": hashlib.sha256(lines.encode("utf-8")).hexdigest(), "members": members}
+
+############################
+#  STREAMED BUILD FUNCTIONS #
+############################
+
+def repack_release(source_zip, dest_zip, replaced_names=(), placeholders=None):
+    '''
+    copies the members of the release zipball into the addin, stripping the <owner>-<repo>-<sha>/ folder github puts
+    everything in and dropping .github/. Members are copied with copy_zip_member so nothing is recompressed, except
+    those the placeholders apply to, which are streamed through them into a newly compressed member.
+
+    Args:
+        source_zip (ZipFile): the release zipball opened for reading.
+        dest_zip (ZipFile): the addin opened for writing.
+        replaced_names (set): member names that will be written by the builder instead (ex. addin.def), so the repo copy is skipped.
+        placeholders (Placeholders): the placeholders of the build. None copies every member as it is.
+
+    Returns:
+        N/A
+    '''
+    for info in source_zip.infolist():
+        # every member of a github zipball sits under a single <owner>-<repo>-<sha>/ folder.
+        arcname = info.filename.split("/", 1)[1] if "/" in info.filename else ""
+        if arcname == "" or arcname == ".github/" or arcname.startswith(".github/") or arcname in replaced_names:
+            continue
+        if placeholders is not None and not info.is_dir() and placeholders.applies(arcname):
+            with source_zip.open(info) as source:
+                write_expanded(dest_zip, arcname, source, placeholders, info.file_size, info.date_time)
+            continue
+        copy_zip_member(source_zip, info, dest_zip, arcname)
+
+def new_member(dest_zip, arcname, date_time):
+    '''
+    Returns a ZipInfo for a new member of a zip opened for writing, with the timestamp given and compressed the way
+    ZipFile.writestr would compress it. Members the build writes get the release's published_at, so building the same
+    release again gives the same addin.
+    '''
+    info = zipfile.ZipInfo(arcname, date_time)
+    info.compress_type = dest_zip.compression
+    # ZipInfo has no public attribute for the level before Python 3.13 (compress_level), so it is set as ZipFile.open sets it.
+    if hasattr(zipfile.ZipInfo, "compress_level"):
+        info.compress_level = dest_zip.compresslevel
     else:
-        addin_final = ADDIN_NAME
+        info._compresslevel = dest_zip.compresslevel
+    info.external_attr = 0o644 << 16
+    return info
+
+def write_expanded(dest_zip, arcname, source, placeholders, size=None, date_time=None):
+    '''
+    writes an open file into a zip opened for writing as a new member, filling in the placeholders on the way.
+
+    Args:
+        dest_zip (ZipFile): the zip opened for writing.
+        arcname (string): the name of the member.
+        source (file): the file to read, opened for binary reading.
+        placeholders (Placeholders): the placeholders to fill in. None writes the file as it is.
+        size (integer): the size of the file before the placeholders are filled in, if known, for picking ZIP64.
+        date_time (tuple): the timestamp of the member (see new_member). None is the current time.
+
+    Returns:
+        N/A
+    '''
+    member_info = new_member(dest_zip, arcname, date_time) if date_time is not None else arcname
+    # filling in placeholders can make the member bigger, so leave plenty of room before ZIP64 is needed.
+    with dest_zip.open(member_info, 'w', force_zip64=size is not None and size * 2 > zipfile.ZIP64_LIMIT) as member:
+        for chunk in member_chunks(source, placeholders):
+            member.write(chunk)
+
+def read_release_member(source_zip, member):
+    '''
+    reads a small text file (ex. the jmpcust template or the .ini) out of the release zipball without extracting it.
+
+    Args:
+        source_zip (ZipFile): the release zipball opened for reading.
+        member (string): the path of the file inside the repo (ex. ".github/workflows/config.ini").
+
+    Returns:
+        (string): the text of the file.
+    '''
+    root = source_zip.infolist()[0].filename.split("/", 1)[0]
+    return source_zip.read(root + "/" + member).decode("utf-8")
+
+def release_externals(source_zip, external_files):
+    '''
+    reads the .ini of external files out of the release zipball.
+
+    Args:
+        source_zip (ZipFile): the release zipball opened for reading.
+        external_files (string): the filename in .github/workflows of the .ini.
+
+    Returns:
+        (dictionary): the external files, as config_parse gives them.
+    '''
+    config = configparser.ConfigParser()
+    config.read_string(read_release_member(source_zip, ".github/workflows/" + external_files))
+    return externals_from_config(config)
+
+def stream_build(data, token, save_location, addin_final_name, generated_text, jmp_cust_file, addin_id, external_files, level=9, placeholders=None, exclude="", source_dir="", listings=None, reproducible=False, lfs=True):
+    '''
+    builds the addin by transcoding the release zipball straight into the .jmpaddin. The zipball is streamed to a temp file,
+    its members are copied over raw and the generated files and externals are added as new members. Nothing is extracted,
+    deleted or compressed a second time, so memory and disk writes stay flat whatever the size of the repo.
+
+    Args:
+        data (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        save_location (string): the folder the finished addin is written to.
+        addin_final_name (string): the filename of the addin, with the .jmpaddin extension.
+        generated_text (dictionary): member name to text for the generated files (ex. addin.def, customMetaData.jsl).
+        jmp_cust_file (string): the filename in .github/workflows of the jmpcust template.
+        addin_id (string): the addin id, filled into the jmpcust template.
+        external_files (string): the filename in .github/workflows of the .ini for external files. "" when there isn't one.
+        level (integer): the deflate level for the new members. The repo's members keep the compression they came with.
+        placeholders (Placeholders): the placeholders of the build (see release_placeholders). None fills in only the jmpcust template.
+        exclude (string): the exclude input, more .jaabignore lines (see release_exclusions).
+        source_dir (string): a checkout of the release to use instead of downloading the zipball (see release_zipball).
+        listings (dictionary): repos already listed by preflight, shared so they aren't listed again (see pack_up_externals).
+        reproducible (boolean): rewrite the addin with reproducible_archive so the same release always gives the same bytes.
+        lfs (boolean): replace Git LFS pointer files with their objects (see fetch_lfs_objects).
+
+    Returns:
+        os.path.join(save_location, addin_final_name) (string): the location of the finished addin.
+
+    Example Usage:
+        >>> stream_build(data, TOKEN, os.getcwd(), "addin_v1.0.jmpaddin", {"addin.def": def_text}, "myfile.txt", "com.company.addin", "config.ini")
+    '''
+    addin_path = os.path.join(save_location, addin_final_name)
+    with tempfile.TemporaryDirectory() as scratch:
+        zip_path = os.path.join(scratch, "release.zip")
+        with stage("download"), open(zip_path, "wb") as folder:
+            release_zipball(data, token, folder, source_dir, level)
+        transcode_build(zip_path, data, token, addin_path, generated_text, jmp_cust_file, addin_id, external_files, level, listings, placeholders, exclude,
+                        reproducible, lfs)
+    return addin_path
+
+def transcode_build(zip_path, data, token, addin_path, generated_text, jmp_cust_file, addin_id, external_files, level=9, listings=None, placeholders=None, exclude="", reproducible=False, lfs=True):
+    '''
+    the part of stream_build after the download: builds the addin at addin_path from a release zipball already on disk.
+    Safe to run for several addins at once from the same zipball.
+
+    Args:
+        zip_path (string): the location of the release zipball.
+        addin_path (string): the location to write the addin to.
+        listings (dictionary): shared with pack_up_externals so repos listed for another addin aren't listed again.
+        reproducible (boolean): rewrite the addin with reproducible_archive so the same release always gives the same bytes.
+        lfs (boolean): replace Git LFS pointer files with their objects (see fetch_lfs_objects).
+        See stream_build for the others.
+
+    Returns:
+        addin_path (string): the location of the finished addin.
+    '''
+    with tempfile.TemporaryDirectory() as scratch, zipfile.ZipFile(zip_path, 'r') as source_zip:
+        generated = dict(generated_text)
+        template = read_release_member(source_zip, ".github/workflows/" + jmp_cust_file)
+        generated["addin.jmpcust"] = jmpcust_text(template, data["tag_name"], addin_id, placeholders)
+        excluded = release_exclusions(source_zip, exclude)
+
+        # externals are few and small, so they are written to the scratch folder and added from there.
+        externals_location = os.path.join(scratch, "externals")
+        os.makedirs(externals_location)
+        if external_files != "":
+            print("a .ini file is referenced for include files")
+            externals_dict = release_externals(source_zip, external_files)
+            if len(externals_dict) != 0:
+                print("Library files are detected in the config.ini and will be included")
+                with stage("externals"):
+                    pack_up_externals(externals_dict, externals_location, token, listings=listings)
+        externals = {}
+        for folder, dirs, files in os.walk(externals_location):
+            dirs.sort()
+            for name in sorted(files):
+                full_path = os.path.join(folder, name)
+                externals[os.path.relpath(full_path, externals_location).replace(os.sep, "/")] = full_path
+
+        # Git LFS objects are added straight from the lfs_cache in place of their pointers, unless an external replaces them.
+        pointers = release_lfs_pointers(source_zip, set(excluded) | set(generated) | set(externals)) if lfs else {}
+        if pointers:
+            with stage("lfs"):
+                fetch_lfs_objects(release_repo(data), token, data["tag_name"], pointers.values())
+
+        # the members written here get the release's time rather than the time of the build.
+        date_time = release_time(data["published_at"])
+        with stage("archive"), zipfile.ZipFile(addin_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as dest_zip:
+            repack_release(source_zip, dest_zip, set(generated) | set(externals) | set(excluded) | set(pointers), placeholders)
+            for name, text in generated.items():
+                dest_zip.writestr(new_member(dest_zip, name, date_time), text)
+            for name, full_path in externals.items():
+                expand = placeholders if placeholders is not None and placeholders.applies(name) else None
+                with open(full_path, "rb") as source:
+                    write_expanded(dest_zip, name, source, expand, os.path.getsize(full_path), date_time)
+            for name, (oid, size) in pointers.items():
+                expand = placeholders if placeholders is not None and placeholders.applies(name) else None
+                with open_lfs_object(release_repo(data), token, data["tag_name"], oid, size) as contents:
+                    write_expanded(dest_zip, name, contents, expand, size, date_time)
+    if reproducible:
+        with stage("reproducible"):
+            reproducible_archive(addin_path, addin_path + ".reproducible", level, release_time(data["published_at"]))
+            os.replace(addin_path + ".reproducible", addin_path)
+    return addin_path
+
+############################
+#  MEMORY BUILD FUNCTIONS  #
+############################
+
+def fetch_external(url, sha, size, token, spill_bytes=MEMORY_LIMIT_BYTES, source=None):
+    '''
+    gets one external file as an open file to read from: the ExternalsCache copy if there is one, otherwise a verified
+    download (or read from the external source) held in memory, spilling to a temp file past spill_bytes, which is then
+    added to the cache.
+
+    Args:
+        url (string): the download URL of the file.
+        sha (string): the git blob SHA of the file.
+        size (integer): the size of the file in bytes.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        spill_bytes (integer): the most bytes held in memory before the download spills to a temp file.
+        source (GithubSource, GitMirrorSource or DirectorySource): where the file was listed from. Defaults to Github.
+
+    Returns:
+        (file): the contents, positioned at the start. Close it when done.
+    '''
+    cache = externals_cache()
+    blob = cache.open_blob(sha)
+    if blob is not None:
+        return blob
+    spool = tempfile.SpooledTemporaryFile(max_size=spill_bytes)
+    (source.fetch_into if source else download_into)(url, token, spool, size, sha)
+    spool.seek(0)
+    cache.add_file(sha, spool)
+    spool.seek(0)
+    return spool
+
+def memory_build(data, token, generated_text, jmp_cust_file, addin_id, external_files, level=9, spill_bytes=MEMORY_LIMIT_BYTES, max_workers=EXTERNAL_WORKERS, placeholders=None, exclude="", source_dir="", listings=None, reproducible=False, lfs=True):
+    '''
+    builds the whole addin in a memory buffer. The zipball is downloaded into memory, its members are copied raw into
+    an in-memory addin and the generated files and externals are written straight into it. Either buffer spills to a
+    temp file past spill_bytes. No file is written to the workspace and the working directory is never changed.
+
+    Args:
+        data (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        generated_text (dictionary): member name to text for the generated files (ex. addin.def, customMetaData.jsl).
+        jmp_cust_file (string): the filename in .github/workflows of the jmpcust template.
+        addin_id (string): the addin id, filled into the jmpcust template.
+        external_files (string): the filename in .github/workflows of the .ini for external files. "" when there isn't one.
+        level (integer): the deflate level for the new members.
+        spill_bytes (integer): the most bytes either buffer holds in memory. Set with the memory_limit_mb input.
+        max_workers (integer): the most external files fetched at once.
+        placeholders (Placeholders): the placeholders of the build (see release_placeholders). None fills in only the jmpcust template.
+        exclude (string): the exclude input, more .jaabignore lines (see release_exclusions).
+        source_dir (string): a checkout of the release to use instead of downloading the zipball (see release_zipball).
+        listings (dictionary): repos already listed by preflight, shared so they aren't listed again (see pack_up_externals).
+        reproducible (boolean): rewrite the addin with reproducible_archive so the same release always gives the same bytes.
+        lfs (boolean): replace Git LFS pointer files with their objects (see fetch_lfs_objects).
+
+    Returns:
+        addin (SpooledTemporaryFile): the finished addin. Pass it to uploadAsset as addin_file.
+
+    Raises:
+        Exception: one or more of the external files could not be included. Every failing entry is listed.
+
+    Example Usage:
+        >>> addin = memory_build(data, TOKEN, {"addin.def": def_text}, "myfile.txt", "com.company.addin", "config.ini")
+        >>> uploadAsset("addin_v1.0.jmpaddin", data, None, TOKEN, addin_file=addin)
+    '''
+    addin = tempfile.SpooledTemporaryFile(max_size=spill_bytes)
+    with tempfile.SpooledTemporaryFile(max_size=spill_bytes) as source:
+        with stage("download"):
+            release_zipball(data, token, source, source_dir, level)
+        with zipfile.ZipFile(source, 'r') as source_zip, zipfile.ZipFile(addin, 'w', zipfile.ZIP_DEFLATED, compresslevel=level) as dest_zip:
+            generated = dict(generated_text)
+            template = read_release_member(source_zip, ".github/workflows/" + jmp_cust_file)
+            generated["addin.jmpcust"] = jmpcust_text(template, data["tag_name"], addin_id, placeholders)
+            excluded = release_exclusions(source_zip, exclude)
+
+            externals = {}
+            if external_files != "":
+                print("a .ini file is referenced for include files")
+                externals_dict = release_externals(source_zip, external_files)
+                with stage("externals"):
+                    resolved, errors = resolve_externals(externals_dict, token, max_workers, listings)
+                for numbah, (files_from_repo, maps, source) in resolved.items():
+                    try:
+                        for url, sha, size, arcname in external_targets(files_from_repo, maps[2], maps[3], maps[4]):
+                            externals[arcname] = (url, sha, size, source)
+                    except Exception as e:
+                        errors[numbah] = e
+                if errors:
+                    raise externals_error(externals_dict, errors)
+
+            pointers = release_lfs_pointers(source_zip, set(excluded) | set(generated) | set(externals)) if lfs else {}
+            if pointers:
+                with stage("lfs"):
+                    fetch_lfs_objects(release_repo(data), token, data["tag_name"], pointers.values(), max_workers)
+
+            # the members written here get the release's time rather than the time of the build.
+            date_time = release_time(data["published_at"])
+            with stage("archive"):
+                repack_release(source_zip, dest_zip, set(generated) | set(externals) | set(excluded) | set(pointers), placeholders)
+                for name, text in generated.items():
+                    dest_zip.writestr(new_member(dest_zip, name, date_time), text)
+                for arcname, (oid, size) in pointers.items():
+                    expand = placeholders if placeholders is not None and placeholders.applies(arcname) else None
+                    with open_lfs_object(release_repo(data), token, data["tag_name"], oid, size, spill_bytes) as contents:
+                        write_expanded(dest_zip, arcname, contents, expand, size, date_time)
+
+            def write_member(arcname, fetched):
+                expand = placeholders if placeholders is not None and placeholders.applies(arcname) else None
+                with fetched.result() as contents:
+                    write_expanded(dest_zip, arcname, contents, expand, externals[arcname][2], date_time)
+
+            with stage("externals"), ThreadPoolExecutor(max_workers=max_workers) as pool:
+                # only a couple of files per worker are fetched ahead of the writer, so memory stays bounded.
+                pending = deque()
+                for arcname, (url, sha, size, source) in externals.items():
+                    pending.append((arcname, submit_in_context(pool, fetch_external, url, sha, size, token, spill_bytes, source)))
+                    if len(pending) >= max_workers * 2:
+                        write_member(*pending.popleft())
+                while pending:
+                    write_member(*pending.popleft())
+    if externals:
+        externals_cache().save()
+    if reproducible:
+        with stage("reproducible"), addin:
+            addin.seek(0)
+            return reproducible_archive(addin, tempfile.SpooledTemporaryFile(max_size=spill_bytes), level, release_time(data["published_at"]))
+    return addin
+
+############################
+#   BATCH BUILD FUNCTIONS  #
+############################
+
+def batch_targets(manifest_text, defaults):
+    '''
+    reads the batch manifest: an .ini with a section per addin to build. Each section can set any of the keys in
+    defaults (the action inputs of the same names), and anything it doesn't set comes from defaults. Keys in a
+    [DEFAULT] section apply to every addin.
+
+    Args:
+        manifest_text (string): the text of the manifest.
+        defaults (dictionary): the action's own inputs by name (ex. addin_id, jmpcust_txt_file, external_files).
+
+    Returns:
+        targets (dictionary): the settings of each addin by section name.
+
+    Raises:
+        ValueError: the manifest has no addins or uses a key that isn't an input.
+
+    Example Usage:
+        >>> batch_targets("[prod]\\naddin_id = com.company.tool\\n[test]\\naddin_id = com.company.tool.test\\njmpcust_txt_file = test_menu.txt\\n", defaults)
+    '''
+    config = configparser.ConfigParser(interpolation=None)
+    config.read_string(manifest_text)
+    targets = {}
+    for section in config.sections():
+        unknown = set(config[section]) - set(defaults)
+        if unknown:
+            raise ValueError(f"[{section}] in the batch manifest has settings that aren't inputs: {', '.join(sorted(unknown))}.")
+        targets[section] = {**defaults, **dict(config[section])}
+    if not targets:
+        raise ValueError("The batch manifest has no addins in it. Add a [section] for each addin.")
+    return targets
+
+def batch_build(data, token, save_location, manifest_name, defaults, workers=BATCH_WORKERS, exclude="", source_dir="", listings=None, reproducible=False, lfs=True):
+    '''
+    builds every addin in a batch manifest from one release. The zipball is downloaded once, every external file any of the
+    addins needs is fetched once into the ExternalsCache, and then the addins are transcoded from the shared zipball at the
+    same time.
+
+    Args:
+        data (list): The specific list information to the release targetted for packaging.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        save_location (string): the folder the finished addins are written to.
+        manifest_name (string): the filename in .github/workflows of the batch manifest (see batch_targets).
+        defaults (dictionary): the action's own inputs by name, used for anything a section doesn't set.
+        workers (integer): the most addins built at once. Set with the batch_workers input.
+        exclude (string): the exclude input, more .jaabignore lines for every addin (see release_exclusions).
+        source_dir (string): a checkout of the release to use instead of downloading the zipball (see release_zipball).
+        listings (dictionary): repos already listed by preflight, shared so they aren't listed again (see pack_up_externals).
+        reproducible (boolean): rewrite the addin with reproducible_archive so the same release always gives the same bytes.
+        lfs (boolean): replace Git LFS pointer files with their objects (see fetch_lfs_objects).
+
+    Returns:
+        built (dictionary): the filename of each finished addin by section name.
+
+    Raises:
+        ValueError: two addins in the manifest would have the same filename.
+        Exception: one or more of the addins failed to build. Every failing addin is listed.
+
+    Example Usage:
+        >>> batch_build(data, TOKEN, os.getcwd(), "addins.ini", defaults)
+        {'prod': 'tool.jmpaddin', 'test': 'tool_test_v1.0.0.jmpaddin'}
+    '''
+    ver_num, jmp_date, deployment_stage = needed_variables(data)
+    built = {}
+    errors = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        zip_path = os.path.join(scratch, "release.zip")
+        with stage("download"), open(zip_path, "wb") as folder:
+            release_zipball(data, token, folder, source_dir, compression_level(defaults["compression_level"], deployment_stage))
+
+        with zipfile.ZipFile(zip_path, 'r') as source_zip:
+            targets = batch_targets(read_release_member(source_zip, ".github/workflows/" + manifest_name), defaults)
+            # the Git LFS objects are fetched once here, so the builds below only copy them from the lfs_cache.
+            pointers = release_lfs_pointers(source_zip, release_exclusions(source_zip, exclude)) if lfs else {}
+            if pointers:
+                with stage("lfs"):
+                    fetch_lfs_objects(release_repo(data), token, data["tag_name"], pointers.values())
+            shared = {}
+            for target in targets.values():
+                if target["external_files"] != "":
+                    for maps in release_externals(source_zip, target["external_files"]).values():
+                        if len(maps) in (6, 7):
+                            shared[(maps[0], maps[1], maps[2], maps[5], maps[6] if len(maps) == 7 else "")] = None
+
+        for section, target in targets.items():
+            target["filename"] = addin_filename(target["addin_name"], data["tag_name"], deployment_stage, target["tag_suffix"])
+        filenames = [target["filename"] for target in targets.values()]
+        if len(set(filenames)) != len(filenames):
+            raise ValueError(f"Two addins in the batch manifest would both be named {next(f for f in filenames if filenames.count(f) > 1)}.")
+
+        # every external file of every addin, fetched once so the builds below only copy from the cache.
+        listings = {} if listings is None else listings
+        if shared:
+            prefetch = {str(i): [owner, repo, needed, str(i), "main", version, source] for i, (owner, repo, needed, version, source) in enumerate(shared)}
+            try:
+                with stage("externals"):
+                    pack_up_externals(prefetch, os.path.join(scratch, "prefetch"), token, listings=listings)
+            except ExternalsError as e:
+                # each addin reports its own missing files below. Anything else (ex. the network or the token) stops the batch.
+                if not e.missing():
+                    raise
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for section, target in targets.items():
+                generated_text = generated_files(ver_num, jmp_date, deployment_stage, target["make_meta_file"], target["author"],
+                                                 target["addin_id"], target["addin_name"], target["pub_name"], target["final_pub_path"])
+                placeholders = release_placeholders(data["tag_name"], ver_num, jmp_date, deployment_stage, target["addin_id"], target["addin_name"],
+                                                    target["author"], target["placeholders"], target["placeholder_files"])
+                futures[section] = submit_in_context(pool, transcode_build, zip_path, data, token, os.path.join(save_location, target["filename"]),
+                                               generated_text, target["jmpcust_txt_file"], target["addin_id"], target["external_files"],
+                                               compression_level(target["compression_level"], deployment_stage), listings, placeholders, exclude,
+                                               reproducible, lfs)
+            for section, future in futures.items():
+                try:
+                    future.result()
+                    built[section] = targets[section]["filename"]
+                    print(f"addin build is complete for {built[section]}")
+                except Exception as e:
+                    errors[section] = e
+
+    if errors:
+        details = "\n".join(f"  [{section}]: {type(e).__name__}: {e}" for section, e in errors.items())
+        raise Exception(f"{len(errors)} of the {len(targets)} addins in the batch manifest failed to build:\n{details}")
+    return built
+
+############################
+#    CATALOG FUNCTIONS     #
+############################
+
+def catalog_repo_list(repos_text, token):
+    '''
+    works out the repos a catalog covers from the catalog_repos input: owner/repo names separated by commas, spaces or
+    new lines. owner/* stands for every repo the owner has.
+
+    Args:
+        repos_text (string): the catalog_repos input.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+
+    Returns:
+        repos (list): the owner/repo of each repo, without repeats, in the order given.
+
+    Example Usage:
+        >>> catalog_repo_list("octocat/Hello-World, octocat/Spoon-Knife", TOKEN)
+        ['octocat/Hello-World', 'octocat/Spoon-Knife']
+    '''
+    repos = {}
+    for name in re.split(r'[\s,]+', repos_text.strip()):
+        if not name:
+            continue
+        if name.endswith("/*"):
+            for repo in json_pages(f"{GITHUB_API}/users/{name[:-2]}/repos", token):
+                repos.setdefault(repo["full_name"], None)
+        elif name.count("/") == 1:
+            repos.setdefault(name, None)
+        else:
+            raise ValueError(f"{name} in catalog_repos isn't an owner/repo.")
+    return list(repos)
+
+def addin_identity(asset, token):
+    '''
+    reads the id and name of an addin from the addin.def inside a .jmpaddin release asset.
+
+    Args:
+        asset (dictionary): the github information of the asset.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+
+    Returns:
+        (dictionary): the id and name of the addin. Empty if the asset has no addin.def.
+    '''
+    with tempfile.SpooledTemporaryFile(max_size=MEMORY_LIMIT_BYTES) as addin:
+        download_file(asset["url"], token, addin, headers={'Accept': 'application/octet-stream'})
+        with zipfile.ZipFile(addin, 'r') as zipped:
+            if "addin.def" not in zipped.namelist():
+                return {}
+            lines = zipped.read("addin.def").decode("utf-8", errors="replace").splitlines()
+    settings = dict(line.split("=", 1) for line in lines if "=" in line)
+    return {"id": settings.get("id", "").strip(), "name": settings.get("name", "").strip()}
+
+def repo_catalog(owner_repo, token, state, previous=None):
+    '''
+    finds the newest release of each addin a repo publishes. The addins are told apart by the id in their addin.def,
+    which is only downloaded once per asset. If the repo's releases are the same as in previous, previous is returned as is.
+
+    Args:
+        owner_repo (string): the owner and repo.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        state (string): "PROD" for the newest production release of each addin, "TEST" for the newest of any release.
+        previous (dictionary): what this returned for the repo last time, or None.
+
+    Returns:
+        (dictionary): the fingerprint of the releases, the entries of the catalog and the identity of each asset read.
+    '''
+    releases = list(json_pages(f"{GITHUB_API}/repos/{owner_repo}/releases", token))
+    fingerprint = hashlib.sha256(json.dumps([[release["id"], release["tag_name"], release.get("published_at"), release.get("draft"),
+                                              [[asset["id"], asset["name"], asset.get("updated_at")] for asset in release.get("assets", [])]]
+                                             for release in releases]).encode()).hexdigest()
+    if previous is not None and previous.get("fingerprint") == fingerprint and previous.get("state") == state:
+        return previous
+
+    identities = dict((previous or {}).get("identities", {}))
+    versioned = []
+    for release in releases:
+        if release.get("draft") or not release.get("published_at"):
+            continue
+        try:
+            version = version_number(release["tag_name"])
+        except ValueError:
+            print(f"Skipping {owner_repo} release {release['tag_name']}: the tag isn't a version number.")
+            continue
+        if state == "PROD" and release_state(release["tag_name"]) != "PROD":
+            continue
+        versioned.append((version, release))
+    versioned.sort(key=lambda pair: pair[0], reverse=True)
+
+    entries = {}
+    seen_names = set()
+    for version, release in versioned:
+        for asset in release.get("assets", []):
+            if not asset["name"].endswith(".jmpaddin"):
+                continue
+            # the asset name without the tag, so older releases of an addin already found aren't downloaded.
+            base_name = asset["name"][:-len(".jmpaddin")].removesuffix("_" + release["tag_name"])
+            if base_name in seen_names:
+                continue
+            seen_names.add(base_name)
+            identity = identities.get(str(asset["id"]))
+            if identity is None:
+                identity = addin_identity(asset, token)
+                identities[str(asset["id"])] = identity
+            if not identity.get("id") or identity["id"] in entries:
+                continue
+            entries[identity["id"]] = {
+                "id": identity["id"],
+                "name": identity["name"],
+                "addinVersion": version,
+                "buildDate": buildDate(release["published_at"]),
+                "state": release_state(release["tag_name"]),
+                "tag": release["tag_name"],
+                "repo": owner_repo,
+                "filename": asset["name"],
+                "url": asset.get("browser_download_url", ""),
+                }
+    return {"fingerprint": fingerprint, "state": state, "entries": entries, "identities": identities}
+
+def catalog_text(entries):
+    '''
+    builds the published addins catalog: a JSL associative array of every addin by id, laid out like customMetaData.jsl.
+
+    Args:
+        entries (list): the catalog entry (dictionary) of each addin.
+
+    Returns:
+        (string): the contents of the catalog.
+    '''
+    def jsl(value):
+        return str(value) if isinstance(value, int) else json.dumps(str(value))
+
+    lines = ['/* DO NOT EDIT THIS FILE YOURSELF AS IT IS CHANGED BY PROJECT JAAB(https://github.com/sage-darling/Project-JAAB) */', '', 'Associative Array(', '	List(']
+    items = []
+    for entry in sorted(entries, key=lambda entry: entry["id"]):
+        settings = ",\n".join(f'					List( "{key}", {jsl(entry[key])} )' for key in sorted(entry))
+        items.append(f'		List( {jsl(entry["id"])},\n			Associative Array(\n				List(\n{settings}\n				)\n			)\n		)')
+    lines.append(",\n".join(items))
+    lines += ['	)', ')']
+    return "\n".join(lines)
+
+def build_catalog(repos_text, token, catalog_path, state="PROD", workers=EXTERNAL_WORKERS):
+    '''
+    writes the published addins catalog the auto-updater reads (deployedAddinsFilename in customMetaData.jsl) for the
+    newest release of every addin in many repos. Repos are read at the same time, and the catalog is kept up to date
+    incrementally: a repo whose releases haven't changed since the last run (the release list comes back 304 from the
+    ETag cache) isn't read again, and an asset's addin.def is only ever downloaded once. The state is kept in the cache_dir.
+
+    Args:
+        repos_text (string): the catalog_repos input. See catalog_repo_list.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        catalog_path (string): the location to write the catalog to.
+        state (string): "PROD" (the default) for production releases only, "TEST" for the newest release of any kind.
+        workers (integer): the most repos read at once.
+
+    Returns:
+        entries (list): the catalog entry of each addin.
+
+    Raises:
+        Exception: one or more of the repos couldn't be read. Every failing repo is listed, and the catalog isn't written.
+
+    Example Usage:
+        >>> build_catalog("company/tool-a, company/tool-b", TOKEN, "/home/runner/work/catalog/publishedaddins.jsl")
+    '''
+    state = state.upper()
+    state_path = os.path.join(cache_dir(), "catalog", hashlib.sha256(os.path.abspath(catalog_path).encode()).hexdigest()[:16] + ".json")
+    try:
+        with open(state_path, "r") as file:
+            previous = json.load(file)
+    except (OSError, ValueError):
+        previous = {}
+
+    repos = catalog_repo_list(repos_text, token)
+    current = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {owner_repo: submit_in_context(pool, repo_catalog, owner_repo, token, state, previous.get(owner_repo)) for owner_repo in repos}
+        for owner_repo, future in futures.items():
+            try:
+                current[owner_repo] = future.result()
+            except Exception as e:
+                errors[owner_repo] = e
+    if errors:
+        details = "\n".join(f"  {owner_repo}: {type(e).__name__}: {e}" for owner_repo, e in errors.items())
+        raise Exception(f"{len(errors)} of the {len(repos)} repos in catalog_repos could not be read:\n{details}")
+
+    reread = sum(current[owner_repo] is not previous.get(owner_repo) for owner_repo in repos)
+    entries = {}
+    for owner_repo in repos:
+        for addin_id, entry in current[owner_repo]["entries"].items():
+            # an id published from two repos keeps the higher version.
+            if addin_id not in entries or entry["addinVersion"] > entries[addin_id]["addinVersion"]:
+                entries[addin_id] = entry
+    text = catalog_text(entries.values())
+
+    os.makedirs(os.path.dirname(os.path.abspath(catalog_path)), exist_ok=True)
+    try:
+        with open(catalog_path, "r") as file:
+            unchanged = file.read() == text
+    except OSError:
+        unchanged = False
+    if not unchanged:
+        # written to a temp file then renamed so the auto-updater never reads half a catalog.
+        fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(catalog_path)))
+        with os.fdopen(fd, "w") as file:
+            file.write(text)
+        try:
+            shutil.copymode(catalog_path, temp_name)
+        except OSError:
+            # mkstemp makes a file only its owner can read, but every user's JMP reads the catalog.
+            os.chmod(temp_name, 0o644)
+        os.replace(temp_name, catalog_path)
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(state_path))
+    with os.fdopen(fd, "w") as file:
+        json.dump(current, file)
+    os.replace(temp_name, state_path)
+    print(f"The catalog of {len(entries)} addins from {len(repos)} repos ({reread} read again) is {'unchanged' if unchanged else 'written'} at {catalog_path}.")
+    return list(entries.values())
+
+############################
+#   BACKFILL FUNCTIONS     #
+############################
+
+# the inputs that change what a backfill builds. A checkpoint written with other values for any of them is started over.
+BACKFILL_SETTINGS = ("owner_repo", "addin_id", "addin_name", "jmpcust_txt_file", "make_meta_file", "tag_suffix", "author", "pub_name",
+                     "final_pub_path", "external_files", "build_mode", "compression_level", "batch_manifest", "placeholders",
+                     "placeholder_files", "exclude", "reproducible", "lfs", "external_source", "upload", "backfill", "backfill_since",
+                     "backfill_until", "backfill_state")
+
+def backfill_releases(owner_repo, token, tags="*", since="", until="", state=""):
+    '''
+    lists the past releases of a repo to build again, oldest first. The release list is read page by page, and drafts
+    and releases that were never published are left out.
+
+    Args:
+        owner_repo (string): the owner and repo.
+        token (string): Github authentication token produced and recognized by github for authentication to a private repo.
+        tags (string): globs of the tags to build, separated by commas or whitespace. "*" is every release.
+        since (string): a YYYY-MM-DD date. Releases published before it are left out. "" doesn't filter.
+        until (string): a YYYY-MM-DD date. Releases published after it are left out. "" doesn't filter.
+        state (string): "PROD" or "TEST" for only that kind of release (see stateDetermination). "" is both.
+
+    Returns:
+        releases (list): the release data of each release to build.
+
+    Raises:
+        ValueError: since or until isn't a YYYY-MM-DD date, or state isn't PROD or TEST.
+
+    Example Usage:
+        >>> [release["tag_name"] for release in backfill_releases("octocat/Hello-World", TOKEN, "v1.*", since="2024-01-01", state="PROD")]
+        ['v1.0.0', 'v1.1.0', 'v1.2.0']
+    '''
+    for date in (since, until):
+        if date:
+            datetime.strptime(date, "%Y-%m-%d")
+    state = state.upper()
+    if state not in ("", "PROD", "TEST"):
+        raise ValueError(f"backfill_state is {state}, not PROD or TEST.")
+    globs = [glob for glob in re.split(r"[,\s]+", tags) if glob] or ["*"]
+
+    releases = []
+    for release in json_pages(f"{GITHUB_API}/repos/{owner_repo}/releases", token):
+        if release.get("draft") or not release.get("published_at"):
+            continue
+        published = release["published_at"][:10]
+        if not any(fnmatch.fnmatchcase(release["tag_name"], glob) for glob in globs):
+            continue
+        if (since and published < since) or (until and published > until):
+            continue
+        if state and release_state(release["tag_name"]) != state:
+            continue
+        releases.append(release)
+    releases.sort(key=lambda release: release["published_at"])
+    return releases
+
+def backfill_key(config):
+    '''
+    Returns a digest of the BACKFILL_SETTINGS of a BuildConfig, to tell whether a checkpoint was written for the same backfill.
+    '''
+    return hashlib.sha256(json.dumps({name: getattr(config, name) for name in BACKFILL_SETTINGS}, sort_keys=True).encode()).hexdigest()
+
+def read_checkpoint(path, key):
+    '''
+    reads the backfill checkpoint at path. A missing or unreadable checkpoint, or one written for other settings, is
+    started over.
 
-    os.chdir(save_location)
-    shutil.make_archive(addin_final, 'zip', OWNER_REPO.split("/")[1])
-    os.rename(addin_final + '.zip', addin_final + '.jmpaddin')
-    addinFinalName = addin_final + '.jmpaddin'
+    Args:
+        path (string): the checkpoint file.
+        key (string): the backfill_key of the backfill.
+
+    Returns:
+        checkpoint (dictionary): the key and, under "done", what was built for each finished release by release id.
+    '''
+    try:
+        with open(path, "r") as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return {"key": key, "done": {}}
+    if checkpoint.get("key") != key:
+        print(f"The backfill checkpoint {path} was written for other settings and is started over.")
+        return {"key": key, "done": {}}
+    return checkpoint
+
+def write_checkpoint(path, checkpoint):
+    '''
+    writes the backfill checkpoint to path in one step, so an interrupted backfill never leaves half a checkpoint.
+    '''
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)))
+    with os.fdopen(fd, "w") as file:
+        json.dump(checkpoint, file, indent=2, sort_keys=True)
+    os.replace(temp_name, path)
+
+############################
+#         BUILDER          #
+############################
+
+@dataclass(frozen=True)
+class BuildConfig:
+    '''
+    Everything one build needs, named after the action inputs and holding the same string values, so a build can be
+    described without environment variables. Anything left out gets the action's default.
+
+    Example Usage:
+        >>> config = BuildConfig(token=TOKEN, owner_repo="octocat/Hello-World", run_id="1", addin_id="com.company.addin",
+        ...                      addin_name="addin_name", jmpcust_txt_file="myfile.txt", output_dir="/tmp/build1")
+    '''
+    token: str
+    owner_repo: str
+    addin_id: str
+    addin_name: str
+    jmpcust_txt_file: str
+    run_id: str = ""
+    make_meta_file: str = "false"
+    tag_suffix: str = "false"
+    author: str = '""'
+    pub_name: str = ""
+    final_pub_path: str = ""
+    external_files: str = ""
+    build_mode: str = "extract"
+    compression_level: str = "auto"
+    incremental: str = "false"
+    batch_manifest: str = ""
+    # the folder the addin is built and written in. Give every build running at once its own.
+    output_dir: str = "."
+    # "" uses the CacheDir of the action. Builds can share a cache_dir.
+    cache_dir: str = ""
+    external_workers: int = 8
+    batch_workers: int = 4
+    memory_limit_mb: int = 256
+    cache_max_mb: int = 2048
+    # where to write the JSON build report (relative to output_dir). "" doesn't write one.
+    build_report: str = ""
+    # a file to append the Markdown summary of the build to, such as $GITHUB_STEP_SUMMARY. "" doesn't write one.
+    step_summary: str = ""
+    # "true" adds cProfile and tracemalloc results to the build report.
+    profile: str = "false"
+    # the longest, in seconds, a request waits for Github's rate limit to reset before the build fails instead.
+    rate_limit_wait: int = 900
+    # owner/repo names (or owner/*) to write the published addins catalog for instead of building an addin.
+    catalog_repos: str = ""
+    # "PROD" catalogs production releases only, "TEST" the newest release of any kind.
+    catalog_state: str = "PROD"
+    # extra placeholders to fill in, a PLACEHOLDER=value per line (see release_placeholders).
+    placeholders: str = ""
+    # globs of the members the placeholders are filled in to. "" fills them in to addin.jmpcust only.
+    placeholder_files: str = ""
+    # more .jaabignore lines: files of the repo to leave out of the addin.
+    exclude: str = ""
+    # "true" gives the same addin bytes for the same release in every build_mode and writes a manifest next to it (see addin_manifest).
+    reproducible: str = "false"
+    # "true" replaces Git LFS pointer files in the release with their objects, "false" packages the pointers as they are.
+    lfs: str = "true"
+    # "true" checks the build and prints what it would do (see build_plan) instead of building.
+    plan: str = "false"
+    # a git checkout of the release to package instead of downloading the zipball. "" always downloads.
+    source_dir: str = ""
+    # where external files come from unless their .ini entry names a source: github, mirror:<folder> or dir:<folder>.
+    external_source: str = "github"
+    # "false" leaves the addin in output_dir instead of uploading it to the release.
+    upload: str = "true"
+    # globs of the tags of past releases to build again (see backfill_releases) instead of building run_id. "" is off.
+    backfill: str = ""
+    # YYYY-MM-DD dates the backfilled releases were published from and until. "" doesn't filter.
+    backfill_since: str = ""
+    backfill_until: str = ""
+    # "PROD" or "TEST" backfills only that kind of release. "" is both.
+    backfill_state: str = ""
+    backfill_workers: int = 4
+    # the file (relative to output_dir) the releases a backfill has finished are kept in, so it can be resumed.
+    backfill_checkpoint: str = "backfill-checkpoint.json"
+
+    # the environment variable action.yml sets for each input.
+    ENVIRONMENT = {
+        "token": "Token", "owner_repo": "OwnerRepo", "run_id": "RunID", "make_meta_file": "MakeMetaFile", "pub_name": "PubName",
+        "final_pub_path": "PubPath", "addin_id": "AddinID", "addin_name": "AddinName", "author": "Author",
+        "external_files": "ExternalFiles", "tag_suffix": "TagSuffix", "jmpcust_txt_file": "JmpCust", "build_mode": "BuildMode",
+        "compression_level": "CompressionLevel", "incremental": "Incremental", "batch_manifest": "BatchManifest",
+        "cache_dir": "CacheDir", "external_workers": "ExternalWorkers", "batch_workers": "BatchWorkers",
+        "memory_limit_mb": "MemoryLimitMB", "cache_max_mb": "CacheMaxMB", "build_report": "BuildReport",
+        "step_summary": "GITHUB_STEP_SUMMARY", "profile": "Profile", "rate_limit_wait": "RateLimitWait",
+        "catalog_repos": "CatalogRepos", "catalog_state": "CatalogState", "placeholders": "Placeholders",
+        "placeholder_files": "PlaceholderFiles", "exclude": "Exclude",
+        "source_dir": "SourceDir", "external_source": "ExternalSource", "plan": "Plan",
+        "reproducible": "Reproducible", "lfs": "Lfs", "upload": "Upload", "backfill": "Backfill",
+        "backfill_since": "BackfillSince", "backfill_until": "BackfillUntil", "backfill_state": "BackfillState",
+        "backfill_workers": "BackfillWorkers", "backfill_checkpoint": "BackfillCheckpoint",
+        }
+
+    @classmethod
+    def from_environ(cls, environ=None, output_dir=None):
+        '''
+        reads the config the action passes in environment variables. The build is written in the working directory.
+
+        Args:
+            environ (dictionary): the environment variables. Defaults to os.environ.
+            output_dir (string): the folder to build in. Defaults to the working directory.
+
+        Returns:
+            (BuildConfig): the config.
+
+        Raises:
+            KeyError: a required input isn't set.
+        '''
+        environ = os.environ if environ is None else environ
+        values = {}
+        for setting in fields(cls):
+            name = cls.ENVIRONMENT.get(setting.name)
+            if name is None:
+                continue
+            if setting.name in ("token", "owner_repo", "run_id", "make_meta_file", "pub_name", "final_pub_path", "addin_id",
+                                "addin_name", "author", "external_files", "tag_suffix", "jmpcust_txt_file"):
+                values[setting.name] = environ[name]
+            elif environ.get(name):
+                values[setting.name] = setting.type(environ[name])
+        return cls(output_dir=output_dir or os.getcwd(), **values)
+
+class Builder:
+    '''
+    Builds and uploads the addin (or addins) of a BuildConfig. Nothing is read from the environment or the working
+    directory and nothing module-wide is changed, so any number of Builders can run at once on different threads. Each
+    one uses its own GithubClient and ExternalsCache unless it is handed ones to share. Where the time, requests and bytes
+    of the build went is kept in report, a BuildReport.
+
+    Args:
+        config (BuildConfig): the build.
+        client (GithubClient): the client for every request of the build. Defaults to a new one on the config's cache_dir.
+        cache (ExternalsCache): the external file cache. Defaults to a new one in the config's cache_dir.
+        lfs_cache (ExternalsCache): the Git LFS object cache. Defaults to a new one in the config's cache_dir.
+        release (dictionary): the release data, if it has already been read. Defaults to the release_data of the config.
+
+    Example Usage:
+        >>> client = GithubClient()
+        >>> with ThreadPoolExecutor() as pool:
+        ...     built = list(pool.map(lambda config: Builder(config, client).run(), configs))
+    '''
+    def __init__(self, config, client=None, cache=None, lfs_cache=None, release=None):
+        self.config = config
+        self.cache_dir = config.cache_dir or CACHE_DIR
+        self.client = client or GithubClient(cache_dir=self.cache_dir, rate_limit_wait=config.rate_limit_wait)
+        self.cache = cache or ExternalsCache(os.path.join(self.cache_dir, "externals"), config.cache_max_mb * 1024 * 1024)
+        self.lfs_cache = lfs_cache or ExternalsCache(os.path.join(self.cache_dir, "lfs"), config.cache_max_mb * 1024 * 1024)
+        self.release = release
+        # the commit of each (owner/repo, tag) looked up by local_release_commit.
+        self.tag_commits = {}
+        self.report = BuildReport()
+
+    def run(self):
+        '''
+        builds the addin (or every addin of the batch_manifest) and uploads it to the release, then writes the build
+        report and summary if the config asks for them (for a failed build too).
+
+        Returns:
+            built (dictionary): the location of each finished addin by filename. None for the memory build_mode, which
+                never writes the addin to disk.
+        '''
+        context = _current_builder.set(self)
+        built = {}
+        error = None
+        try:
+            if self.config.profile.lower() == "true":
+                with profiled(self.report):
+                    built = self._build()
+            else:
+                built = self._build()
+            return built
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_builder.reset(context)
+            self.report.finish(owner_repo=self.config.owner_repo, build_mode=self.config.build_mode, addins=list(built), error=error,
+                               scheduler=self.client.scheduler.metrics())
+            self.write_report()
+
+    def write_report(self):
+        '''
+        writes the JSON build report to build_report and appends the Markdown summary to step_summary, where set.
+        '''
+        if self.config.build_report:
+            location = os.path.join(os.path.abspath(self.config.output_dir), self.config.build_report)
+            os.makedirs(os.path.dirname(location), exist_ok=True)
+            with open(location, "w") as file:
+                json.dump(self.report.as_dict(), file, indent=2)
+            print(f"The build report is written to {location}.")
+        if self.config.step_summary:
+            with open(self.config.step_summary, "a") as file:
+                file.write(self.report.markdown())
 
-    print(f"addin build is complete for {addinFinalName}")
+    def write_manifest(self, addin_name, addin, tag_name, save_location=None):
+        '''
+        works out the addin_manifest of a finished addin, adds its digest to the build report and writes it next to the
+        addin as <addin>.manifest.json (unless save_location is None, as for the memory build_mode).
+        '''
+        manifest = addin_manifest(addin, addin_name, tag_name)
+        self.report.details.setdefault("manifests", {})[addin_name] = manifest["digest"]
+        print(f"{addin_name} has {len(manifest['members'])} members with the digest {manifest['digest']}.")
+        if save_location is not None:
+            with open(os.path.join(save_location, addin_name + ".manifest.json"), "w") as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
+        return manifest
 
-    # upload the final addin to Github.
-    uploadAsset(addinFinalName, data, save_location, TOKEN)
+    def backfill(self, save_location):
+        '''
+        builds the addins of every past release backfill_releases picks out, backfill_workers releases at a time. Each
+        release is built by its own Builder in its own folder of save_location (named after the tag), all of them sharing
+        this Builder's client and caches, and is uploaded to its release unless upload is "false". Each finished release
+        is written to the backfill_checkpoint straight away, so a backfill that is stopped part way picks up where it
+        left off when it is run again with the same settings. Releases that fail are not checkpointed and are tried
+        again next time.
+
+        Args:
+            save_location (string): the folder to build in.
+
+        Returns:
+            built (dictionary): the location of each finished addin by tag/filename.
+
+        Raises:
+            Exception: one or more releases failed to build. Every failing release is listed, after the others are done.
+        '''
+        config = self.config
+        with stage("release"):
+            releases = backfill_releases(config.owner_repo, config.token, config.backfill, config.backfill_since,
+                                         config.backfill_until, config.backfill_state)
+        checkpoint_path = os.path.join(save_location, config.backfill_checkpoint)
+        checkpoint = read_checkpoint(checkpoint_path, backfill_key(config))
+        pending = [release for release in releases if str(release["id"]) not in checkpoint["done"]]
+        print(f"{len(releases)} releases of {config.owner_repo} match the backfill, {len(releases) - len(pending)} of them already built.")
+        # the builds of the releases report on their own, so only this backfill's report and summary are written.
+        release_config = replace(config, backfill="", build_report="", step_summary="", profile="false")
+
+        def build_release(release):
+            folder = os.path.join(save_location, re.sub(r"[^\w.-]", "_", release["tag_name"]))
+            builder = Builder(replace(release_config, run_id=str(release["id"]), output_dir=folder), self.client, self.cache,
+                              self.lfs_cache, release)
+            started = time.time()
+            return builder.run(), round(time.time() - started, 3)
+
+        built = {}
+        errors = {}
+        with stage("backfill"), ThreadPoolExecutor(max_workers=config.backfill_workers) as pool:
+            futures = {submit_in_context(pool, build_release, release): release for release in pending}
+            try:
+                for future in as_completed(futures):
+                    release = futures[future]
+                    try:
+                        addins, seconds = future.result()
+                    except Exception as e:
+                        errors[release["tag_name"]] = e
+                        continue
+                    built.update({f"{release['tag_name']}/{name}": path for name, path in addins.items()})
+                    if config.plan.lower() != "true":
+                        checkpoint["done"][str(release["id"])] = {"tag": release["tag_name"], "addins": sorted(addins), "seconds": seconds}
+                        write_checkpoint(checkpoint_path, checkpoint)
+            except BaseException:
+                # stopped part way: don't start the releases that are still waiting. The checkpoint has the finished ones.
+                for future in futures:
+                    future.cancel()
+                raise
+        self.report.details["backfill"] = {"releases": len(releases), "checkpointed": len(releases) - len(pending),
+                                           "built": len(pending) - len(errors), "failed": {tag: f"{type(e).__name__}: {e}" for tag, e in errors.items()}}
+        if errors:
+            details = "\n".join(f"  {tag}: {type(e).__name__}: {e}" for tag, e in errors.items())
+            raise Exception(f"{len(errors)} of the {len(pending)} releases backfilled could not be built:\n{details}")
+        print(f"The backfill built {len(pending)} releases. The checkpoint is at {checkpoint_path}.")
+        return built
+
+    def _build(self):
+        config = self.config
+        save_location = os.path.abspath(config.output_dir)
+        os.makedirs(save_location, exist_ok=True)
+        token = config.token
+        build_mode = config.build_mode.lower()
+        incremental = config.incremental.lower()
+        reproducible = config.reproducible.lower() == "true"
+        lfs = config.lfs.lower() == "true"
+
+        if config.catalog_repos != "":
+            # write the published addins catalog of many repos rather than build an addin.
+            catalog_path = os.path.join(save_location, config.pub_name or "publishedaddins.jsl")
+            with stage("catalog"):
+                build_catalog(config.catalog_repos, token, catalog_path, config.catalog_state, config.external_workers)
+            return {os.path.basename(catalog_path): catalog_path}
+
+        if config.backfill != "":
+            # build the addins of many past releases again rather than the one of run_id.
+            return self.backfill(save_location)
+
+        with stage("release"):
+            data = self.release if self.release is not None else release_data(config.owner_repo, token, config.run_id)
+        upload = config.upload.lower() != "false"
+        ver_num, jmp_date, deployment_stage = needed_variables(data)
+        # repos listed for the .ini, shared by the preflight of a plan and every step of the build.
+        listings = {}
+
+        if config.batch_manifest != "":
+            # build every addin listed in the manifest from one download of the release and its externals.
+            defaults = {
+                "addin_id": config.addin_id, "addin_name": config.addin_name, "jmpcust_txt_file": config.jmpcust_txt_file,
+                "make_meta_file": config.make_meta_file, "tag_suffix": config.tag_suffix, "author": config.author,
+                "pub_name": config.pub_name, "final_pub_path": config.final_pub_path, "external_files": config.external_files,
+                "compression_level": config.compression_level, "placeholders": config.placeholders,
+                "placeholder_files": config.placeholder_files,
+                }
+            with stage("preflight"):
+                manifest = workflow_text(data, token, config.batch_manifest,
+                                         local_release_commit(data, token, config.source_dir) if config.source_dir else None, config.source_dir)
+                if manifest is None:
+                    raise KeyError(f".github/workflows/{config.batch_manifest} is not in {data['tag_name']}.")
+                targets = batch_targets(manifest, defaults)
+                workflow_files = sorted({target["jmpcust_txt_file"] for target in targets.values()})
+                ini_files = sorted({target["external_files"] for target in targets.values()} - {""})
+                if config.plan.lower() == "true":
+                    externals, release_listing = preflight(data, token, workflow_files, ini_files, config.external_workers, listings)
+                else:
+                    quick_preflight(data, token, workflow_files, ini_files, config.source_dir)
+            if config.plan.lower() == "true":
+                addins = {}
+                for target in targets.values():
+                    generated_text = generated_files(ver_num, jmp_date, deployment_stage, target["make_meta_file"], target["author"],
+                                                     target["addin_id"], target["addin_name"], target["pub_name"], target["final_pub_path"])
+                    addins[addin_filename(target["addin_name"], data["tag_name"], deployment_stage, target["tag_suffix"])] = {
+                        "generated": list(generated_text) + ["addin.jmpcust"], "externals": externals.get(target["external_files"], [])}
+                build_plan(data, token, addins, release_listing, config.exclude, config.source_dir)
+                return {}
+            built = batch_build(data, token, save_location, config.batch_manifest, defaults, config.batch_workers, config.exclude,
+                                config.source_dir, listings, reproducible, lfs)
+            if reproducible:
+                for addinFinalName in built.values():
+                    self.write_manifest(addinFinalName, os.path.join(save_location, addinFinalName), data["tag_name"], save_location)
+            if upload:
+                with stage("upload"), ThreadPoolExecutor(max_workers=config.batch_workers) as pool:
+                    uploads = {addinFinalName: submit_in_context(pool, uploadAsset, addinFinalName, data, save_location, token) for addinFinalName in built.values()}
+                for addinFinalName, future in uploads.items():
+                    future.result()
+                    print(f"{addinFinalName} is uploaded to Git.")
+            return {addinFinalName: os.path.join(save_location, addinFinalName) for addinFinalName in built.values()}
+
+        # the name of the final addin
+        addinFinalName = addin_filename(config.addin_name, data["tag_name"], deployment_stage, config.tag_suffix)
+        addin_path = os.path.join(save_location, addinFinalName)
+
+        # fast compression for TEST builds and the smallest addin for PROD unless the compression_level input says otherwise.
+        level = compression_level(config.compression_level, deployment_stage)
+        release_date_time = release_time(data["published_at"])
+        generated_text = generated_files(ver_num, jmp_date, deployment_stage, config.make_meta_file, config.author, config.addin_id,
+                                         config.addin_name, config.pub_name, config.final_pub_path)
+        # filled in to addin.jmpcust and, as they are written into the addin, the members placeholder_files picks out.
+        placeholders = release_placeholders(data["tag_name"], ver_num, jmp_date, deployment_stage, config.addin_id, config.addin_name,
+                                            config.author, config.placeholders, config.placeholder_files)
+
+        # check the jmpcust template and every entry of the .ini before anything large is downloaded. A plan looks up every file too.
+        with stage("preflight"):
+            ini_files = [config.external_files] if config.external_files != "" else []
+            if config.plan.lower() == "true":
+                externals, release_listing = preflight(data, token, [config.jmpcust_txt_file], ini_files, config.external_workers, listings)
+            else:
+                quick_preflight(data, token, [config.jmpcust_txt_file], ini_files, config.source_dir)
+        if config.plan.lower() == "true":
+            build_plan(data, token, {addinFinalName: {"generated": list(generated_text) + ["addin.jmpcust"],
+                                                      "externals": externals.get(config.external_files, [])}},
+                       release_listing, config.exclude, config.source_dir)
+            return {}
+
+        if build_mode == "memory":
+            # build the addin in memory and upload it from there. Nothing is written to the workspace.
+            with memory_build(data, token, generated_text, config.jmpcust_txt_file, config.addin_id, config.external_files, level,
+                              config.memory_limit_mb * 1024 * 1024, config.external_workers, placeholders, config.exclude,
+                              config.source_dir, listings, reproducible, lfs) as addin:
+                print(f"addin build is complete for {addinFinalName}")
+                if reproducible:
+                    self.write_manifest(addinFinalName, addin, data["tag_name"], save_location if not upload else None)
+                if not upload:
+                    # nowhere to upload it to, so the addin is written out after all.
+                    addin.seek(0)
+                    with open(addin_path, "wb") as file:
+                        shutil.copyfileobj(addin, file)
+                    return {addinFinalName: addin_path}
+                with stage("upload"):
+                    uploadAsset(addinFinalName, data, None, token, addin_file=addin)
+            print(f"{addinFinalName} is uploaded to Git.")
+            return {addinFinalName: None}
+        elif build_mode == "stream":
+            # transcode the release zipball straight into the addin.
+            stream_build(data, token, save_location, addinFinalName, generated_text, config.jmpcust_txt_file, config.addin_id,
+                         config.external_files, level, placeholders, config.exclude, config.source_dir, listings, reproducible, lfs)
+        else:
+            with stage("download"):
+                zip_location = write_release_output(data, token, save_location, config.exclude, config.source_dir, lfs)
+
+            # write the Custom Meta Data (if applicable), Addin.def and JMP.cust files to the addin location.
+            with stage("generate"):
+                if config.make_meta_file.lower() == "true":
+                    CustomMeta(zip_location, jmp_date, deployment_stage, ver_num, config.author, config.addin_id, config.addin_name,
+                               config.pub_name, config.final_pub_path)
+
+                AddinDef(zip_location, ver_num, config.addin_id, config.addin_name)
+                JMPCust(zip_location, data["tag_name"], config.addin_id, config.jmpcust_txt_file, placeholders)
+
+            if config.external_files != "":
+                print("a .ini file is referenced for include files")
+                external_files_dict = config_parse(zip_location, config.external_files)
+            else:
+                external_files_dict = {}
+
+            # delete the .github files as they are no longer needed for the build.
+            shutil.rmtree(os.path.join(zip_location, '.github'))
+
+            # write the library files
+            if len(external_files_dict) != 0:
+                print("Library files are detected in the config.ini and will be included")
+                with stage("externals"):
+                    pack_up_externals(external_files_dict, zip_location, token, config.external_workers, listings)
+
+            # zip up the addin files to create the addin, reusing what didn't change from the last build if asked to.
+            with stage("archive"):
+                previous = previous_addin(config.owner_repo, token, config.run_id, config.addin_name) if incremental == "true" else None
+                write_archive(zip_location, addin_path, level, date_time=release_date_time, previous=previous, placeholders=placeholders)
+                if incremental == "true":
+                    remember_addin(config.owner_repo, config.addin_name, addin_path)
+
+        print(f"addin build is complete for {addinFinalName}")
+        if reproducible:
+            # write_archive already gives the same bytes for the same files, so only the manifest is needed.
+            self.write_manifest(addinFinalName, addin_path, data["tag_name"], save_location)
+        if not upload:
+            return {addinFinalName: addin_path}
+
+        # upload the final addin to Github.
+        with stage("upload"):
+            uploadAsset(addinFinalName, data, save_location, token)
+
+        print(f"{addinFinalName} is uploaded to Git.")
+        return {addinFinalName: addin_path}
+
+############################
+#           MAIN           #
+############################
 
-    print(f"{addinFinalName} is uploaded to Git.")
+def main(argv=None):
+    # the action passes its inputs in environmental variables from git and builds in the working directory.
+    parser = argparse.ArgumentParser(description="Builds the JMP addin of a Github release and uploads it to the release.")
+    parser.add_argument("--plan", action="store_true", help="check the build and print what it would do without building.")
+    arguments = parser.parse_args(argv)
+    config = BuildConfig.from_environ()
+    if arguments.plan:
+        config = replace(config, plan="true")
+    Builder(config).run()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,412 @@
+'''
+Project JAAB: Just Another Addin Builder
+
+A local stand-in for the parts of the Github API (and raw.githubusercontent.com) that AddinBuilder.py uses, for
+benchmarking builds without touching Github. Serves releases, release assets and uploads, zipballs, contents, git trees
+and raw downloads from repos held in memory, with a configurable latency per request and bandwidth per connection.
+
+Point the builder at it with GITHUB_API_URL=<server.url>. Raw downloads are served from <server.url>/raw, and the Git LFS
+batch API from <server.url>/<owner>/<repo>.git/info/lfs with the objects under <server.url>/lfs.
+'''
+
+############################
+#      IMPORT MODULES      #
+############################
+
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, quote, unquote, urlsplit
+
+############################
+#      SYNTHETIC REPOS     #
+############################
+
+# the jmpcust template every synthetic app repo has in .github/workflows.
+JMPCUST_TEMPLATE = '<?xml version="1.0" encoding="UTF-8"?>\n<jm:menu_and_toolbar_customizations>\n  <jm:insert_in_main_menu>\n    <jm:menu><jm:name>TOOLTAG</jm:name><jm:command><jm:run>$ADDIN_HOME(AdDinIDDoNotTouCHY)\\main.jsl</jm:run></jm:command></jm:menu>\n  </jm:insert_in_main_menu>\n</jm:menu_and_toolbar_customizations>\n'
+
+class FakeRepo:
+    '''
+    One repository on the fake server: its files (path to bytes), its releases and the assets uploaded to them.
+
+    Args:
+        owner (string): the repo owner.
+        name (string): the repo name.
+        files (dictionary): the path and contents (bytes) of every file at the tag.
+        tag (string): the tag of the one release.
+        release_id (integer): the id of the one release.
+        published (string): when the release was published, in Github's format.
+    '''
+    def __init__(self, owner, name, files, tag="v1.0.0", release_id=1, published="2024-01-02T03:04:05Z"):
+        self.owner = owner
+        self.name = name
+        self.files = files
+        self.tag = tag
+        self.commit = hashlib.sha1(f"{owner}/{name}@{tag}".encode()).hexdigest()
+        self.releases = [{"id": release_id, "tag_name": tag, "name": tag, "published_at": published, "prerelease": False,
+                          "draft": False, "target_commitish": "main", "assets": []}]
+        self.assets = {}
+        self.lfs_objects = {}
+        # the most entries the git trees API sends before answering with truncated set, like Github for a huge repo. None is no limit.
+        self.tree_limit = None
+        self._zipball = None
+
+    def add_lfs(self, path, contents):
+        '''
+        Adds a file tracked with Git LFS: the repo (and its zipball) holds a pointer and the LFS server the contents.
+        '''
+        oid = hashlib.sha256(contents).hexdigest()
+        self.lfs_objects[oid] = contents
+        self.files[path] = f"version https://git-lfs.github.com/spec/v1\noid sha256:{oid}\nsize {len(contents)}\n".encode()
+        self._zipball = None
+
+    def zipball(self):
+        # built once; github puts every file under <owner>-<repo>-<short sha>/.
+        if self._zipball is None:
+            buffer = io.BytesIO()
+            root = f"{self.owner}-{self.name}-{self.commit[:7]}/"
+            with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=6) as zipped:
+                zipped.writestr(root, b"")
+                for path, contents in sorted(self.files.items()):
+                    zipped.writestr(root + path, contents)
+            self._zipball = buffer.getvalue()
+        return self._zipball
+
+def blob_sha(contents):
+    '''
+    Returns the git blob SHA of the contents, as the trees and contents endpoints give it.
+    '''
+    return hashlib.sha1(b"blob %d\0" % len(contents) + contents).hexdigest()
+
+def synthetic_file(generator, path, size):
+    '''
+    Returns size bytes for a file: JSL-like text for .jsl files (compresses well) and random bytes for anything else.
+    '''
+    if path.endswith(".jsl"):
+        words = [b"Names Default To Here( 1 );", b"dt = Current Data Table();", b"For( i = 1, i <= N Rows( dt ), i++,",
+                 b"Show( i );", b");", b"New Window( \"Report\", Text Box( \"Hello\" ) );", b"// a comment"]
+        text = bytearray()
+        while len(text) < size:
+            text += generator.choice(words) + b"\n"
+        return bytes(text[:size])
+    return generator.randbytes(size)
+
+def synthetic_repos(files=100, total_bytes=1024*1024, externals=5, external_repos=1, seed=0, owner="bench", name="app"):
+    '''
+    generates an app repo to build an addin from and the repos its external files come from.
+
+    Args:
+        files (integer): the number of files in the app repo (besides the two in .github/workflows).
+        total_bytes (integer): about how many bytes those files add up to. A fifth of the files are binary.
+        externals (integer): the number of entries in the app's config.ini.
+        external_repos (integer): the number of distinct repos the entries are spread across.
+        seed (integer): the seed for the file contents, so the same arguments give the same repos.
+        owner (string): the owner of every generated repo.
+        name (string): the name of the app repo. The external repos are named <name>-lib<n>.
+
+    Returns:
+        app (FakeRepo): the app repo, with .github/workflows/menu.txt and .github/workflows/config.ini.
+        libraries (list): the FakeRepos the externals come from.
+
+    Example Usage:
+        >>> app, libraries = synthetic_repos(files=500, total_bytes=50*1024*1024, externals=20, external_repos=4)
+    '''
+    generator = random.Random(seed)
+    app_files = {}
+    for number in range(files):
+        folder = f"folder{number % 10}/" if number % 3 else ""
+        extension = ".png" if number % 5 == 4 else ".jsl"
+        path = f"{folder}file{number}{extension}"
+        app_files[path] = synthetic_file(generator, path, max(1, total_bytes // max(files, 1)))
+
+    libraries = []
+    lines = ["[external_files]"]
+    for number in range(external_repos):
+        libraries.append(FakeRepo(owner, f"{name}-lib{number}", {}, tag="v1.0.0", release_id=1000 + number))
+    for number in range(externals):
+        library = libraries[number % len(libraries)]
+        path = f"src/util{number}.jsl"
+        library.files[path] = synthetic_file(generator, path, 2048 + number * 64)
+        lines.append(f"{number + 1} = {owner}, {library.name}, {path}, util{number}.jsl, libs, {library.tag}")
+
+    app_files[".github/workflows/menu.txt"] = JMPCUST_TEMPLATE.encode()
+    if externals:
+        app_files[".github/workflows/config.ini"] = ("\n".join(lines) + "\n").encode()
+    app = FakeRepo(owner, name, app_files, tag="v1.0.0", release_id=seed + 1)
+    return app, libraries
+
+############################
+#        FAKE SERVER       #
+############################
+
+class FakeGithub:
+    '''
+    The fake Github API server. It runs on its own threads from start() until stop().
+
+    Args:
+        repos (list): the FakeRepos to serve. More can be added with add().
+        latency (float): seconds added before every response.
+        bandwidth (integer): bytes per second each connection sends and receives bodies at. None or 0 is unlimited.
+        rate_limit (integer): the API requests allowed per rate_limit_window. Past it requests are refused with a 403, like Github.
+        rate_limit_window (integer): the seconds until the rate limit resets. Raw downloads don't count.
+
+    Example Usage:
+        >>> server = FakeGithub([app] + libraries, latency=0.05, bandwidth=10*1024*1024).start()
+        >>> os.environ["GITHUB_API_URL"] = server.url
+    '''
+    def __init__(self, repos=(), latency=0.0, bandwidth=None, rate_limit=5000, rate_limit_window=3600):
+        self.repos = {}
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+        self.requests = 0
+        # the method and path (with the query) of every request, in the order they came in.
+        self.log = []
+        self.refused = 0
+        self.used = 0
+        self.reset = time.time() + rate_limit_window
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        for repo in repos:
+            self.add(repo)
+
+    def add(self, repo):
+        '''
+        Serves another repo, filling in the URLs of its releases.
+        '''
+        prefix = f"{self.url}/repos/{repo.owner}/{repo.name}"
+        for release in repo.releases:
+            release["url"] = f"{prefix}/releases/{release['id']}"
+            release["zipball_url"] = f"{prefix}/zipball/{release['tag_name']}"
+            release["assets_url"] = f"{prefix}/releases/{release['id']}/assets"
+            release["upload_url"] = f"{self.url}/uploads/repos/{repo.owner}/{repo.name}/releases/{release['id']}/assets{{?name,label}}"
+        self.repos[f"{repo.owner}/{repo.name}"] = repo
+        return repo
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                fake.handle(self, "GET")
+
+            def do_POST(self):
+                fake.handle(self, "POST")
+
+            def do_PATCH(self):
+                fake.handle(self, "PATCH")
+
+            def do_DELETE(self):
+                fake.handle(self, "DELETE")
+
+        return Handler
+
+    def _throttle(self, size, started):
+        # sleeps until size bytes would have taken at the bandwidth since started.
+        if self.bandwidth:
+            wait = size / self.bandwidth - (time.perf_counter() - started)
+            if wait > 0:
+                time.sleep(wait)
+
+    def _read_body(self, handler):
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = bytearray()
+        started = time.perf_counter()
+        while len(body) < length:
+            chunk = handler.rfile.read(min(64*1024, length - len(body)))
+            if not chunk:
+                break
+            body += chunk
+            self._throttle(len(body), started)
+        return bytes(body)
+
+    def _send(self, handler, status, body=b"", content_type="application/json", headers=None):
+        if not isinstance(body, (bytes, bytearray)):
+            body = json.dumps(body).encode()
+        with self._lock:
+            self.requests += 1
+            remaining = max(self.rate_limit - self.used, 0)
+            reset = self.reset
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        if not handler.path.startswith(("/raw/", "/lfs/")):
+            handler.send_header("X-RateLimit-Limit", str(self.rate_limit))
+            handler.send_header("X-RateLimit-Remaining", str(remaining))
+            handler.send_header("X-RateLimit-Used", str(self.rate_limit - remaining))
+            handler.send_header("X-RateLimit-Reset", str(int(reset) + 1))
+            handler.send_header("X-RateLimit-Resource", "core")
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        if handler.command == "HEAD":
+            return
+        started = time.perf_counter()
+        for start in range(0, len(body), 64*1024):
+            handler.wfile.write(body[start:start + 64*1024])
+            self._throttle(start + 64*1024, started)
+
+    def _send_json(self, handler, body):
+        # answers with an ETag, and a 304 when the client already has it.
+        text = json.dumps(body).encode()
+        etag = '"' + hashlib.sha1(text).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            return self._send(handler, 304, b"", headers={"ETag": etag})
+        return self._send(handler, 200, text, headers={"ETag": etag})
+
+    def _send_range(self, handler, contents, content_type):
+        match = re.match(r"bytes=(\d+)-$", handler.headers.get("Range") or "")
+        if match and int(match.group(1)) < len(contents):
+            start = int(match.group(1))
+            return self._send(handler, 206, contents[start:], content_type,
+                              {"Content-Range": f"bytes {start}-{len(contents) - 1}/{len(contents)}"})
+        return self._send(handler, 200, contents, content_type)
+
+    def handle(self, handler, method):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.log.append((method, handler.path))
+        url = urlsplit(handler.path)
+        query = dict(parse_qsl(url.query))
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        body = self._read_body(handler) if method in ("POST", "PATCH") else b""
+        if parts[0] not in ("raw", "lfs"):
+            with self._lock:
+                if time.time() >= self.reset:
+                    self.used = 0
+                    self.reset = time.time() + self.rate_limit_window
+                spent = self.used >= self.rate_limit
+                self.used += not spent
+                self.refused += spent
+            if spent:
+                return self._send(handler, 403, {"message": "API rate limit exceeded for user."})
+        try:
+            return self._route(handler, method, parts, query, body)
+        except (KeyError, StopIteration, IndexError):
+            return self._send(handler, 404, {"message": "Not Found"})
+
+    def _route(self, handler, method, parts, query, body):
+        if parts[0] == "raw":
+            repo = self.repos[f"{parts[1]}/{parts[2]}"]
+            return self._send_range(handler, repo.files["/".join(parts[4:])], "application/octet-stream")
+
+        if parts[0] == "lfs":
+            repo = self.repos[f"{parts[1]}/{parts[2]}"]
+            return self._send_range(handler, repo.lfs_objects[parts[3]], "application/octet-stream")
+
+        if len(parts) == 6 and parts[1].endswith(".git") and parts[2:] == ["info", "lfs", "objects", "batch"]:
+            repo = self.repos[f"{parts[0]}/{parts[1][:-4]}"]
+            objects = []
+            for item in json.loads(body)["objects"]:
+                if item["oid"] in repo.lfs_objects:
+                    href = f"{self.url}/lfs/{repo.owner}/{repo.name}/{item['oid']}"
+                    objects.append({**item, "actions": {"download": {"href": href, "header": {"X-Lfs-Fake": "1"}}}})
+                else:
+                    objects.append({**item, "error": {"code": 404, "message": "Object does not exist"}})
+            return self._send(handler, 200, {"transfer": "basic", "objects": objects}, "application/vnd.git-lfs+json")
+
+        if parts[0] == "uploads":
+            repo = self.repos[f"{parts[2]}/{parts[3]}"]
+            release = next(release for release in repo.releases if str(release["id"]) == parts[5])
+            name = query["name"]
+            if any(asset["name"] == name for asset in release["assets"]):
+                return self._send(handler, 422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+            asset = {"id": len(repo.assets) + 1, "name": name, "size": len(body), "state": "uploaded",
+                     "digest": "sha256:" + hashlib.sha256(body).hexdigest(),
+                     "url": f"{self.url}/repos/{repo.owner}/{repo.name}/releases/assets/{quote(name)}"}
+            repo.assets[name] = body
+            release["assets"].append(asset)
+            return self._send(handler, 201, asset)
+
+        repo = self.repos[f"{parts[1]}/{parts[2]}"]
+        rest = parts[3:]
+        if rest[0] == "releases" and len(rest) == 1:
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            return self._send_json(handler, repo.releases[(page - 1) * per_page:page * per_page])
+        if rest[0] == "releases" and rest[1] == "assets":
+            release = next(release for release in repo.releases if any(asset["name"] == rest[2] for asset in release["assets"]))
+            asset = next(asset for asset in release["assets"] if asset["name"] == rest[2])
+            if method == "DELETE":
+                release["assets"].remove(asset)
+                del repo.assets[asset["name"]]
+                return self._send(handler, 204)
+            if method == "PATCH":
+                new_name = json.loads(body)["name"]
+                repo.assets[new_name] = repo.assets.pop(asset["name"])
+                asset["name"] = new_name
+                asset["url"] = f"{self.url}/repos/{repo.owner}/{repo.name}/releases/assets/{quote(new_name)}"
+                return self._send(handler, 200, asset)
+            return self._send(handler, 200, repo.assets[asset["name"]], "application/octet-stream")
+        if rest[0] == "releases" and len(rest) == 3 and rest[2] == "assets":
+            release = next(release for release in repo.releases if str(release["id"]) == rest[1])
+            per_page = int(query.get("per_page", 30))
+            page = int(query.get("page", 1))
+            return self._send_json(handler, release["assets"][(page - 1) * per_page:page * per_page])
+        if rest[0] == "releases" and rest[1] == "latest":
+            return self._send_json(handler, repo.releases[0])
+        if rest[0] == "releases":
+            return self._send_json(handler, next(release for release in repo.releases if str(release["id"]) == rest[1]))
+        if rest[0] == "commits":
+            return self._send_json(handler, {"sha": repo.commit})
+        if rest[0] == "zipball":
+            return self._send_range(handler, repo.zipball(), "application/zip")
+        if rest[0] == "git" and rest[1:3] == ["ref", "tags"]:
+            tag = "/".join(rest[3:])
+            if tag != repo.tag and not any(release["tag_name"] == tag for release in repo.releases):
+                raise KeyError(tag)
+            return self._send_json(handler, {"ref": f"refs/tags/{tag}", "object": {"type": "commit", "sha": repo.commit}})
+        if rest[0] == "git" and rest[1] == "trees":
+            tree = []
+            folders = set()
+            for path, contents in sorted(repo.files.items()):
+                segments = path.split("/")
+                folders.update("/".join(segments[:end]) for end in range(1, len(segments)))
+                tree.append({"path": path, "mode": "100644", "type": "blob", "sha": blob_sha(contents), "size": len(contents)})
+            tree += [{"path": folder, "mode": "040000", "type": "tree", "sha": hashlib.sha1(folder.encode()).hexdigest()} for folder in sorted(folders)]
+            truncated = repo.tree_limit is not None and len(tree) > repo.tree_limit
+            return self._send_json(handler, {"sha": repo.commit, "tree": tree[:repo.tree_limit] if truncated else tree, "truncated": truncated})
+        if rest[0] == "contents":
+            folder = "/".join(rest[1:])
+            ref = query.get("ref", repo.tag)
+            if folder in repo.files:
+                contents = repo.files[folder]
+                return self._send_json(handler, {"name": folder.split("/")[-1], "path": folder, "type": "file", "sha": blob_sha(contents),
+                                                 "size": len(contents), "download_url": f"{self.url}/raw/{repo.owner}/{repo.name}/{quote(ref, safe='')}/{quote(folder)}"})
+            items = {}
+            for path, contents in repo.files.items():
+                if folder and not path.startswith(folder + "/"):
+                    continue
+                child = path[len(folder) + 1:] if folder else path
+                first = child.split("/")[0]
+                full = f"{folder}/{first}" if folder else first
+                if "/" in child:
+                    items[first] = {"name": first, "path": full, "type": "dir", "download_url": None}
+                else:
+                    items[first] = {"name": first, "path": full, "type": "file", "sha": blob_sha(contents), "size": len(contents),
+                                    "download_url": f"{self.url}/raw/{repo.owner}/{repo.name}/{quote(ref, safe='')}/{quote(full)}"}
+            return self._send_json(handler, list(items.values()))
+        return self._send(handler, 404, {"message": "Not Found"})
@@ -0,0 +1,203 @@
+'''
+Project JAAB: Just Another Addin Builder
+
+Benchmarks the whole action (AddinBuilder.py run just as action.yml runs it) against the local fake Github server in
+fake_github.py. Synthetic repos are generated for every combination of the file count, total size, external entry
+count and external repo count asked for, and each is built in every build_mode asked for, cold (empty cache_dir) and
+then warm. Wall time, throughput, request latency and peak memory are recorded, and can be compared to an earlier run
+to catch regressions.
+
+Example Usage:
+    python benchmarks/run_benchmarks.py --files 100 1000 --size-mb 1 20 --externals 0 20 --latency 0.05 --output results.json
+    python benchmarks/run_benchmarks.py --files 100 1000 --size-mb 1 20 --externals 0 20 --latency 0.05 --baseline results.json
+'''
+
+############################
+#      IMPORT MODULES      #
+############################
+
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from fake_github import FakeGithub, synthetic_repos
+
+# the action's script, one folder up.
+ADDIN_BUILDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AddinBuilder.py")
+
+############################
+#     BENCHMARK FUNCTIONS  #
+############################
+
+def percentile(values, fraction):
+    '''
+    Returns the value at the fraction (0 to 1) of the sorted values, or 0 for no values.
+    '''
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+def build_once(server, app, mode, cache_dir, scratch):
+    '''
+    runs AddinBuilder.py in a child process for the app's release, in a new workspace, and measures it.
+
+    Args:
+        server (FakeGithub): the running fake server.
+        app (FakeRepo): the repo to build the addin of.
+        mode (string): the build_mode.
+        cache_dir (string): the cache_dir. Reuse it between runs for a warm build.
+        scratch (string): a folder for the workspace and build report.
+
+    Returns:
+        result (dictionary): the wall time, peak memory and the figures from the build report.
+
+    Raises:
+        Exception: the build failed. Its output is in the message.
+    '''
+    workspace = tempfile.mkdtemp(dir=scratch)
+    report_path = os.path.join(scratch, f"report-{os.path.basename(workspace)}.json")
+    environment = dict(os.environ,
+                       GITHUB_API_URL=server.url, GITHUB_STEP_SUMMARY="", Token="benchmark", OwnerRepo=f"{app.owner}/{app.name}",
+                       RunID=str(app.releases[0]["id"]), MakeMetaFile="true", PubName="PublishedAddins.jsl", PubPath="C:/addins/",
+                       AddinID=f"com.benchmark.{app.name}", AddinName=app.name, Author='"benchmark"',
+                       ExternalFiles="config.ini" if ".github/workflows/config.ini" in app.files else "", TagSuffix="false",
+                       JmpCust="menu.txt", BuildMode=mode, CacheDir=cache_dir, BuildReport=report_path)
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, ADDIN_BUILDER], cwd=workspace, env=environment,
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.stdout.read()
+    # wait4 gives the peak memory of this child alone.
+    _, status, usage = os.wait4(process.pid, 0)
+    seconds = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise Exception(f"The {mode} build of {app.name} failed:\n{output.decode(errors='replace')}")
+
+    with open(report_path, "r") as file:
+        report = json.load(file)
+    latencies = [call["seconds"] for call in report["http"]["calls"]]
+    source_bytes = sum(len(contents) for contents in app.files.values())
+    return {
+        "seconds": round(seconds, 3),
+        "build_seconds": report["seconds"],
+        "throughput_mb_s": round(source_bytes / 1024 / 1024 / seconds, 2),
+        # ru_maxrss is in KB on linux.
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "requests": report["http"]["requests"],
+        "bytes_in": report["http"]["bytes_in"],
+        "bytes_out": report["http"]["bytes_out"],
+        "latency_mean_s": round(sum(latencies) / len(latencies), 4) if latencies else 0,
+        "latency_p95_s": round(percentile(latencies, 0.95), 4),
+        "stages": {name: totals["seconds"] for name, totals in report["stages"].items()},
+        "counters": report["counters"],
+        }
+
+def run_benchmarks(files, size_mb, externals, external_repos, modes, repeat=2, latency=0.0, bandwidth_mbps=None, seed=0):
+    '''
+    benchmarks every combination of the axes in every build_mode.
+
+    Args:
+        files (list): file counts of the app repo.
+        size_mb (list): total sizes of the app repo's files in MB.
+        externals (list): numbers of .ini entries.
+        external_repos (list): numbers of distinct repos the entries come from.
+        modes (list): build_modes to run.
+        repeat (integer): runs per scenario and mode. The first has an empty cache_dir and the rest reuse it.
+        latency (float): seconds the fake server waits before every response.
+        bandwidth_mbps (float): MB per second each connection moves bodies at. None is unlimited.
+        seed (integer): the seed for the synthetic repos.
+
+    Returns:
+        results (list): a dictionary per run with the scenario, mode, run and its measurements.
+    '''
+    server = FakeGithub(latency=latency, bandwidth=int(bandwidth_mbps * 1024 * 1024) if bandwidth_mbps else None).start()
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as scratch:
+            for number, (file_count, size, entry_count, repo_count) in enumerate(itertools.product(files, size_mb, externals, external_repos)):
+                if entry_count == 0 and repo_count != external_repos[0]:
+                    # with no entries the number of external repos makes no difference.
+                    continue
+                scenario = f"files={file_count} size={size:g}MB externals={entry_count} repos={repo_count}"
+                app, libraries = synthetic_repos(file_count, int(size * 1024 * 1024), entry_count, max(repo_count, 1), seed + number, name=f"app{number}")
+                for repo in [app] + libraries:
+                    server.add(repo)
+                for mode in modes:
+                    # every mode starts from a release without the addin on it.
+                    app.releases[0]["assets"] = []
+                    app.assets = {}
+                    cache_dir = tempfile.mkdtemp(dir=scratch)
+                    for run in range(repeat):
+                        result = build_once(server, app, mode, cache_dir, scratch)
+                        result.update(scenario=scenario, mode=mode, run="cold" if run == 0 else f"warm{run}")
+                        results.append(result)
+                        print(f"{scenario:<50} {mode:<8} {result['run']:<6} {result['seconds']:>8.2f} s {result['throughput_mb_s']:>8.2f} MB/s "
+                              f"{result['peak_rss_mb']:>8.1f} MB {result['requests']:>5} requests {result['latency_p95_s']:>7.3f} s p95", flush=True)
+    finally:
+        server.stop()
+    return results
+
+def regressions(results, baseline, tolerance):
+    '''
+    compares the results to an earlier run of the same benchmarks.
+
+    Args:
+        results (list): this run's results.
+        baseline (list): the earlier run's results.
+        tolerance (float): how much slower or bigger (0.2 is 20%) a run can be before it counts.
+
+    Returns:
+        found (list): a line describing each regression.
+    '''
+    earlier = {(result["scenario"], result["mode"], result["run"]): result for result in baseline}
+    found = []
+    for result in results:
+        before = earlier.get((result["scenario"], result["mode"], result["run"]))
+        if before is None:
+            continue
+        for measure in ("seconds", "peak_rss_mb", "requests", "bytes_in"):
+            if before[measure] and result[measure] > before[measure] * (1 + tolerance):
+                found.append(f"{result['scenario']} {result['mode']} {result['run']}: {measure} went from {before[measure]} to {result[measure]}")
+    return found
+
+############################
+#           MAIN           #
+############################
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark AddinBuilder.py against a local fake Github server.")
+    parser.add_argument("--files", type=int, nargs="+", default=[100], help="file counts of the app repo")
+    parser.add_argument("--size-mb", type=float, nargs="+", default=[1], help="total sizes of the app repo in MB")
+    parser.add_argument("--externals", type=int, nargs="+", default=[5], help="numbers of .ini entries")
+    parser.add_argument("--external-repos", type=int, nargs="+", default=[1], help="numbers of repos the entries come from")
+    parser.add_argument("--modes", nargs="+", default=["extract", "stream", "memory"], help="build_modes to run")
+    parser.add_argument("--repeat", type=int, default=2, help="runs per scenario and mode, the first cold and the rest warm")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the server waits before every response")
+    parser.add_argument("--bandwidth-mbps", type=float, default=None, help="MB per second per connection, unlimited by default")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic repos")
+    parser.add_argument("--output", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results of an earlier run to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="how much worse than the baseline counts as a regression")
+    arguments = parser.parse_args()
+
+    results = run_benchmarks(arguments.files, arguments.size_mb, arguments.externals, arguments.external_repos, arguments.modes,
+                             arguments.repeat, arguments.latency, arguments.bandwidth_mbps, arguments.seed)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    if arguments.baseline:
+        with open(arguments.baseline, "r") as file:
+            found = regressions(results, json.load(file), arguments.tolerance)
+        for line in found:
+            print("REGRESSION " + line)
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
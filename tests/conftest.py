@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+# AddinBuilder.py and the fake Github server of the benchmarks aren't packages, so they're imported from their folders.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+import AddinBuilder
+from fake_github import FakeGithub
+
+@pytest.fixture
+def fake_github(monkeypatch, tmp_path):
+    '''
+    Starts a FakeGithub serving the repos given and points AddinBuilder at it. Stopped when the test ends. Calls made
+    outside a Builder use a client and caches in the test's temp folder, not the CacheDir of the action.
+    '''
+    servers = []
+    cache = str(tmp_path / "module-cache")
+    monkeypatch.setattr(AddinBuilder, "CACHE_DIR", cache)
+    monkeypatch.setattr(AddinBuilder, "_client", AddinBuilder.GithubClient(cache_dir=cache))
+    monkeypatch.setattr(AddinBuilder, "_externals_cache", None)
+    monkeypatch.setattr(AddinBuilder, "_lfs_cache", None)
+
+    def start(repos, **options):
+        server = FakeGithub(repos, **options).start()
+        servers.append(server)
+        monkeypatch.setattr(AddinBuilder, "GITHUB_API", server.url)
+        monkeypatch.setattr(AddinBuilder, "GITHUB_RAW", server.url + "/raw")
+        monkeypatch.setattr(AddinBuilder, "GITHUB_SERVER", server.url)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+@pytest.fixture
+def running_builder(tmp_path):
+    '''
+    Makes a Builder with its cache_dir in the test's temp folder the running one, for calling the build functions on
+    their own. Its report holds the counters of the calls.
+    '''
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", addin_id="com.bench.app", addin_name="app",
+                                      jmpcust_txt_file="menu.txt", cache_dir=str(tmp_path / "builder-cache"))
+    builder = AddinBuilder.Builder(config)
+    context = AddinBuilder._current_builder.set(builder)
+    yield builder
+    AddinBuilder._current_builder.reset(context)
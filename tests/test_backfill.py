@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+TAGS = ["v1.0.0", "v1.1.0", "v1.2.0"]
+
+def past_releases(fake_github):
+    # the app with three published releases, a month apart, and a draft.
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=1)
+    app.releases = [{"id": number + 1, "tag_name": tag, "name": tag, "published_at": f"2024-0{number + 1}-02T03:04:05Z",
+                     "prerelease": False, "draft": False, "target_commitish": "main", "assets": []} for number, tag in enumerate(TAGS)]
+    app.releases.append({"id": 9, "tag_name": "v2.0.0", "name": "v2.0.0", "published_at": None, "prerelease": False, "draft": True,
+                         "target_commitish": "main", "assets": []})
+    server = fake_github([app] + libraries)
+    return server, app
+
+def backfiller(tmp_path, **options):
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", addin_id="com.bench.app", addin_name="app",
+                                      jmpcust_txt_file="menu.txt", external_files="config.ini", output_dir=str(tmp_path / "build"),
+                                      cache_dir=str(tmp_path / "cache"), upload="false", backfill="*", **{"backfill_workers": 2, **options})
+    return AddinBuilder.Builder(config)
+
+def backfill(tmp_path, **options):
+    builder = backfiller(tmp_path, **options)
+    return builder.run(), builder.report.as_dict()["backfill"]
+
+def zipballs(server):
+    return sorted(path.rsplit("/", 1)[-1] for method, path in server.log if "/zipball/" in path)
+
+def failing(server, monkeypatch, tag):
+    # the zipball of one release can't be found.
+    route = server._route
+
+    def missing(handler, method, parts, query, body):
+        if "zipball" in parts and parts[-1] == tag:
+            return server._send(handler, 404, {"message": "Not Found"})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", missing)
+    monkeypatch.setattr(AddinBuilder.time, "sleep", lambda seconds: None)
+
+def test_every_published_release_is_built(fake_github, tmp_path):
+    server, app = past_releases(fake_github)
+    built, report = backfill(tmp_path)
+    assert sorted(built) == [f"{tag}/app.jmpaddin" for tag in TAGS]
+    assert all((tmp_path / "build" / tag / "app.jmpaddin").is_file() for tag in TAGS)
+    assert report == {"releases": 3, "checkpointed": 0, "built": 3, "failed": {}}
+    checkpoint = json.loads((tmp_path / "build" / "backfill-checkpoint.json").read_text())
+    assert {done["tag"] for done in checkpoint["done"].values()} == set(TAGS)
+    assert app.assets == {}
+
+def test_a_failed_release_is_built_on_the_next_run(fake_github, tmp_path, monkeypatch):
+    server, app = past_releases(fake_github)
+    builder = backfiller(tmp_path)
+    with monkeypatch.context() as patches:
+        failing(server, patches, "v1.1.0")
+        with pytest.raises(Exception, match="1 of the 3 releases backfilled could not be built:\n  v1.1.0"):
+            builder.run()
+    assert builder.report.as_dict()["backfill"]["failed"].keys() == {"v1.1.0"}
+    checkpoint = json.loads((tmp_path / "build" / "backfill-checkpoint.json").read_text())
+    assert sorted(done["tag"] for done in checkpoint["done"].values()) == ["v1.0.0", "v1.2.0"]
+
+    server.log.clear()
+    built, report = backfill(tmp_path)
+    assert list(built) == ["v1.1.0/app.jmpaddin"]
+    assert report == {"releases": 3, "checkpointed": 2, "built": 1, "failed": {}}
+    assert zipballs(server) == ["v1.1.0"]
+
+def test_a_finished_backfill_builds_nothing_again(fake_github, tmp_path):
+    server, app = past_releases(fake_github)
+    backfill(tmp_path)
+    server.log.clear()
+    built, report = backfill(tmp_path)
+    assert built == {} and report["checkpointed"] == 3
+    assert zipballs(server) == []
+
+def test_other_settings_start_the_checkpoint_over(fake_github, tmp_path):
+    server, app = past_releases(fake_github)
+    backfill(tmp_path)
+    server.log.clear()
+    built, report = backfill(tmp_path, exclude="*.png")
+    assert report["checkpointed"] == 0 and report["built"] == 3
+    assert zipballs(server) == TAGS
+    # the number of workers doesn't change what is built, so it keeps the checkpoint.
+    built, report = backfill(tmp_path, exclude="*.png", backfill_workers=1)
+    assert report["checkpointed"] == 3
+
+def test_releases_are_picked_by_tag_and_date(fake_github, running_builder, tmp_path):
+    server, app = past_releases(fake_github)
+    tags = lambda releases: [release["tag_name"] for release in releases]
+    assert tags(AddinBuilder.backfill_releases("bench/app", "t")) == TAGS
+    assert tags(AddinBuilder.backfill_releases("bench/app", "t", "v1.1.*, v1.2.*")) == ["v1.1.0", "v1.2.0"]
+    assert tags(AddinBuilder.backfill_releases("bench/app", "t", since="2024-02-01", until="2024-02-28")) == ["v1.1.0"]
+    with pytest.raises(ValueError):
+        AddinBuilder.backfill_releases("bench/app", "t", since="02/01/2024")
@@ -0,0 +1,51 @@
+import io
+import zipfile
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+MANIFEST = "[prod]\naddin_id = com.bench.prod\naddin_name = prod\n[test]\naddin_id = com.bench.test\naddin_name = test\nexternal_files = {test_ini}\n"
+
+def batch(fake_github, tmp_path, test_ini="config.ini", manifest=MANIFEST, route=None):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=2)
+    app.files[".github/workflows/batch.ini"] = manifest.format(test_ini=test_ini).encode()
+    app.files[".github/workflows/bad.ini"] = b"[external_files]\n1 = bench, app-lib0, src/nothing.jsl, nothing.jsl, libs, v1.0.0\n"
+    server = fake_github([app] + libraries)
+    if route is not None:
+        original = server._route
+        server._route = lambda handler, method, parts, query, body: route(server, original, handler, method, parts, query, body)
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", batch_manifest="batch.ini",
+                                      upload="false", output_dir=str(tmp_path / "build"), cache_dir=str(tmp_path / "cache"))
+    return AddinBuilder.Builder(config).run()
+
+def test_every_addin_of_the_manifest_is_built(fake_github, tmp_path):
+    built = batch(fake_github, tmp_path)
+    assert sorted(built) == ["prod.jmpaddin", "test.jmpaddin"]
+    with zipfile.ZipFile(built["test.jmpaddin"]) as addin:
+        assert b"com.bench.test" in addin.read("addin.def")
+        assert "libs/util0.jsl" in addin.namelist()
+
+def test_a_failing_addin_does_not_stop_the_others(fake_github, tmp_path):
+    with pytest.raises(Exception, match=r"(?s)1 of the 2 addins in the batch manifest failed to build:\n  \[test\]: .*src/nothing\.jsl does not exist"):
+        batch(fake_github, tmp_path, "bad.ini")
+    assert (tmp_path / "build" / "prod.jmpaddin").exists()
+    assert not (tmp_path / "build" / "test.jmpaddin").exists()
+
+def test_a_prefetch_that_cannot_reach_github_stops_the_batch(fake_github, tmp_path):
+    def refusing(server, original, handler, method, parts, query, body):
+        if "git" in parts and "trees" in parts and parts[2] == "app-lib0":
+            return server._send(handler, 401, {"message": "Bad credentials"})
+        return original(handler, method, parts, query, body)
+
+    with pytest.raises(AddinBuilder.ExternalsError, match="status code 401") as error:
+        batch(fake_github, tmp_path, route=refusing)
+    assert not error.value.missing()
+    assert not (tmp_path / "build" / "prod.jmpaddin").exists()
+
+def test_two_addins_with_one_filename_are_refused(fake_github, tmp_path):
+    manifest = "[one]\naddin_name = same\n[two]\naddin_name = same\n"
+    with pytest.raises(ValueError, match="would both be named same.jmpaddin"):
+        batch(fake_github, tmp_path, manifest=manifest)
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def build(app, tmp_path, **options):
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+                                      output_dir=str(tmp_path / "build"), cache_dir=str(tmp_path / "cache"),
+                                      build_report="report/build.json", step_summary=str(tmp_path / "summary.md"), **options)
+    return AddinBuilder.Builder(config)
+
+def test_the_report_and_summary_are_written(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=2)
+    fake_github([app] + libraries)
+    build(app, tmp_path).run()
+    report = json.loads((tmp_path / "build" / "report" / "build.json").read_text())
+    assert report["addins"] == ["app.jmpaddin"] and report["error"] is None
+    assert report["stages"] and all(stage["runs"] >= 1 for stage in report["stages"].values())
+    assert report["http"]["requests"] == len(report["http"]["calls"]) > 0
+    assert report["http"]["bytes_in"] == sum(call["bytes_in"] for call in report["http"]["calls"]) > 0
+    # the addin upload is the bytes out.
+    assert report["http"]["bytes_out"] >= len(app.assets["app.jmpaddin"])
+    assert "profile" not in report
+    summary = (tmp_path / "summary.md").read_text()
+    assert summary.startswith("### Project JAAB build: app.jmpaddin")
+    assert "| Stage | Seconds | Requests |" in summary
+
+def test_the_summary_is_appended(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=1)
+    fake_github([app] + libraries)
+    (tmp_path / "summary.md").write_text("earlier step\n")
+    build(app, tmp_path).run()
+    summary = (tmp_path / "summary.md").read_text()
+    assert summary.startswith("earlier step\n### Project JAAB build")
+
+def test_a_failed_build_is_reported(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=1)
+    fake_github([app])
+    with pytest.raises(Exception):
+        build(app, tmp_path).run()
+    report = json.loads((tmp_path / "build" / "report" / "build.json").read_text())
+    assert report["error"] and report["addins"] == []
+    assert any(call["status"] == 404 for call in report["http"]["calls"])
+    assert (tmp_path / "summary.md").exists()
+
+def test_profiling_is_opt_in(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=1)
+    fake_github([app] + libraries)
+    build(app, tmp_path, profile="true").run()
+    report = json.loads((tmp_path / "build" / "report" / "build.json").read_text())
+    assert report["profile"]["tracemalloc_peak_bytes"] > 0
+    assert "cumulative" in report["profile"]["top"]
+    assert "Peak traced memory" in (tmp_path / "summary.md").read_text()
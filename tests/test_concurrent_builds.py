@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+MODES = ("extract", "stream", "memory")
+
+def test_concurrent_builds(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=20, total_bytes=40000, externals=3)
+    fake_github([app] + libraries)
+    client = AddinBuilder.GithubClient(cache_dir=str(tmp_path / "cache"))
+    builders = []
+    for number in range(36):
+        output_dir = tmp_path / f"build{number}"
+        config = AddinBuilder.BuildConfig(
+            token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id=f"com.bench.addin{number}",
+            addin_name=f"addin{number}", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+            build_mode=MODES[number % 3], output_dir=str(output_dir), cache_dir=str(tmp_path / "cache"),
+            build_report="report.json", step_summary=str(tmp_path / f"summary{number}.md"))
+        # half of the builds share one client, as a release service would.
+        builders.append(AddinBuilder.Builder(config, client if number % 2 else None))
+
+    working_directory = os.getcwd()
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        results = list(pool.map(lambda builder: builder.run(), builders))
+    assert os.getcwd() == working_directory
+
+    assert len({id(builder.report) for builder in builders}) == len(builders)
+    for number, (builder, built) in enumerate(zip(builders, results)):
+        name = f"addin{number}.jmpaddin"
+        assert list(built) == [name]
+        if builder.config.build_mode == "memory":
+            assert built[name] is None
+        else:
+            assert os.path.dirname(built[name]) == builder.config.output_dir
+
+        # the uploaded addin is this build's, not another's.
+        with zipfile.ZipFile(io.BytesIO(app.assets[name])) as addin:
+            assert addin.testzip() is None
+            assert addin.read("addin.def").decode().startswith(f"id=com.bench.addin{number}\nname=addin{number}\n")
+            assert f"com.bench.addin{number}" in addin.read("addin.jmpcust").decode()
+            assert {"libs/util0.jsl", "libs/util1.jsl", "libs/util2.jsl", "customMetaData.jsl"} <= set(addin.namelist())
+
+        # each build's report and summary only holds that build.
+        report = builder.report.as_dict()
+        assert report["addins"] == [name] and report["error"] is None
+        assert report["build_mode"] == builder.config.build_mode
+        with open(os.path.join(builder.config.output_dir, "report.json")) as file:
+            assert json.load(file)["addins"] == [name]
+        with open(builder.config.step_summary) as file:
+            summary = file.read()
+        assert summary.startswith(f"### Project JAAB build: {name}\n")
+        assert summary.count("### Project JAAB build") == 1
@@ -0,0 +1,75 @@
+import os
+
+import pytest
+
+import AddinBuilder
+from fake_github import FakeRepo, blob_sha
+
+CONTENTS = os.urandom(300000)
+
+@pytest.fixture
+def raw_file(fake_github, monkeypatch):
+    '''
+    Serves one raw file, records the headers of every request for it and cuts off the first cut_offs downloads halfway.
+    '''
+    server = fake_github([FakeRepo("bench", "lib", {"data/big.jmp": CONTENTS})])
+    route = server._route
+    server.requests_seen = []
+    server.cut_offs = 0
+
+    def recording(handler, method, parts, query, body):
+        server.requests_seen.append(dict(handler.headers))
+        if server.cut_offs:
+            server.cut_offs -= 1
+            start = int(handler.headers["Range"][6:-1]) if "Range" in handler.headers else 0
+            handler.send_response(206 if start else 200)
+            handler.send_header("Content-Length", str(len(CONTENTS) - start))
+            if start:
+                handler.send_header("Content-Range", f"bytes {start}-{len(CONTENTS) - 1}/{len(CONTENTS)}")
+            handler.end_headers()
+            handler.wfile.write(CONTENTS[start:start + (len(CONTENTS) - start) // 2])
+            handler.wfile.flush()
+            handler.close_connection = True
+            return
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", recording)
+    return server, f"{server.url}/raw/bench/lib/v1.0.0/data/big.jmp"
+
+def test_a_download_is_verified_and_sent_with_the_token_as_a_header(raw_file, running_builder, tmp_path):
+    server, url = raw_file
+    destination = tmp_path / "big.jmp"
+    AddinBuilder.download_verified(url, "secret", str(destination), len(CONTENTS), blob_sha(CONTENTS))
+    assert destination.read_bytes() == CONTENTS
+    assert server.requests_seen[0]["Authorization"] == "token secret"
+    assert "secret" not in server.log[0][1]
+    assert os.listdir(tmp_path) == ["big.jmp"]
+
+def test_a_cut_off_download_resumes_with_a_range(raw_file, running_builder, tmp_path):
+    server, url = raw_file
+    server.cut_offs = 1
+    destination = tmp_path / "big.jmp"
+    AddinBuilder.download_verified(url, "t", str(destination), len(CONTENTS), blob_sha(CONTENTS))
+    assert destination.read_bytes() == CONTENTS
+    assert len(server.requests_seen) == 2
+    # picked up from the last whole chunk that arrived.
+    resumed_at = int(server.requests_seen[1]["Range"][6:-1])
+    assert 0 < resumed_at <= len(CONTENTS) // 2
+
+@pytest.mark.parametrize("size, sha", [(len(CONTENTS), "0" * 40), (len(CONTENTS) + 1, None)])
+def test_a_file_that_does_not_match_is_never_left_behind(raw_file, running_builder, tmp_path, size, sha):
+    server, url = raw_file
+    destination = tmp_path / "big.jmp"
+    destination.write_bytes(b"the last good copy")
+    with pytest.raises(Exception):
+        AddinBuilder.download_verified(url, "t", str(destination), size, sha, attempts=2)
+    assert destination.read_bytes() == b"the last good copy"
+    assert os.listdir(tmp_path) == ["big.jmp"]
+
+def test_a_download_that_keeps_getting_cut_off_gives_up(raw_file, running_builder, tmp_path):
+    server, url = raw_file
+    server.cut_offs = 10
+    with pytest.raises(Exception, match="could not be downloaded in full after 3 attempts"):
+        AddinBuilder.download_verified(url, "t", str(tmp_path / "big.jmp"), len(CONTENTS), blob_sha(CONTENTS), attempts=3)
+    assert len(server.requests_seen) == 3
+    assert os.listdir(tmp_path) == []
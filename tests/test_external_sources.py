@@ -0,0 +1,100 @@
+import io
+import subprocess
+import zipfile
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def folders(libraries, root):
+    # each library as a plain folder, root/owner/repo.
+    for library in libraries:
+        for path, contents in library.files.items():
+            location = root / library.owner / library.name / path
+            location.parent.mkdir(parents=True, exist_ok=True)
+            location.write_bytes(contents)
+    return root
+
+def mirrors(libraries, root):
+    # each library as a git clone --mirror of a repo with its files at its tag, root/owner/repo.git.
+    folders(libraries, root / "work")
+    for library in libraries:
+        work = root / "work" / library.owner / library.name
+        git = ["git", "-C", str(work), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+        subprocess.run(git + ["init", "-q"], check=True)
+        subprocess.run(git + ["add", "-A"], check=True)
+        subprocess.run(git + ["commit", "-q", "-m", "release"], check=True)
+        subprocess.run(git + ["tag", library.tag], check=True)
+        subprocess.run(["git", "clone", "-q", "--mirror", str(work), str(root / library.owner / f"{library.name}.git")], check=True)
+    return root
+
+def build(app, tmp_path, external_source, run=0):
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+                                      output_dir=str(tmp_path / f"build{run}"), cache_dir=str(tmp_path / "cache"), external_source=external_source)
+    builder = AddinBuilder.Builder(config)
+    builder.run()
+    return builder.report.as_dict()["counters"]
+
+def library_requests(server):
+    return [path for method, path in server.log if "app-lib" in path]
+
+def built_externals(app):
+    with zipfile.ZipFile(io.BytesIO(app.assets["app.jmpaddin"])) as addin:
+        return {name: addin.read(name) for name in addin.namelist() if name.startswith("libs/")}
+
+def expected_externals(libraries):
+    return {f"libs/{path.split('/')[-1]}": contents for library in libraries for path, contents in library.files.items()}
+
+def test_externals_come_from_plain_folders(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=4, external_repos=2)
+    server = fake_github([app])
+    root = folders(libraries, tmp_path / "libraries")
+    build(app, tmp_path, f"dir:{root}")
+    assert library_requests(server) == []
+    assert built_externals(app) == expected_externals(libraries)
+
+def test_externals_come_from_git_mirrors(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=4, external_repos=2)
+    server = fake_github([app])
+    root = mirrors(libraries, tmp_path / "mirrors")
+    counters = build(app, tmp_path, f"mirror:{root}")
+    assert library_requests(server) == []
+    assert counters["mirror_reads"] == 4
+    assert built_externals(app) == expected_externals(libraries)
+
+def test_files_from_a_mirror_are_cached_for_github(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=2)
+    server = fake_github([app] + libraries)
+    root = mirrors(libraries, tmp_path / "mirrors")
+    build(app, tmp_path, f"mirror:{root}", run=0)
+    counters = build(app, tmp_path, "github", run=1)
+    # the blob SHAs are the same, so the second build only lists the library.
+    assert counters["externals_cache_hits"] == 2
+    assert not any(path.startswith("/raw/") for path in library_requests(server))
+
+def test_an_entry_names_its_own_source(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=2)
+    server = fake_github([app] + libraries)
+    root = folders(libraries, tmp_path / "libraries")
+    lines = app.files[".github/workflows/config.ini"].decode().splitlines()
+    # the first entry reads its folder, the second stays on Github.
+    lines[1] += f", dir:{root}"
+    app.files[".github/workflows/config.ini"] = ("\n".join(lines) + "\n").encode()
+    app._zipball = None
+    build(app, tmp_path, "github")
+    assert not any("util0.jsl" in path for path in library_requests(server))
+    assert any("util1.jsl" in path for path in library_requests(server))
+    assert built_externals(app) == expected_externals(libraries)
+
+def test_a_missing_mirror_fails_the_build(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=5, total_bytes=5000, externals=1)
+    fake_github([app])
+    (tmp_path / "mirrors").mkdir()
+    with pytest.raises(Exception, match="There is no mirror of bench/app-lib0"):
+        build(app, tmp_path, f"mirror:{tmp_path / 'mirrors'}")
+
+def test_an_unknown_source_is_refused():
+    with pytest.raises(ValueError, match="is not an external source"):
+        AddinBuilder.external_source("ftp:/srv/libraries")
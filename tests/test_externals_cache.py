@@ -0,0 +1,59 @@
+import io
+
+import AddinBuilder
+from fake_github import blob_sha, synthetic_repos
+
+def resolve_twice(fake_github, tmp_path, version):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=1)
+    fake_github([app] + libraries)
+    library = libraries[0]
+    path = next(iter(library.files))
+    entry = {"1": [library.owner, library.name, path, "util.jsl", "libs", version(library)]}
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", addin_id="a", addin_name="a", jmpcust_txt_file="menu.txt",
+                                      cache_dir=str(tmp_path))
+    indexed = []
+    for run in range(2):
+        builder = AddinBuilder.Builder(config)
+        context = AddinBuilder._current_builder.set(builder)
+        try:
+            resolved, errors = AddinBuilder.resolve_externals(entry, "t")
+            assert errors == {}
+            # stored as a download would, so a remembered file can be served from the index.
+            builder.cache.add_file(blob_sha(library.files[path]), io.BytesIO(library.files[path]))
+            builder.cache.save()
+        finally:
+            AddinBuilder._current_builder.reset(context)
+        indexed.append(builder.report.as_dict()["counters"].get("externals_index_hits", 0))
+    return indexed
+
+def test_tags_are_indexed(fake_github, tmp_path):
+    assert resolve_twice(fake_github, tmp_path, lambda library: library.tag) == [0, 1]
+
+def test_commits_are_indexed(fake_github, tmp_path):
+    assert resolve_twice(fake_github, tmp_path, lambda library: library.commit) == [0, 1]
+
+def test_branches_are_listed_every_time(fake_github, tmp_path):
+    assert resolve_twice(fake_github, tmp_path, lambda library: "main") == [0, 0]
+    assert resolve_twice(fake_github, tmp_path, lambda library: "latest") == [0, 0]
+
+def test_pinned_version_without_requests():
+    assert AddinBuilder.pinned_version("o/r", "t", "a" * 40)
+    assert not AddinBuilder.pinned_version("o/r", "t", "latest")
+
+def test_tags_are_looked_up_once(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=1)
+    server = fake_github([app] + libraries)
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", addin_id="a", addin_name="a", jmpcust_txt_file="menu.txt",
+                                      cache_dir=str(tmp_path))
+    for run in range(2):
+        builder = AddinBuilder.Builder(config)
+        context = AddinBuilder._current_builder.set(builder)
+        try:
+            assert AddinBuilder.pinned_version("bench/app-lib0", "t", "v1.0.0")
+            assert AddinBuilder.pinned_version("bench/app-lib0", "t", "v1.0.0")
+            assert not AddinBuilder.pinned_version("bench/app-lib0", "t", "main")
+            builder.cache.save()
+        finally:
+            AddinBuilder._current_builder.reset(context)
+    assert sum("/git/ref/tags/v1.0.0" in path for method, path in server.log) == 1
+    assert builder.cache.tag_commit("bench/app-lib0", "v1.0.0") == libraries[0].commit
@@ -0,0 +1,33 @@
+import AddinBuilder
+from fake_github import FakeRepo, blob_sha
+
+FILES = {"top.jsl": b"top", "a/deep.jsl": b"deep a", "a/b/c/deep.jsl": b"deep c", "a/b/c/only.jsl": b"only", "lib/x.jsl": b"x", "lib/sub/y.jsl": b"y"}
+
+def test_the_repo_is_listed_in_one_request_at_the_version(fake_github, running_builder):
+    server = fake_github([FakeRepo("bench", "lib", dict(FILES))])
+    listing = AddinBuilder.externals_data("bench/lib", "t", "v1.0.0")
+    assert [path for method, path in server.log] == ["/repos/bench/lib/git/trees/v1.0.0?recursive=1"]
+    kind, url, sha, size, path = listing["a/b/c/only.jsl"]
+    assert (kind, sha, size, path) == ("file", blob_sha(b"only"), 4, "a/b/c/only.jsl")
+    assert url.endswith("/bench/lib/v1.0.0/a/b/c/only.jsl")
+    assert listing["a/b"][0] == "dir"
+
+def test_latest_is_the_default_branch(fake_github, running_builder):
+    server = fake_github([FakeRepo("bench", "lib", dict(FILES))])
+    AddinBuilder.externals_data("bench/lib", "t")
+    assert server.log[0][1].startswith("/repos/bench/lib/git/trees/HEAD?")
+
+def test_files_of_one_name_in_different_folders_are_kept_apart(fake_github, running_builder):
+    fake_github([FakeRepo("bench", "lib", dict(FILES))])
+    listing = AddinBuilder.externals_data("bench/lib", "t", "v1.0.0")
+    assert listing["a/deep.jsl"][4] == "a/deep.jsl" and listing["a/b/c/deep.jsl"][4] == "a/b/c/deep.jsl"
+    # a bare name is the shallowest file of that name, and works for a name used once at any depth.
+    assert listing["deep.jsl"][4] == "a/deep.jsl"
+    assert listing["only.jsl"][4] == "a/b/c/only.jsl"
+
+def test_a_folder_entry_takes_everything_under_it(fake_github, running_builder):
+    fake_github([FakeRepo("bench", "lib", dict(FILES))])
+    listing = AddinBuilder.externals_data("bench/lib", "t", "v1.0.0")
+    targets = AddinBuilder.external_targets(listing, "lib", "library", "libs")
+    assert sorted(target[3] for target in targets) == ["libs/library/sub/y.jsl", "libs/library/x.jsl"]
+    assert [target[3] for target in AddinBuilder.external_targets(listing, "a/b/c/only.jsl", "only.jsl", "main")] == ["only.jsl"]
@@ -0,0 +1,36 @@
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def test_json_out_uses_the_etag_cache(fake_github, running_builder):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=0)
+    server = fake_github([app])
+    url = f"{server.url}/repos/bench/app/git/trees/v1.0.0"
+    first = AddinBuilder.json_out(url, "t", {"recursive": 1})
+    second = AddinBuilder.json_out(url, "t", {"recursive": 1})
+    assert first == second
+    assert running_builder.report.as_dict()["counters"]["etag_hits"] == 1
+
+def test_state_is_only_sent_for_the_release_list(fake_github, running_builder):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=1)
+    server = fake_github([app] + libraries)
+    AddinBuilder.release_data("bench/app", "t", "")
+    AddinBuilder.externals_data("bench/app-lib0", "t", "v1.0.0")
+    release_list, tree = server.log[-2:]
+    assert "state=open" in release_list[1]
+    assert "/git/trees/" in tree[1] and "state" not in tree[1]
+
+def test_failures_are_retried(fake_github, running_builder, monkeypatch):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=0)
+    server = fake_github([app])
+    route = server._route
+    failures = []
+
+    def flaky(handler, method, parts, query, body):
+        if not failures:
+            failures.append(parts)
+            return server._send(handler, 502, {"message": "Bad Gateway"})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", flaky)
+    assert AddinBuilder.release_data("bench/app", "t", str(app.releases[0]["id"]))["tag_name"] == "v1.0.0"
+    assert len(failures) == 1
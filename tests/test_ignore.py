@@ -0,0 +1,58 @@
+import pytest
+
+import AddinBuilder
+
+SPEC = [
+    "# a comment",
+    "",
+    "docs/",
+    "*.psd",
+    "!logo.psd",
+    "/build",
+    "art/raw/*.tif",
+    "**/cache/**",
+    "temp?.txt",
+    "data[0-9].csv",
+    "\\#literal.txt",
+    "\\!bang.txt",
+    "notes/*",
+    "!notes/keep.md",
+]
+
+@pytest.mark.parametrize("path, excluded", [
+    ("docs/guide.md", True),
+    ("sub/docs/guide.md", True),
+    ("docs", False),
+    ("art/cover.psd", True),
+    ("art/logo.psd", False),
+    ("build/out.jsl", True),
+    ("src/build/out.jsl", False),
+    ("art/raw/scan.tif", True),
+    ("art/raw/deep/scan.tif", False),
+    ("other/art/raw/scan.tif", False),
+    ("a/cache/b/c.txt", True),
+    ("cache/c.txt", True),
+    ("temp1.txt", True),
+    ("temp12.txt", False),
+    ("data3.csv", True),
+    ("dataX.csv", False),
+    ("#literal.txt", True),
+    ("!bang.txt", True),
+    ("notes/todo.md", True),
+    ("notes/keep.md", False),
+    ("main.jsl", False),
+])
+def test_excluded(path, excluded):
+    assert AddinBuilder.IgnoreSpec(SPEC).excluded(path) is excluded
+
+def test_nothing_in_an_excluded_folder_comes_back():
+    spec = AddinBuilder.IgnoreSpec(["docs/", "!docs/keep.md"])
+    assert spec.excluded("docs/keep.md")
+
+def test_last_matching_pattern_decides():
+    assert not AddinBuilder.IgnoreSpec(["*.md", "!*.md"]).excluded("a.md")
+    assert AddinBuilder.IgnoreSpec(["!*.md", "*.md"]).excluded("a.md")
+
+def test_folder_only_patterns_dont_match_files():
+    assert not AddinBuilder.IgnoreSpec(["docs/"]).excluded("docs")
+    assert AddinBuilder.IgnoreSpec(["docs"]).excluded("docs")
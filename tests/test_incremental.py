@@ -0,0 +1,17 @@
+import AddinBuilder
+from fake_github import FakeRepo
+
+def test_previous_addin_matches_the_exact_name(fake_github, tmp_path, monkeypatch):
+    monkeypatch.setattr(AddinBuilder, "cache_dir", lambda: str(tmp_path))
+    repo = FakeRepo("bench", "app", {})
+    repo.releases = [dict(repo.releases[0], id=2, tag_name="v1.1.0", assets=[]), dict(repo.releases[0], id=1, tag_name="v1.0.0", assets=[])]
+    fake_github([repo])
+    for release, name, contents in ((repo.releases[1], "tool_lite_v1.0.0.jmpaddin", b"lite"), (repo.releases[1], "tool_v1.0.0.jmpaddin", b"tool")):
+        url = f"{AddinBuilder.GITHUB_API}/repos/bench/app/releases/assets/{name}"
+        release["assets"].append({"name": name, "url": url, "size": len(contents)})
+        repo.assets[name] = contents
+    local = AddinBuilder.previous_addin("bench/app", "t", "2", "tool")
+    with open(local, "rb") as file:
+        assert file.read() == b"tool"
+    assert AddinBuilder.previous_addin("bench/app", "t", "2", "tool_lite") is not None
+    assert AddinBuilder.previous_addin("bench/app", "t", "2", "to") is None
@@ -0,0 +1,54 @@
+import os
+import shutil
+import zipfile
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+BIG = {f"data/table{number}.jmp": bytes([number]) * 50000 + os.urandom(1000) for number in range(3)}
+
+def build(fake_github, tmp_path, build_mode, corrupt=False):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=1)
+    for path, contents in BIG.items():
+        app.add_lfs(path, contents)
+    app.add_lfs("data/skip.jmp", b"x" * 5000)
+    app.files[".jaabignore"] = b"data/skip.jmp\n"
+    if corrupt:
+        oid = next(iter(app.lfs_objects))
+        app.lfs_objects[oid] = b"y" * len(app.lfs_objects[oid])
+    fake_github([app] + libraries)
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", build_mode=build_mode,
+                                      upload="false", output_dir=str(tmp_path / "build"), cache_dir=str(tmp_path / "cache"))
+    builder = AddinBuilder.Builder(config)
+    built = builder.run()
+    with zipfile.ZipFile(built["app.jmpaddin"]) as addin:
+        return {name: addin.read(name) for name in addin.namelist()}, builder.report.as_dict()["counters"]
+
+@pytest.mark.parametrize("build_mode", ["extract", "stream", "memory"])
+def test_pointers_are_swapped_for_their_objects(fake_github, tmp_path, build_mode):
+    members, counters = build(fake_github, tmp_path, build_mode)
+    assert all(members[path] == contents for path, contents in BIG.items())
+    assert "data/skip.jmp" not in members
+    assert counters["lfs_downloads"] == 3
+
+@pytest.mark.parametrize("build_mode", ["extract", "stream", "memory"])
+def test_objects_gone_from_the_cache_are_downloaded_again(fake_github, tmp_path, build_mode, monkeypatch):
+    fetch = AddinBuilder.fetch_lfs_objects
+
+    def fetch_then_trim(*arguments, **options):
+        # as if another build trimmed the lfs_cache right after the objects were fetched.
+        cache = fetch(*arguments, **options)
+        shutil.rmtree(os.path.join(cache.root, "objects"))
+        return cache
+
+    monkeypatch.setattr(AddinBuilder, "fetch_lfs_objects", fetch_then_trim)
+    members, counters = build(fake_github, tmp_path, build_mode)
+    assert all(members[path] == contents for path, contents in BIG.items())
+    assert counters["lfs_downloads"] == 6
+
+def test_an_object_that_does_not_match_its_oid_fails_the_build(fake_github, tmp_path):
+    with pytest.raises(Exception, match="1 of the Git LFS objects of bench/app could not be fetched"):
+        build(fake_github, tmp_path, "stream", corrupt=True)
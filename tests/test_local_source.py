@@ -0,0 +1,73 @@
+import io
+import subprocess
+import zipfile
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def checkout(repo, folder):
+    # a git checkout of the repo's files, and the fake repo's tag moved to its commit.
+    for path, contents in repo.files.items():
+        (folder / path).parent.mkdir(parents=True, exist_ok=True)
+        (folder / path).write_bytes(contents)
+    git = ["git", "-C", str(folder), "-c", "user.name=bench", "-c", "user.email=bench@example.com"]
+    subprocess.run(git + ["init", "-q"], check=True)
+    subprocess.run(git + ["add", "-A"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "release"], check=True)
+    repo.commit = subprocess.run(git + ["rev-parse", "HEAD"], check=True, capture_output=True, text=True).stdout.strip()
+    repo._zipball = None
+    return git
+
+def build(app, tmp_path, source_dir):
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+                                      output_dir=str(tmp_path / "build"), cache_dir=str(tmp_path / "cache"), source_dir=str(source_dir))
+    builder = AddinBuilder.Builder(config)
+    builder.run()
+    return builder.report.as_dict()["counters"]
+
+def zipball_requests(server):
+    return [path for method, path in server.log if "/zipball/" in path]
+
+def test_a_clean_checkout_of_the_tag_is_packaged_locally(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=1)
+    server = fake_github([app] + libraries)
+    checkout(app, tmp_path / "checkout")
+    counters = build(app, tmp_path, tmp_path / "checkout")
+    assert counters["local_source"] == 1
+    assert zipball_requests(server) == []
+    with zipfile.ZipFile(io.BytesIO(app.assets["app.jmpaddin"])) as addin:
+        assert addin.read("addin.jmpcust") and "libs/util0.jsl" in addin.namelist()
+
+def test_a_checkout_of_another_commit_is_downloaded(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=1)
+    server = fake_github([app] + libraries)
+    git = checkout(app, tmp_path / "checkout")
+    (tmp_path / "checkout" / "later.txt").write_text("after the release")
+    subprocess.run(git + ["add", "-A"], check=True)
+    subprocess.run(git + ["commit", "-q", "-m", "later"], check=True)
+    counters = build(app, tmp_path, tmp_path / "checkout")
+    assert "local_source" not in counters
+    assert len(zipball_requests(server)) == 1
+    with zipfile.ZipFile(io.BytesIO(app.assets["app.jmpaddin"])) as addin:
+        assert not any(name.endswith("later.txt") for name in addin.namelist())
+
+def test_a_checkout_with_changes_is_downloaded(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=1)
+    server = fake_github([app] + libraries)
+    checkout(app, tmp_path / "checkout")
+    path = next(path for path in app.files if path.endswith(".jsl"))
+    (tmp_path / "checkout" / path).write_bytes(b"edited after the release")
+    counters = build(app, tmp_path, tmp_path / "checkout")
+    assert "local_source" not in counters
+    assert len(zipball_requests(server)) == 1
+    with zipfile.ZipFile(io.BytesIO(app.assets["app.jmpaddin"])) as addin:
+        assert b"edited after the release" not in [addin.read(name) for name in addin.namelist()]
+
+def test_a_folder_that_is_not_a_checkout_is_downloaded(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=1)
+    server = fake_github([app] + libraries)
+    (tmp_path / "plain").mkdir()
+    counters = build(app, tmp_path, tmp_path / "plain")
+    assert "local_source" not in counters
+    assert len(zipball_requests(server)) == 1
@@ -0,0 +1,47 @@
+import io
+import tempfile
+import time
+import zipfile
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def build(app, tmp_path, build_mode, run):
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+                                      build_mode=build_mode, output_dir=str(tmp_path / f"build{run}"), cache_dir=str(tmp_path / "cache"))
+    builder = AddinBuilder.Builder(config)
+    return builder.run(), builder.report.as_dict()["counters"]
+
+def test_a_memory_build_writes_no_files(fake_github, tmp_path, monkeypatch):
+    app, libraries = synthetic_repos(files=20, total_bytes=20000, externals=2)
+    fake_github([app] + libraries)
+    spilled = []
+    rollover = tempfile.SpooledTemporaryFile.rollover
+    monkeypatch.setattr(tempfile.SpooledTemporaryFile, "rollover", lambda spool: (spilled.append(spool), rollover(spool)))
+    built, counters = build(app, tmp_path, "memory", 0)
+    assert built == {"app.jmpaddin": None}
+    assert list((tmp_path / "build0").iterdir()) == []
+    assert spilled == []
+    with zipfile.ZipFile(io.BytesIO(app.assets["app.jmpaddin"])) as addin:
+        assert {"addin.def", "addin.jmpcust", "customMetaData.jsl", "libs/util0.jsl"} <= set(addin.namelist())
+
+@pytest.mark.parametrize("build_mode", ["stream", "memory"])
+def test_building_a_release_again_skips_the_upload(fake_github, tmp_path, monkeypatch, build_mode):
+    app, libraries = synthetic_repos(files=20, total_bytes=20000, externals=2)
+    fake_github([app] + libraries)
+    build(app, tmp_path, build_mode, 0)
+    first = app.assets["app.jmpaddin"]
+    # a day later, so anything stamped with the time of the build would differ.
+    later = time.time() + 86400
+    monkeypatch.setattr(time, "time", lambda: later)
+    built, counters = build(app, tmp_path, build_mode, 1)
+    assert counters["uploads_skipped"] == 1
+    assert app.assets["app.jmpaddin"] == first
+    with zipfile.ZipFile(io.BytesIO(first)) as addin:
+        # zip timestamps are to the even second.
+        published = AddinBuilder.release_time(app.releases[0]["published_at"])
+        for name in ("addin.def", "addin.jmpcust", "customMetaData.jsl", "libs/util0.jsl"):
+            assert addin.getinfo(name).date_time == published[:5] + (published[5] // 2 * 2,)
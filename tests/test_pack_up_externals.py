@@ -0,0 +1,53 @@
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def entries(libraries, count=10):
+    return {str(number + 1): ["bench", libraries[number % len(libraries)].name, f"src/util{number}.jsl", f"util{number}.jsl", "libs", "v1.0.0"]
+            for number in range(count)}
+
+def test_each_repo_and_version_is_listed_once(fake_github, running_builder, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=10, external_repos=2)
+    server = fake_github([app] + libraries)
+    written = AddinBuilder.pack_up_externals(entries(libraries), str(tmp_path / "addin"), "t", max_workers=4)
+    assert sorted(written, key=int) == [str(number) for number in range(1, 11)]
+    for number in range(10):
+        library = libraries[number % 2]
+        assert (tmp_path / "addin" / "libs" / f"util{number}.jsl").read_bytes() == library.files[f"src/util{number}.jsl"]
+    assert sum("/git/trees/" in path for method, path in server.log) == 2
+
+def test_listings_are_shared_between_calls(fake_github, running_builder, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=4, external_repos=1)
+    server = fake_github([app] + libraries)
+    listings = {}
+    branch = {number: maps[:5] + ["main"] for number, maps in entries(libraries, 4).items()}
+    AddinBuilder.pack_up_externals(branch, str(tmp_path / "one"), "t", listings=listings)
+    AddinBuilder.pack_up_externals(branch, str(tmp_path / "two"), "t", listings=listings)
+    assert sum("/git/trees/" in path for method, path in server.log) == 1
+
+def test_every_failing_entry_is_reported(fake_github, running_builder, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=3, external_repos=1)
+    fake_github([app] + libraries)
+    broken = entries(libraries, 3)
+    broken["2"][2] = "src/nothing.jsl"
+    broken["4"] = ["bench", "nowhere", "src/util0.jsl", "other.jsl", "libs", "v1.0.0"]
+    with pytest.raises(AddinBuilder.ExternalsError) as error:
+        AddinBuilder.pack_up_externals(broken, str(tmp_path / "addin"), "t")
+    assert sorted(error.value.errors) == ["2", "4"]
+    assert "src/nothing.jsl does not exist" in str(error.value) and "bench, nowhere" in str(error.value)
+    # the entries that could be included still are.
+    assert (tmp_path / "addin" / "libs" / "util0.jsl").exists() and (tmp_path / "addin" / "libs" / "util2.jsl").exists()
+
+def test_the_later_entry_for_a_destination_wins(fake_github, running_builder, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=2, external_repos=1)
+    fake_github([app] + libraries)
+    same = entries(libraries, 2)
+    same["2"][3] = "util0.jsl"
+    written = AddinBuilder.pack_up_externals(same, str(tmp_path / "addin"), "t")
+    assert list(written) == ["2"]
+    assert (tmp_path / "addin" / "libs" / "util0.jsl").read_bytes() == libraries[0].files["src/util1.jsl"]
+
+def test_a_short_entry_is_refused(running_builder, tmp_path):
+    with pytest.raises(ValueError, match="short an input"):
+        AddinBuilder.pack_up_externals({"1": ["bench", "app-lib0", "src/util0.jsl"]}, str(tmp_path), "t")
@@ -0,0 +1,45 @@
+import re
+
+import pytest
+
+import AddinBuilder
+
+VALUES = {"TOOLTAG": "v1.0.0", "TOOL": "short", "JAAB_VERSION": "10000001", "ID": "com.bench.TOOLTAG"}
+TEXT = b"TOOLTAG x TOOL yTOOLTAGTOOL JAAB_VERSIO JAAB_VERSION IDID TOOLTA\nTOOLTAG"
+
+def reference(text):
+    # every placeholder replaced in one pass over the whole text, the longest first where two start at the same place.
+    keys = sorted(VALUES, key=len, reverse=True)
+    return re.sub("|".join(map(re.escape, keys)).encode(), lambda match: VALUES[match.group().decode()].encode(), text)
+
+def chunked(text, size):
+    return [text[start:start + size] for start in range(0, len(text), size)]
+
+@pytest.mark.parametrize("size", range(1, len(TEXT) + 2))
+def test_expand_across_chunk_boundaries(size):
+    placeholders = AddinBuilder.Placeholders(VALUES, ["*"])
+    assert b"".join(placeholders.expand(chunked(TEXT, size))) == reference(TEXT)
+
+def test_expand_every_split():
+    placeholders = AddinBuilder.Placeholders(VALUES, ["*"])
+    for first in range(len(TEXT) + 1):
+        for second in range(first, len(TEXT) + 1, 3):
+            chunks = [TEXT[:first], TEXT[first:second], TEXT[second:]]
+            assert b"".join(placeholders.expand(chunks)) == reference(TEXT)
+
+def test_replaced_text_isnt_expanded_again():
+    placeholders = AddinBuilder.Placeholders({"ID": "com.bench.TOOLTAG", "TOOLTAG": "v1"}, ["*"])
+    assert placeholders.expand_text("ID TOOLTAG") == "com.bench.TOOLTAG v1"
+
+def test_no_placeholders_passes_chunks_through():
+    chunks = [b"a", b"TOOLTAG"]
+    assert list(AddinBuilder.Placeholders({}).expand(chunks)) == chunks
+
+def test_multibyte_values_and_text():
+    placeholders = AddinBuilder.Placeholders({"JAAB_AUTHOR": "Zoë Ångström"}, ["*.jsl"])
+    text = "// © JAAB_AUTHOR — JAAB_AUTHOR".encode("utf-8")
+    assert b"".join(placeholders.expand(chunked(text, 2))).decode("utf-8") == "// © Zoë Ångström — Zoë Ångström"
+
+@pytest.mark.parametrize("arcname, applies", [("main.jsl", True), ("Scripts/Util.JSL", True), ("main.jsl.bak", False), ("logo.png", False)])
+def test_applies(arcname, applies):
+    assert AddinBuilder.Placeholders({"TOOLTAG": "v1"}, ["*.jsl"]).applies(arcname) is applies
@@ -0,0 +1,41 @@
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def build(fake_github, tmp_path, tree_limit, jmpcust_txt_file="menu.txt", plan="false", config_ini=None):
+    app, libraries = synthetic_repos(files=10, total_bytes=10000, externals=2)
+    app.tree_limit = tree_limit
+    if config_ini is not None:
+        app.files[".github/workflows/config.ini"] = config_ini.encode()
+    server = fake_github([app] + libraries)
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file=jmpcust_txt_file, external_files="config.ini",
+                                      build_mode="stream", output_dir=str(tmp_path / "build"), cache_dir=str(tmp_path / "cache"), plan=plan)
+    return AddinBuilder.Builder(config).run(), server
+
+@pytest.mark.parametrize("tree_limit", [None, 0])
+def test_preflight_finds_files_of_a_truncated_tree(fake_github, tmp_path, tree_limit):
+    built, server = build(fake_github, tmp_path, tree_limit, plan="true")
+    assert built == {}
+    assert any("/repos/bench/app/git/trees/" in path for method, path in server.log)
+
+@pytest.mark.parametrize("tree_limit", [None, 0])
+@pytest.mark.parametrize("plan", ["false", "true"])
+def test_preflight_reports_missing_files(fake_github, tmp_path, tree_limit, plan):
+    with pytest.raises(Exception, match=r"\.github/workflows/missing\.txt: is not in v1\.0\.0"):
+        build(fake_github, tmp_path, tree_limit, "missing.txt", plan)
+
+def test_a_build_only_lists_the_repos_it_needs(fake_github, tmp_path):
+    built, server = build(fake_github, tmp_path, None)
+    assert list(built) == ["app.jmpaddin"]
+    assert not any("/repos/bench/app/git/trees/" in path or "/contents/" in path for method, path in server.log)
+    assert sum("/git/trees/" in path for method, path in server.log) == 1
+
+def test_a_build_reports_every_bad_entry_before_downloading(fake_github, tmp_path, monkeypatch):
+    config_ini = "[external_files]\n1 = bench, app-lib0, src/util0.jsl, util0.jsl, libs\n2 = bench, app-lib0, src/util1.jsl, util1.jsl, libs, v1.0.0, ftp:x\n"
+    downloads = []
+    monkeypatch.setattr(AddinBuilder, "release_zipball", lambda *arguments: downloads.append(arguments))
+    with pytest.raises(Exception, match=r"(?s)2 problems.*config\.ini 1 = .*needs 6.*config\.ini 2 = .*ftp:x is not an external source"):
+        build(fake_github, tmp_path, None, config_ini=config_ini)
+    assert downloads == []
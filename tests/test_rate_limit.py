@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def client_for(fake_github, tmp_path, rate_limit_wait, **options):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=0)
+    server = fake_github([app], **options)
+    client = AddinBuilder.GithubClient(cache_dir=str(tmp_path / "client-cache"), rate_limit_wait=rate_limit_wait)
+    return server, client, f"{server.url}/repos/bench/app/releases/{app.releases[0]['id']}"
+
+def test_a_spent_budget_waits_for_the_reset(fake_github, running_builder, tmp_path):
+    server, client, url = client_for(fake_github, tmp_path, 30, rate_limit=2, rate_limit_window=1)
+    started = time.time()
+    for number in range(3):
+        assert client.get_json(url, "t", {"n": number})["tag_name"] == "v1.0.0"
+    assert time.time() - started >= 1
+    metrics = client.scheduler.metrics()
+    assert metrics["waits"] == 1 and metrics["wait_seconds"] > 0
+    assert running_builder.report.as_dict()["counters"]["rate_limit_waits"] == 1
+
+def test_a_reset_past_the_wait_raises(fake_github, running_builder, tmp_path):
+    server, client, url = client_for(fake_github, tmp_path, 5, rate_limit=1, rate_limit_window=3600)
+    client.get_json(url, "t")
+    started = time.time()
+    with pytest.raises(AddinBuilder.RateLimitError, match="longer than the 5 second rate_limit_wait"):
+        client.get_json(url, "t", {"n": 1})
+    # fails straight away, without waiting or sending the request.
+    assert time.time() - started < 5
+    assert server.refused == 0
+
+def test_a_refusal_with_retry_after_is_retried(fake_github, running_builder, tmp_path, monkeypatch):
+    server, client, url = client_for(fake_github, tmp_path, 30)
+    route = server._route
+    refusals = []
+
+    def secondary(handler, method, parts, query, body):
+        # a secondary rate limit: budget left, but a Retry-After.
+        if not refusals:
+            refusals.append(parts)
+            return server._send(handler, 403, {"message": "You have exceeded a secondary rate limit."}, headers={"Retry-After": "1"})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", secondary)
+    assert client.get_json(url, "t")["tag_name"] == "v1.0.0"
+    assert client.scheduler.metrics()["rate_limited"] == 1
+    assert running_builder.report.as_dict()["counters"]["rate_limit_retries"] == 1
+
+def test_a_bad_token_is_not_a_rate_limit(fake_github, running_builder, tmp_path, monkeypatch):
+    server, client, url = client_for(fake_github, tmp_path, 30)
+    monkeypatch.setattr(server, "_route", lambda handler, method, parts, query, body: server._send(handler, 403, {"message": "Bad credentials"}))
+    with pytest.raises(Exception, match="status code 403"):
+        client.get_json(url, "t")
+    assert len(server.log) == 1
+    assert client.scheduler.metrics()["rate_limited"] == 0
+
+def test_fewer_requests_run_at_once_as_the_budget_runs_low(fake_github, running_builder, tmp_path):
+    server, client, url = client_for(fake_github, tmp_path, 30, rate_limit=10)
+    for number in range(10):
+        client.get_json(url, "t", {"n": number})
+    assert client.scheduler.capacity() < client.scheduler.max_concurrency
+    assert client.scheduler.metrics()["lowest_capacity"] < client.scheduler.max_concurrency
@@ -0,0 +1,43 @@
+import pytest
+
+import AddinBuilder
+from fake_github import FakeRepo
+
+def many_releases(fake_github, count=250):
+    repo = FakeRepo("bench", "app", {})
+    base = repo.releases[0]
+    # newest first, as Github lists them. run_number stands in for an id that isn't the release id.
+    repo.releases = [dict(base, id=number, tag_name=f"v1.{number}", run_number=100000 + number, assets=[]) for number in range(count, 0, -1)]
+    return repo, fake_github([repo])
+
+def test_a_release_id_is_fetched_directly(fake_github):
+    repo, server = many_releases(fake_github)
+    release = AddinBuilder.release_data("bench/app", "t", "3")
+    assert release["tag_name"] == "v1.3"
+    assert [path for method, path in server.log] == ["/repos/bench/app/releases/3"]
+
+def test_another_run_id_is_searched_for_until_found(fake_github):
+    repo, server = many_releases(fake_github)
+    # release 120 is the 131st in the list, so on the second page of 100.
+    release = AddinBuilder.release_data("bench/app", "t", "100120")
+    assert release["id"] == 120
+    pages = [path for method, path in server.log if "page=" in path]
+    assert len(pages) == 2 and all("state=open" in path for path in pages)
+
+def test_a_run_id_nothing_matches_raises(fake_github):
+    repo, server = many_releases(fake_github)
+    with pytest.raises(ValueError, match="No release in bench/app matches the run id 999999"):
+        AddinBuilder.release_data("bench/app", "t", "999999")
+    assert sum("page=" in path for method, path in server.log) == 3
+
+def test_without_a_run_id_the_newest_release_is_used(fake_github):
+    repo, server = many_releases(fake_github)
+    assert AddinBuilder.release_data("bench/app", "t", "")["tag_name"] == "v1.250"
+    assert len(server.log) == 1 and "per_page=1" in server.log[0][1]
+
+def test_only_a_missing_release_is_searched_for(fake_github, monkeypatch):
+    repo, server = many_releases(fake_github)
+    monkeypatch.setattr(server, "_route", lambda handler, method, parts, query, body: server._send(handler, 401, {"message": "Bad credentials"}))
+    with pytest.raises(Exception, match="status code 401"):
+        AddinBuilder.release_data("bench/app", "t", "3")
+    assert len(server.log) == 1
@@ -0,0 +1,35 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def build(tmp_path, app, build_mode, run):
+    output_dir = tmp_path / f"{build_mode}{run}"
+    config = AddinBuilder.BuildConfig(token="t", owner_repo="bench/app", run_id=str(app.releases[0]["id"]), addin_id="com.bench.app",
+                                      addin_name="app", jmpcust_txt_file="menu.txt", external_files="config.ini", make_meta_file="true",
+                                      build_mode=build_mode, output_dir=str(output_dir), cache_dir=str(tmp_path / f"cache{run}"),
+                                      reproducible="true", upload="false")
+    built = AddinBuilder.Builder(config).run()
+    with open(built["app.jmpaddin"], "rb") as file:
+        contents = file.read()
+    with open(os.path.join(output_dir, "app.jmpaddin.manifest.json")) as file:
+        return contents, json.load(file)
+
+def test_reproducible_builds_are_byte_identical(fake_github, tmp_path):
+    app, libraries = synthetic_repos(files=30, total_bytes=60000, externals=3)
+    fake_github([app] + libraries)
+    builds = {(build_mode, run): build(tmp_path, app, build_mode, run) for run in range(2) for build_mode in ("extract", "stream", "memory")}
+    digests = {hashlib.sha256(contents).hexdigest() for contents, manifest in builds.values()}
+    assert len(digests) == 1
+    assert len({manifest["digest"] for contents, manifest in builds.values()}) == 1
+
+    contents, manifest = builds[("extract", 0)]
+    with zipfile.ZipFile(tmp_path / "extract0" / "app.jmpaddin") as addin:
+        names = addin.namelist()
+        assert names == sorted(names) and not any(name.endswith("/") for name in names)
+        assert {info.date_time for info in addin.infolist()} == {(2024, 1, 2, 3, 4, 4)}
+        assert {info.external_attr for info in addin.infolist()} == {0o644 << 16}
+    assert sorted(manifest["members"]) == names
@@ -0,0 +1,111 @@
+import hashlib
+from urllib.parse import quote
+
+import pytest
+
+import AddinBuilder
+from fake_github import synthetic_repos
+
+def put_asset(server, repo, name, contents):
+    # an asset already on the release before the upload runs.
+    asset = {"id": len(repo.assets) + 1, "name": name, "size": len(contents), "state": "uploaded",
+             "digest": "sha256:" + hashlib.sha256(contents).hexdigest(),
+             "url": f"{server.url}/repos/{repo.owner}/{repo.name}/releases/assets/{quote(name)}"}
+    repo.assets[name] = contents
+    repo.releases[0]["assets"].append(asset)
+    return asset
+
+@pytest.fixture
+def release(fake_github, running_builder, tmp_path):
+    app, libraries = synthetic_repos(files=1, total_bytes=100, externals=0)
+    server = fake_github([app])
+    (tmp_path / "app.jmpaddin").write_bytes(b"new addin")
+    return server, app, AddinBuilder.release_data("bench/app", "t", str(app.releases[0]["id"]))
+
+def test_an_identical_asset_is_not_uploaded_again(release, running_builder, tmp_path):
+    server, app, data = release
+    put_asset(server, app, "app.jmpaddin", b"new addin")
+    AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert not any(method == "POST" for method, path in server.log)
+    assert running_builder.report.as_dict()["counters"]["uploads_skipped"] == 1
+
+def test_a_stale_asset_is_replaced(release, tmp_path):
+    server, app, data = release
+    put_asset(server, app, "app.jmpaddin", b"old addin")
+    asset = AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert asset["name"] == "app.jmpaddin"
+    assert [asset["name"] for asset in app.releases[0]["assets"]] == ["app.jmpaddin"]
+    assert app.assets["app.jmpaddin"] == b"new addin"
+
+def test_assets_past_the_first_page_are_found(release, tmp_path):
+    server, app, data = release
+    for number in range(150):
+        put_asset(server, app, f"other{number}.zip", b"x")
+    put_asset(server, app, "uploading-app.jmpaddin", b"half an addin")
+    put_asset(server, app, "app.jmpaddin", b"new addin")
+    AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert not any(method == "POST" for method, path in server.log)
+
+def test_a_taken_name_is_cleared_once(release, tmp_path, monkeypatch):
+    server, app, data = release
+    route = server._route
+    taken = []
+
+    def racing(handler, method, parts, query, body):
+        # another asset of the same name shows up between the listing and the upload.
+        if method == "POST" and not taken:
+            taken.append(put_asset(server, app, "app.jmpaddin", b"someone else's"))
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", racing)
+    AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert app.assets["app.jmpaddin"] == b"new addin"
+    assert sum(method == "POST" for method, path in server.log) == 2
+
+def test_a_name_that_stays_taken_raises(release, tmp_path, monkeypatch):
+    server, app, data = release
+    route = server._route
+
+    def refusing(handler, method, parts, query, body):
+        if method == "POST":
+            return server._send(handler, 422, {"message": "Validation Failed", "errors": [{"code": "already_exists"}]})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", refusing)
+    with pytest.raises(Exception, match="status code 422.*already_exists"):
+        AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert sum(method == "POST" for method, path in server.log) == 2
+
+def test_a_refused_delete_raises(release, tmp_path, monkeypatch):
+    server, app, data = release
+    put_asset(server, app, "uploading-app.jmpaddin", b"half an addin")
+    put_asset(server, app, "app.jmpaddin", b"old addin")
+    route = server._route
+
+    def refusing(handler, method, parts, query, body):
+        if method == "DELETE":
+            return server._send(handler, 403, {"message": "Forbidden"})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", refusing)
+    with pytest.raises(Exception, match="could not be removed"):
+        AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert not any(method == "POST" for method, path in server.log)
+
+def test_a_failed_rename_is_retried(release, tmp_path, monkeypatch):
+    server, app, data = release
+    put_asset(server, app, "app.jmpaddin", b"old addin")
+    monkeypatch.setattr(AddinBuilder.time, "sleep", lambda seconds: None)
+    route = server._route
+    failures = []
+
+    def flaky(handler, method, parts, query, body):
+        if method == "PATCH" and not failures:
+            failures.append(parts)
+            return server._send(handler, 502, {"message": "Bad Gateway"})
+        return route(handler, method, parts, query, body)
+
+    monkeypatch.setattr(server, "_route", flaky)
+    asset = AddinBuilder.uploadAsset("app.jmpaddin", data, str(tmp_path), "t")
+    assert asset["name"] == "app.jmpaddin" and app.assets["app.jmpaddin"] == b"new addin"
+    assert len(failures) == 1
@@ -0,0 +1,64 @@
+import io
+import zipfile
+
+import pytest
+
+import AddinBuilder
+from fake_github import FakeRepo
+
+@pytest.mark.parametrize("tag, number", [
+    ("v1.0.9", 10009001), ("1.0.9", 10009001), ("V1.0.9", 10009001), ("1.0", 100001),
+    ("v1.0.9-RC1", 10008701), ("v1.0.9-rc.1", 10008701), ("v1.0.9-Beta2", 10008402), ("v1.0.9-beta.2", 10008402),
+    ("v1.0.9-Alpha3", 10008103), ("v1.0.9-RC299", 10008999),
+])
+def test_version_number(tag, number):
+    assert AddinBuilder.verCharToNum(tag) == number
+
+def test_pre_releases_order_between_releases():
+    tags = ["1.0.8", "1.0.9-Alpha1", "1.0.9-Beta1", "1.0.9-beta.2", "1.0.9-RC1", "1.0.9-rc.2", "1.0.9"]
+    numbers = [AddinBuilder.verCharToNum(tag) for tag in tags]
+    assert numbers == sorted(numbers) and len(set(numbers)) == len(numbers)
+
+@pytest.mark.parametrize("tag", ["v1.0.9-hotfix", "v1.0.9-rc", "v1.0.9-RC1x", "1-0-0", "1.0-0", "v1/0/0", "1_0", "v1.0-Beta",
+                                 "v1.0.9-RC300", "0.0-RC1", "latest", ""])
+def test_not_a_version(tag):
+    with pytest.raises(ValueError):
+        AddinBuilder.verCharToNum(tag)
+
+def test_catalog_reads_every_page_of_releases(fake_github):
+    repo = FakeRepo("bench", "app", {})
+    base = repo.releases[0]
+    repo.releases = [dict(base, id=number, tag_name=f"v1.{number}", assets=[]) for number in range(150, 0, -1)]
+    # the only addin is on the oldest release, on the second page of the release list.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as addin:
+        addin.writestr("addin.def", "id=com.bench.old\nname=old\naddinVersion=1")
+    repo.releases[-1]["assets"].append({"id": 1, "name": "old.jmpaddin", "url": "", "browser_download_url": ""})
+    repo.assets["old.jmpaddin"] = buffer.getvalue()
+    server = fake_github([repo])
+    repo.releases[-1]["assets"][0]["url"] = f"{server.url}/repos/bench/app/releases/assets/old.jmpaddin"
+    catalog = AddinBuilder.repo_catalog("bench/app", "t", "PROD")
+    assert list(catalog["entries"]) == ["com.bench.old"]
+    assert catalog["entries"]["com.bench.old"]["tag"] == "v1.1"
+
+def test_catalog_is_replaced_in_one_step(fake_github, running_builder, tmp_path, monkeypatch):
+    repo = FakeRepo("bench", "app", {})
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as addin:
+        addin.writestr("addin.def", "id=com.bench.app\nname=app\naddinVersion=1")
+    repo.releases[0]["assets"].append({"id": 1, "name": "app.jmpaddin", "url": "", "browser_download_url": ""})
+    repo.assets["app.jmpaddin"] = buffer.getvalue()
+    server = fake_github([repo])
+    repo.releases[0]["assets"][0]["url"] = f"{server.url}/repos/bench/app/releases/assets/app.jmpaddin"
+    catalog_path = tmp_path / "catalog" / "publishedaddins.jsl"
+    catalog_path.parent.mkdir()
+    catalog_path.write_text("the old catalog")
+    catalog_path.chmod(0o640)
+    replaced = []
+    replace = AddinBuilder.os.replace
+    monkeypatch.setattr(AddinBuilder.os, "replace", lambda source, destination: (replaced.append(str(destination)), replace(source, destination)))
+    AddinBuilder.build_catalog("bench/app", "t", str(catalog_path))
+    assert "com.bench.app" in catalog_path.read_text()
+    assert str(catalog_path) in replaced
+    assert catalog_path.stat().st_mode & 0o777 == 0o640
+    assert [path.name for path in catalog_path.parent.iterdir()] == ["publishedaddins.jsl"]
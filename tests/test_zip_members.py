@@ -0,0 +1,92 @@
+import io
+import sys
+import zipfile
+
+import pytest
+
+import AddinBuilder
+
+MEMBERS = {"a.jsl": b"x = 1;\n" * 5000, "images/b.png": bytes(range(256)) * 40, "empty.txt": b""}
+
+def source_zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipped:
+        for name, contents in MEMBERS.items():
+            zipped.writestr(name, contents, zipfile.ZIP_STORED if name.endswith(".png") else zipfile.ZIP_DEFLATED)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+def copy_all(raw, monkeypatch):
+    if not raw:
+        monkeypatch.setattr(AddinBuilder, "raw_zip_writes", lambda dest_zip: False)
+    source = source_zip()
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as dest:
+        for info in source.infolist():
+            AddinBuilder.copy_zip_member(source, info, dest, "copy/" + info.filename, (2024, 1, 2, 3, 4, 6), 0o644 << 16, 3)
+    buffer.seek(0)
+    return zipfile.ZipFile(buffer)
+
+@pytest.mark.skipif(sys.implementation.name != "cpython"
+                    or not AddinBuilder.RAW_ZIP_VERSIONS[0] <= sys.version_info[:2] <= AddinBuilder.RAW_ZIP_VERSIONS[1],
+                    reason="raw zip writes are only used on the CPython versions in RAW_ZIP_VERSIONS")
+def test_zipfile_internals_are_there():
+    # if this fails, the ZipFile internals write_raw_member uses have changed: take this version out of RAW_ZIP_VERSIONS.
+    with zipfile.ZipFile(io.BytesIO(), "w") as dest:
+        missing = [name for name in AddinBuilder.RAW_ZIP_INTERNALS if not hasattr(dest, name)]
+        assert missing == []
+        assert AddinBuilder.raw_zip_writes(dest)
+        assert isinstance(dest.start_dir, int) and callable(dest._writecheck)
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_copy_zip_member(raw, monkeypatch):
+    copied = copy_all(raw, monkeypatch)
+    assert copied.testzip() is None
+    for name, contents in MEMBERS.items():
+        info = copied.getinfo("copy/" + name)
+        assert copied.read(info) == contents
+        assert info.date_time == (2024, 1, 2, 3, 4, 6)
+        assert info.external_attr == 0o644 << 16 and info.create_system == 3
+    assert copied.getinfo("copy/images/b.png").compress_type == zipfile.ZIP_STORED
+
+def test_raw_copy_keeps_compressed_bytes(monkeypatch):
+    # the raw copy must carry the compressed bytes over untouched, so it's exactly as large as the source.
+    source = source_zip()
+    copied = copy_all(True, monkeypatch)
+    for info in source.infolist():
+        assert copied.getinfo("copy/" + info.filename).compress_size == info.compress_size
+
+@pytest.mark.parametrize("raw", [True, False])
+def test_write_raw_member(raw, monkeypatch):
+    if not raw:
+        monkeypatch.setattr(AddinBuilder, "raw_zip_writes", lambda dest_zip: False)
+    contents = b"JAAB " * 100000
+    compressed = AddinBuilder.compress_file(io.BytesIO(contents), "big.txt", 6)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as dest:
+        AddinBuilder.write_compressed(dest, "big.txt", compressed, (2024, 1, 2, 3, 4, 6))
+        dest.writestr("after.txt", b"after")
+    with zipfile.ZipFile(buffer) as zipped:
+        assert zipped.testzip() is None
+        assert zipped.read("big.txt") == contents
+        assert zipped.read("after.txt") == b"after"
+
+def test_recompress_member_checks_crc():
+    contents = b"hello" * 1000
+    compress_type, crc, file_size, spool = AddinBuilder.compress_file(io.BytesIO(contents), "a.txt", 6)
+    zinfo = zipfile.ZipInfo("a.txt")
+    zinfo.compress_type = compress_type
+    zinfo.CRC = crc ^ 1
+    zinfo.file_size = file_size
+    zinfo.compress_size = spool.tell()
+    spool.seek(0)
+    with zipfile.ZipFile(io.BytesIO(), "w") as dest, pytest.raises(zipfile.BadZipFile):
+        AddinBuilder.recompress_member(dest, zinfo, spool)
+
+def test_recompressing_is_warned_about_once(monkeypatch, capsys, running_builder):
+    monkeypatch.setattr(AddinBuilder, "RAW_ZIP_VERSIONS", ((2, 0), (2, 7)))
+    monkeypatch.setattr(AddinBuilder, "_raw_zip_warned", False)
+    copied = copy_all(True, monkeypatch)
+    assert all(copied.read("copy/" + name) == contents for name, contents in MEMBERS.items())
+    assert capsys.readouterr().out.count("decompressed and compressed again") == 1
+    assert running_builder.report.as_dict()["counters"]["zip_recompressed"] == len(MEMBERS)